@@ -0,0 +1,77 @@
+"""Benchmark the markdownify and native storage-format converter engines.
+
+Usage:
+    python benchmarks/bench_converters.py [CORPUS_DIR] [--repeat N]
+
+CORPUS_DIR may contain storage-format page bodies as ``.html`` or ``.xml``
+files, for example dumped from ``body.storage.value``. Without it, a synthetic
+corpus of typical Confluence pages is generated.
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+from markdown_maker.converters.engines import ENGINES, get_converter
+
+
+def synthetic_page(index: int) -> str:
+    """Return a storage-format page mixing the elements seen on real pages."""
+    rows = "".join(
+        f"<tr><td>Row {r}</td><td><strong>{r * index}</strong></td><td>note {r}</td></tr>" for r in range(30)
+    )
+    items = "".join(f"<li>Item {i} with <em>emphasis</em> and <code>code_{i}</code></li>" for i in range(15))
+    tasks = "".join(
+        f"<ac:task><ac:task-id>{t}</ac:task-id><ac:task-status>incomplete</ac:task-status>"
+        f"<ac:task-body>Follow up {t}</ac:task-body></ac:task>"
+        for t in range(8)
+    )
+    return (
+        f"<h1>Page {index}</h1>"
+        f"<p>Intro paragraph for page {index} with a "
+        f'<ac:link><ri:page ri:content-title="Page {index + 1}" ri:space-key="DOC"/></ac:link> link.</p>'
+        '<ac:structured-macro ac:name="info"><ac:rich-text-body><p>Heads up.</p></ac:rich-text-body>'
+        "</ac:structured-macro>"
+        f"<ul>{items}</ul>"
+        f"<table><tbody><tr><th>Name</th><th>Value</th><th>Notes</th></tr>{rows}</tbody></table>"
+        '<ac:structured-macro ac:name="code"><ac:parameter ac:name="language">python</ac:parameter>'
+        "<ac:plain-text-body><![CDATA[def main():\n    return 42\n]]></ac:plain-text-body></ac:structured-macro>"
+        f'<ac:image><ri:attachment ri:filename="diagram-{index}.png"/></ac:image>'
+        f"<ac:task-list>{tasks}</ac:task-list>"
+    ) * 3
+
+
+def load_corpus(corpus_dir: str | None) -> list[str]:
+    """Load page bodies from a directory, or build the synthetic corpus."""
+    if corpus_dir:
+        paths = sorted(p for p in Path(corpus_dir).rglob("*") if p.suffix in {".html", ".xml"})
+        return [p.read_text(encoding="utf-8") for p in paths]
+    return [synthetic_page(i) for i in range(50)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus_dir", nargs="?", help="Directory of storage-format page bodies.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed passes over the corpus per engine.")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus_dir)
+    total_kb = sum(len(page) for page in corpus) / 1024
+    print(f"Corpus: {len(corpus)} pages, {total_kb:.0f} KiB")
+    for engine in ENGINES:
+        convert = get_converter(engine)
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            output_kb = sum(len(convert(page)) for page in corpus) / 1024
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        print(
+            f"{engine:>12}: best {best * 1000:8.1f} ms, median {statistics.median(timings) * 1000:8.1f} ms, "
+            f"{len(corpus) / best:7.1f} pages/s, {output_kb:.0f} KiB Markdown"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Benchmark the markdownify converter on a page with one large table.
+
+Usage:
+    python benchmarks/bench_tables.py [--rows N] [--repeat N]
+
+Compares ``convert_html_to_markdown``, which renders simple tables on a fast
+path, with plain markdownify using the same options, and checks that both
+produce the same Markdown.
+"""
+
+import argparse
+import statistics
+import time
+
+from markdownify import markdownify
+
+from markdown_maker.converters.html_to_markdown import MARKDOWNIFY_OPTIONS, convert_html_to_markdown
+
+
+def table_page(rows: int) -> str:
+    """Return a page with a Jira-style table: plain cells, with markup in every tenth row."""
+    body = "".join(
+        f"<tr><td>PROJ-{r}</td><td>{'<strong>Open</strong>' if r % 10 == 0 else 'Open'}</td>"
+        f"<td>Inventory item {r} * {r % 7}</td><td>2024-01-{r % 28 + 1:02d}</td></tr>"
+        for r in range(rows)
+    )
+    return (
+        "<h1>Inventory</h1><p>Generated from Jira.</p>"
+        f"<table><tbody><tr><th>Key</th><th>Status</th><th>Summary</th><th>Updated</th></tr>{body}</tbody></table>"
+    )
+
+
+def _time(convert, html: str, repeat: int) -> tuple[list[float], str]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        markdown = convert(html)
+        timings.append(time.perf_counter() - start)
+    return timings, markdown
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000, help="Table rows.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed conversions per converter.")
+    args = parser.parse_args()
+
+    html = table_page(args.rows)
+    print(f"Table: {args.rows} rows, {len(html) / 1024:.0f} KiB")
+    fast, fast_md = _time(convert_html_to_markdown, html, args.repeat)
+    general, general_md = _time(lambda page: markdownify(page, **MARKDOWNIFY_OPTIONS), html, args.repeat)
+    for name, timings in (("fast path", fast), ("markdownify", general)):
+        print(f"{name:>12}: best {min(timings) * 1000:8.1f} ms, median {statistics.median(timings) * 1000:8.1f} ms")
+    print(f"Speedup: {min(general) / min(fast):.1f}x, identical output: {fast_md == general_md}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Benchmark the configured HTTP transport against a default requests session.
+
+Usage:
+    python benchmarks/bench_transport.py [--workers N] [--requests N] [--latency MS] [--handshake MS]
+        [--think MS] [--page-kib N]
+
+A local stub server answers every GET with a page-sized JSON body after a
+fixed latency, gzip-compressed when the client asks for it, and counts the
+TCP connections it accepts. The first response on each connection is delayed
+by a further ``--handshake``, standing in for the TCP and TLS setup of a
+connection to Confluence Cloud. ``--workers`` threads share one session, as
+the traversal and attachment downloads share the ConfluenceClient, and spend
+``--think`` between requests converting or writing what they fetched.
+
+While workers are busy between requests, more than 10 connections sit idle.
+The default session keeps at most 10 per host and discards the others, so it
+keeps paying for new connections; the configured transport keeps one
+connection per worker alive.
+"""
+
+import argparse
+import gzip
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from markdown_maker.clients.transport import build_session
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.0
+    handshake = 0.0
+    body = b""
+    compressed = b""
+    connections = 0
+    bytes_sent = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with StubHandler.lock:
+            StubHandler.connections += 1
+        time.sleep(self.handshake)
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        gzipped = "gzip" in self.headers.get("Accept-Encoding", "")
+        body = self.compressed if gzipped else self.body
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
+        self.end_headers()
+        self.wfile.write(body)
+        with StubHandler.lock:
+            StubHandler.bytes_sent += len(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _run(session: requests.Session, url: str, workers: int, count: int, think: float) -> tuple[float, int, int]:
+    def fetch(_: int) -> None:
+        response = session.get(url)
+        response.raise_for_status()
+        response.json()
+        time.sleep(think)
+
+    StubHandler.connections = StubHandler.bytes_sent = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        list(pool.map(fetch, range(count)))
+    elapsed = time.perf_counter() - start
+    session.close()
+    return elapsed, StubHandler.connections, StubHandler.bytes_sent
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=32, help="Threads sharing the session.")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per run.")
+    parser.add_argument("--latency", type=float, default=100.0, help="Server latency per response, in milliseconds.")
+    parser.add_argument(
+        "--handshake", type=float, default=150.0, help="Extra delay per new connection, in milliseconds."
+    )
+    parser.add_argument("--think", type=float, default=50.0, help="Work per response, in milliseconds.")
+    parser.add_argument("--page-kib", type=int, default=16, help="Size of the uncompressed JSON body, in KiB.")
+    args = parser.parse_args()
+
+    paragraph = "<p>Some <strong>storage format</strong> text with a link to another page.</p>"
+    html = paragraph * (args.page_kib * 1024 // len(paragraph))
+    StubHandler.body = json.dumps({"id": "1", "title": "Page", "body": {"storage": {"value": html}}}).encode()
+    StubHandler.compressed = gzip.compress(StubHandler.body)
+    StubHandler.latency = args.latency / 1000
+    StubHandler.handshake = args.handshake / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/rest/api/content/1"
+
+    sessions = {
+        "default": requests.Session,
+        "configured": lambda: build_session({}, workers=args.workers),
+        "no gzip": lambda: build_session({"http_compression": False}, workers=args.workers),
+    }
+    results = {}
+    for name, make_session in sessions.items():
+        elapsed, connections, sent = _run(make_session(), url, args.workers, args.requests, args.think / 1000)
+        results[name] = elapsed
+        print(
+            f"{name:>10}: {args.requests / elapsed:7.0f} requests/s, {connections:5d} connections, "
+            f"{sent / args.requests / 1024:6.1f} KiB/response"
+        )
+    server.shutdown()
+    print(f"Speedup: {results['default'] / results['configured']:.2f}x with {args.workers} workers")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Benchmark the classification of link targets as Confluence page links.
+
+Usage:
+    python benchmarks/bench_urls.py [--links N] [--repeat N]
+
+Every anchor of every exported page is classified, so this is timed per link
+on a mix of typical link targets: external sites, anchors, Confluence links by
+ID, tiny links and links by title. ``classify_url`` is compared with the
+previous approach of trying a page ID extraction and then a title extraction,
+each with its own regular expressions and a ValueError for links that do not
+match.
+"""
+
+import argparse
+import re
+import statistics
+import time
+from urllib.parse import unquote_plus
+
+from markdown_maker.utils.helpers import classify_url
+
+SITE = "https://company.atlassian.net/wiki"
+LINK_MIX = [
+    "https://github.com/org/repo/blob/main/README.md",
+    "https://docs.python.org/3/library/re.html#re.search",
+    "#installation",
+    "mailto:team@example.com",
+    "https://jira.example.com/browse/PROJ-1234",
+    f"{SITE}/spaces/ENG/pages/123456789/Deployment+Guide",
+    f"{SITE}/pages/viewpage.action?pageId=987654321",
+    f"{SITE}/x/Fc1bBw",
+    f"{SITE}/display/ENG/Runbook",
+    "https://example.com/search?q=confluence+pages",
+]
+
+
+def legacy_classify(url: str) -> tuple[str | None, tuple[str, str] | None] | None:
+    """Classify a link the way the traversal did before ``classify_url``."""
+    try:
+        match = re.search(r"/pages/(\d+)(/|$)", url) or re.search(r"[?&]pageId=(\d+)", url)
+        if not match:
+            raise ValueError(url)
+        return match.group(1), None
+    except ValueError:
+        try:
+            match = re.search(r"/display/([^/?#]+)/([^/?#]+)", url)
+            if not match:
+                raise ValueError(url) from None
+            return None, (match.group(1), unquote_plus(match.group(2)))
+        except ValueError:
+            return None
+
+
+def _time(classify, links: list[str], repeat: int) -> tuple[list[float], list]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [classify(link) for link in links]
+        timings.append((time.perf_counter() - start) / len(links))
+    return timings, results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--links", type=int, default=200_000, help="Links classified per run.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per classifier.")
+    args = parser.parse_args()
+
+    links = [LINK_MIX[i % len(LINK_MIX)] for i in range(args.links)]
+    table, table_results = _time(classify_url, links, args.repeat)
+    legacy, legacy_results = _time(legacy_classify, links, args.repeat)
+    for name, timings in (("classify_url", table), ("legacy", legacy)):
+        best, median = min(timings) * 1e9, statistics.median(timings) * 1e9
+        print(f"{name:>12}: best {best:6.0f} ns/link, median {median:6.0f} ns/link")
+    found = sum(result is not None for result in table_results[: len(LINK_MIX)])
+    legacy_found = sum(result is not None for result in legacy_results[: len(LINK_MIX)])
+    print(f"Speedup: {min(legacy) / min(table):.1f}x; page links found in the mix: {found} (legacy: {legacy_found})")
+
+
+if __name__ == "__main__":
+    main()
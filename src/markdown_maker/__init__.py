@@ -0,0 +1,3 @@
+from markdown_maker.api import iter_pages
+
+__all__ = ["iter_pages"]
@@ -0,0 +1,80 @@
+"""Python API for converting Confluence page trees without the CLI.
+
+Functions:
+    iter_pages: Yield converted page records of a page tree as they are produced.
+"""
+
+from collections import deque
+from collections.abc import Iterator
+
+from markdown_maker.clients.confluence_client import ConfluenceClient
+from markdown_maker.clients.confluence_tree_traverser import ConfluenceTreeTraverser
+from markdown_maker.clients.prefetching_client import PrefetchingClient
+from markdown_maker.clients.title_resolver import TitleResolver
+from markdown_maker.converters.cache import ConversionCache
+from markdown_maker.converters.engines import DEFAULT_ENGINE, get_converter
+from markdown_maker.utils.helpers import extract_page_id_from_url
+
+
+def iter_pages(
+    root: str,
+    max_depth: int = 3,
+    workers: int = 1,
+    engine: str = DEFAULT_ENGINE,
+    cache_dir: str | None = None,
+    skip_strikethrough_links: bool = False,
+    client: ConfluenceClient | None = None,
+) -> Iterator[dict]:
+    """Yield the converted pages of a Confluence page tree, in traversal order.
+
+    Uses the same traversal and converters as the CLI, but writes no files:
+    each page is yielded as soon as it is converted, and the next page is only
+    fetched once the caller asks for it.
+
+    Args:
+        root: The root page ID or URL.
+        max_depth: Maximum recursion depth for child and embedded pages.
+        workers: Number of concurrent page fetches. With more than one, the
+            content of upcoming child pages is fetched ahead on a thread pool.
+        engine: The converter engine, one of ``ENGINES``.
+        cache_dir: If set, reuse and store conversions in this cache directory.
+        skip_strikethrough_links: If True, do not follow struck-through links.
+        client: The Confluence client to use. Defaults to one configured from
+            the config files.
+
+    Yields:
+        Dictionaries with the page ``id``, ``title``, ``url``, ``version``,
+        ``depth``, ``parent_id``, ``ancestors`` and ``markdown``.
+    """
+    page_id = root if root.isdigit() else extract_page_id_from_url(root)
+    # Records carry the page ancestors.
+    client = client or ConfluenceClient(workers, content_profile="record")
+    if workers > 1:
+        client = PrefetchingClient(client, workers)
+    records: deque[dict] = deque()
+
+    def handle_page(
+        title: str, page_url: str, markdown: str, depth: int, parent_dir: str | None, info: dict | None = None
+    ) -> str:
+        records.append({**info, "markdown": markdown})
+        return ""
+
+    traverser = ConfluenceTreeTraverser(
+        client=client,
+        max_depth=max_depth,
+        handle_page=handle_page,
+        skip_strikethrough_links=skip_strikethrough_links,
+        cache=ConversionCache(cache_dir, engine) if cache_dir else None,
+        converter=None if engine == DEFAULT_ENGINE else get_converter(engine),
+        title_resolver=TitleResolver(client),
+    )
+    if isinstance(client, PrefetchingClient):
+        client.should_prefetch = traverser.will_fetch
+    root_url = f"https://company.atlassian.net/wiki/pages/viewpage.action?pageId={page_id}"
+    try:
+        for _ in traverser.traverse_steps(page_id, root_url):
+            while records:
+                yield records.popleft()
+    finally:
+        if isinstance(client, PrefetchingClient):
+            client.close()
@@ -0,0 +1,169 @@
+"""Concurrent download of page attachments next to the exported Markdown.
+
+This module provides the AttachmentDownloader class, which lists the
+attachments of each exported page and downloads them on a thread pool into the
+page's output directory, so that images and attachment links in the Markdown
+resolve to local files. A manifest in the output directory remembers the
+attachment ID, version and ETag of every downloaded file, so later runs skip
+unchanged attachments without a request and revalidate the others with
+conditional requests. The entries a run adds are merged into the manifest on
+disk, so that ``--queue`` workers sharing the output directory keep each
+other's entries.
+"""
+
+import json
+import os
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from urllib.parse import quote, unquote
+
+import click
+
+from markdown_maker.clients.confluence_client import ConfluenceClient
+from markdown_maker.utils.helpers import attachment_filename, update_json_file, write_if_changed
+
+ATTACHMENT_MANIFEST_FILENAME = ".markdown_maker_attachments.json"
+
+# Matches absolute and relative Confluence attachment download URLs.
+_DOWNLOAD_URL_RE = re.compile(
+    r"(?:https?://[^\s()<>\"']*?)?/download/attachments/(\d+)/([^\s()<>\"'?#]+)(?:\?[^\s()<>\"']*)?"
+)
+
+
+class AttachmentDownloader:
+    """Downloads page attachments on a thread pool, deduplicated by ID and version."""
+
+    def __init__(self, client: ConfluenceClient, output_dir: str, max_workers: int = 8) -> None:
+        """Start the download pool and load the manifest of an earlier run.
+
+        Args:
+            client: The Confluence client used to list and download attachments.
+            output_dir: Root output directory; the manifest is kept here.
+            max_workers: Number of concurrent downloads.
+        """
+        self.client = client
+        self.output_dir = output_dir
+        self.manifest_path = os.path.join(output_dir, ATTACHMENT_MANIFEST_FILENAME)
+        self._manifest: dict[str, dict] = {}
+        # Manifest entries written in this run, merged into the manifest on disk by close().
+        self._updated: set[str] = set()
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding="utf-8") as f:
+                self._manifest = json.load(f)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="attachment-download")
+        self._lock = threading.Lock()
+        self._futures: list[Future] = []
+        # First destination of each (id, version) fetched in this run, and further copies to make.
+        self._first_paths: dict[tuple[str, int | None], str] = {}
+        self._copies: list[tuple[str, str]] = []
+        self.downloaded = 0
+        self.skipped = 0
+
+    @staticmethod
+    def rewrite_links(markdown: str, page_id: str) -> str:
+        """Point download URLs of the page's own attachments at the local copies.
+
+        Args:
+            markdown: The converted Markdown of the page.
+            page_id: The ID of the page the Markdown belongs to.
+
+        Returns:
+            The Markdown with matching download URLs replaced by the names the
+            attachments are saved under.
+        """
+
+        def local_name(match: re.Match) -> str:
+            if match.group(1) != page_id:
+                return match.group(0)
+            return quote(attachment_filename(unquote(match.group(2))))
+
+        return _DOWNLOAD_URL_RE.sub(local_name, markdown)
+
+    def submit_page(self, page_id: str, page_dir: str) -> None:
+        """Queue the download of a page's attachments into ``page_dir``.
+
+        Args:
+            page_id: The ID of the page whose attachments to download.
+            page_dir: The directory holding the page's Markdown.
+        """
+        self._submit(self._list_page, page_id, page_dir)
+
+    def _submit(self, fn, *args) -> None:
+        with self._lock:
+            self._futures.append(self._executor.submit(fn, *args))
+
+    def _list_page(self, page_id: str, page_dir: str) -> None:
+        try:
+            attachments = self.client.get_attachments(page_id)
+        except RuntimeError as exc:
+            click.echo(f"Could not list attachments of page id {page_id}: {exc}", err=True)
+            return
+        for attachment in attachments:
+            if not attachment.get("download") or not attachment.get("title"):
+                continue
+            path = os.path.join(page_dir, attachment_filename(attachment["title"]))
+            key = (attachment["id"], attachment.get("version"))
+            with self._lock:
+                first = self._first_paths.setdefault(key, path)
+                if first != path:
+                    # Already fetched for another destination in this run; copy it once downloads finish.
+                    self._copies.append((first, path))
+                    continue
+            self._submit(self._download, attachment, path)
+
+    def _download(self, attachment: dict, path: str) -> None:
+        name = os.path.relpath(path, self.output_dir)
+        with self._lock:
+            previous = self._manifest.get(name)
+        if previous and previous.get("id") == attachment["id"] and os.path.exists(path):
+            if previous.get("version") == attachment.get("version"):
+                with self._lock:
+                    self.skipped += 1
+                return
+            etag = previous.get("etag")
+        else:
+            etag = None
+        try:
+            content, etag = self.client.download_attachment(attachment["download"], etag)
+        except RuntimeError as exc:
+            click.echo(f"Could not download attachment '{attachment['title']}': {exc}", err=True)
+            return
+        if content is not None:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            write_if_changed(path, content)
+        with self._lock:
+            self._manifest[name] = {"id": attachment["id"], "version": attachment.get("version"), "etag": etag}
+            self._updated.add(name)
+            if content is None:
+                self.skipped += 1
+            else:
+                self.downloaded += 1
+
+    def close(self) -> None:
+        """Wait for all downloads, make deduplicated copies and save the manifest."""
+        while True:
+            with self._lock:
+                pending = [future for future in self._futures if not future.done()]
+            if not pending:
+                break
+            wait(pending)
+        self._executor.shutdown(wait=True)
+        for source, path in self._copies:
+            if not os.path.exists(source):
+                continue
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(source, "rb") as f:
+                write_if_changed(path, f.read())
+            name = os.path.relpath(path, self.output_dir)
+            self._manifest[name] = self._manifest.get(os.path.relpath(source, self.output_dir), {})
+            self._updated.add(name)
+        self._copies = []
+        if self._updated:
+            updated = {name: self._manifest[name] for name in self._updated}
+            update_json_file(
+                self.manifest_path, lambda manifest: {**(manifest or {}), **updated}, indent=2, sort_keys=True
+            )
+            self._updated = set()
+        for future in self._futures:
+            future.result()
@@ -4,61 +4,320 @@ This module contains the ConfluenceClient class for interacting with the
 Confluence REST API.
 """
 
+from collections.abc import Iterator
+
 from atlassian import Confluence
+from atlassian.errors import ApiNotFoundError, ApiPermissionError
+from requests import HTTPError
 
+from markdown_maker.clients.transport import build_session
 from markdown_maker.utils.config import load_config
 
+# Sustained request rate assumed by ``convert --plan`` unless configured.
+DEFAULT_REQUESTS_PER_SECOND = 5.0
+# Children requested per call when listing child pages, unless configured.
+DEFAULT_CHILD_PAGE_SIZE = 100
+# Expansions requested by each code path, limited to the fields it reads. The
+# ID and title of a page come without any expansion. discovery lists child
+# pages, sync-check tells whether a page changed, conversion fetches a page to
+# convert, and record additionally fetches its ancestors for the outputs that
+# record them (JSONL, the Python API, watch).
+FETCH_PROFILES = {
+    "discovery": "",
+    "sync-check": "version",
+    "conversion": "body.storage,version,space",
+    "record": "body.storage,version,space,ancestors",
+}
+
 
 class ConfluenceClient:
     """Client for interacting with the Confluence REST API using
     atlassian-python-api.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, workers: int = 1, content_profile: str = "conversion") -> None:
         """Initializes the ConfluenceClient with config credentials.
 
         Loads the base URL and authentication credentials from the config.
         Raises an error if required configuration is missing.
+
+        Args:
+            workers: Number of threads sharing this client; the HTTP connection
+                pool is sized to match unless ``http_pool_size`` is configured.
+            content_profile: The fetch profile of ``get_page_content``, one of
+                ``FETCH_PROFILES``. Use ``record`` where page ancestors are
+                needed.
+
+        Raises:
+            ValueError: If ``content_profile`` is not a known profile.
         """
+        if content_profile not in FETCH_PROFILES:
+            raise ValueError(f"Unknown fetch profile '{content_profile}'. Choose one of: {', '.join(FETCH_PROFILES)}.")
+        self.content_profile = content_profile
         config = load_config()
         self.client = Confluence(
             url=config["confluence_base_url"].rstrip("/"),
             username=config["confluence_username"],
             password=config["confluence_api_token"],
             cloud=True,
+            session=build_session(config, workers),
         )
+        self.requests_per_second = float(config.get("requests_per_second", DEFAULT_REQUESTS_PER_SECOND))
+        self.child_page_size = int(config.get("child_page_size", DEFAULT_CHILD_PAGE_SIZE))
 
-    def get_page_content(self, page_id: str) -> dict:
-        """Fetches a page's content from the Confluence REST API.
+    def get_page(self, page_id: str, profile: str) -> dict:
+        """Fetches a page with the expansions of a fetch profile.
 
         Args:
             page_id: The ID of the Confluence page to fetch.
+            profile: One of ``FETCH_PROFILES``.
 
         Returns:
             The JSON response from the API as a dictionary.
 
         Raises:
-            Exception: If the API request fails.
+            ApiPermissionError: If the page is restricted.
+            ApiNotFoundError: If the page does not exist.
+            Exception: If the API request fails otherwise.
         """
-        page = self.client.get_page_by_id(page_id, expand="body.storage,version,ancestors")
+        try:
+            page = self.client.get_page_by_id(page_id, expand=FETCH_PROFILES[profile])
+        except HTTPError as exc:
+            # Only 404s are mapped to ApiError by the library; map restricted pages too.
+            # A 401 means the credentials are invalid, not the page, and aborts the run.
+            status = exc.response.status_code if exc.response is not None else None
+            if status == 403:
+                raise ApiPermissionError(f"Page with id {page_id} is restricted.", reason=exc) from exc
+            if status == 410:
+                raise ApiNotFoundError(f"Page with id {page_id} not found.", reason=exc) from exc
+            raise
         if not page:
             raise ValueError(f"Page with id {page_id} not found.")
         return page
 
-    def get_child_pages(self, page_id: str) -> list:
-        """Fetches the direct child pages of a given Confluence page.
+    def get_page_content(self, page_id: str) -> dict:
+        """Fetches a page's content with the client's ``content_profile``.
 
         Args:
-            page_id: The ID of the parent Confluence page.
+            page_id: The ID of the Confluence page to fetch.
+
+        Returns:
+            The JSON response from the API as a dictionary.
+
+        Raises:
+            ApiPermissionError: If the page is restricted.
+            ApiNotFoundError: If the page does not exist.
+            Exception: If the API request fails otherwise.
+        """
+        return self.get_page(page_id, self.content_profile)
+
+    def get_page_metadata(self, page_id: str) -> dict:
+        """Fetches a page's title and version without its body.
+
+        Args:
+            page_id: The ID of the Confluence page to fetch.
 
         Returns:
-            A list of dictionaries, each representing a child page.
+            The JSON response from the API as a dictionary.
 
         Raises:
             Exception: If the API request fails.
         """
+        return self.get_page(page_id, "sync-check")
+
+    def get_child_pages(self, page_id: str, page_size: int | None = None) -> Iterator[dict]:
+        """Yields the direct child pages of a given Confluence page, one API page at a time.
+
+        Only the fields the traversal needs are requested and returned, and the
+        next batch is requested only once the previous one has been consumed.
+
+        Args:
+            page_id: The ID of the parent Confluence page.
+            page_size: Number of children requested per API call. Defaults to
+                the ``child_page_size`` setting.
+
+        Yields:
+            Dictionaries with the ``id`` and ``title`` of each child page.
+
+        Raises:
+            RuntimeError: If an API request fails.
+        """
+        params = {"start": 0, "limit": page_size or self.child_page_size}
+        if FETCH_PROFILES["discovery"]:
+            params["expand"] = FETCH_PROFILES["discovery"]
+        while True:
+            try:
+                response = self.client.get(f"rest/api/content/{page_id}/child/page", params=params)
+            except Exception as exc:
+                raise RuntimeError(f"Failed to fetch child pages: {exc}") from exc
+            results = (response or {}).get("results", [])
+            for child in results:
+                yield {"id": child.get("id"), "title": child.get("title")}
+            if not results or not response.get("_links", {}).get("next"):
+                return
+            params["start"] += len(results)
+
+    def find_page_ids_by_title(self, refs: list[tuple[str, str]]) -> dict[tuple[str, str], str]:
+        """Resolves many ``(space_key, title)`` pairs with one paginated CQL search.
+
+        Args:
+            refs: Pairs of space key and page title. An empty space key matches
+                the title in any space.
+
+        Returns:
+            A dictionary mapping each resolved pair to its page ID. Pairs with
+            no matching page are omitted.
+
+        Raises:
+            RuntimeError: If the search request fails.
+        """
+        if not refs:
+            return {}
+        clauses = [
+            f'(space="{_cql_quote(space)}" AND title="{_cql_quote(title)}")'
+            if space
+            else f'title="{_cql_quote(title)}"'
+            for space, title in refs
+        ]
+        cql = f"type=page AND ({' OR '.join(clauses)})"
+        found: dict[tuple[str, str], str] = {}
+        # The same title may exist in many spaces, so the results can outnumber the references.
+        for content in self._search(cql, max(len(refs), 25), "content.space", "Failed to resolve page titles"):
+            title = content.get("title")
+            space = content.get("space", {}).get("key", "")
+            found.setdefault((space, title), content.get("id"))
+            found.setdefault(("", title), content.get("id"))
+        return {ref: found[ref] for ref in refs if ref in found}
+
+    def find_changed_pages(self, root_id: str, minutes: int, page_size: int = 100) -> list[dict]:
+        """Lists a page and its descendants modified within the last ``minutes``.
+
+        Args:
+            root_id: The ID of the root page of the watched tree.
+            minutes: Size of the look-back window. CQL's relative ``now()``
+                keeps the window independent of the user's time zone.
+            page_size: Number of search results requested per API call.
+
+        Returns:
+            A list of dictionaries with the ``id``, ``title`` and ``version``
+            of each changed page, least recently modified first.
+
+        Raises:
+            RuntimeError: If the search request fails.
+        """
+        cql = (
+            f"type=page AND (id={root_id} OR ancestor={root_id}) "
+            f'AND lastmodified > now("-{minutes}m") ORDER BY lastmodified ASC'
+        )
+        error = "Failed to search for changed pages"
+        return [_page_summary(content) for content in self._search(cql, page_size, "content.version", error)]
+
+    def get_page_versions(self, page_ids: list[str], batch_size: int = 100) -> dict[str, int | None]:
+        """Looks up the current version of many pages with batched CQL searches.
+
+        Deleted, trashed and restricted pages are not returned by the search.
+
+        Args:
+            page_ids: The IDs of the pages to look up.
+            batch_size: Number of page IDs per search, which keeps the CQL
+                query within the length the API accepts.
+
+        Returns:
+            A dictionary mapping the ID of each page found to its version.
+
+        Raises:
+            RuntimeError: If a search request fails.
+        """
+        versions: dict[str, int | None] = {}
+        for i in range(0, len(page_ids), batch_size):
+            cql = f"type=page AND id in ({','.join(page_ids[i : i + batch_size])})"
+            for content in self._search(cql, batch_size, "content.version", "Failed to look up page versions"):
+                versions[content.get("id")] = content.get("version", {}).get("number")
+        return versions
+
+    def _search(self, cql: str, page_size: int, expand: str, error: str) -> list[dict]:
+        """Runs a CQL search, following ``_links.next``, and returns the content of each result."""
+        contents = []
+        start = 0
+        while True:
+            try:
+                response = self.client.cql(cql, start=start, limit=page_size, expand=expand)
+            except Exception as exc:
+                raise RuntimeError(f"{error}: {exc}") from exc
+            results = (response or {}).get("results", [])
+            contents.extend(result.get("content", {}) for result in results)
+            if not results or not response.get("_links", {}).get("next"):
+                return contents
+            start += len(results)
+
+    def get_attachments(self, page_id: str, page_size: int = 100) -> list[dict]:
+        """Fetches the attachments of a Confluence page.
+
+        Args:
+            page_id: The ID of the Confluence page.
+            page_size: Number of attachments requested per API call.
+
+        Returns:
+            A list of dictionaries with the ``id``, ``title``, ``version`` and
+            ``download`` link of each attachment.
+
+        Raises:
+            RuntimeError: If the API request fails.
+        """
+        attachments = []
+        start = 0
+        while True:
+            try:
+                response = self.client.get_attachments_from_content(
+                    page_id, start=start, limit=page_size, expand="version"
+                )
+            except Exception as exc:
+                raise RuntimeError(f"Failed to fetch attachments: {exc}") from exc
+            results = (response or {}).get("results", [])
+            for result in results:
+                attachments.append(
+                    {
+                        "id": result.get("id"),
+                        "title": result.get("title"),
+                        "version": result.get("version", {}).get("number"),
+                        "download": result.get("_links", {}).get("download"),
+                    }
+                )
+            if not results or not response.get("_links", {}).get("next"):
+                return attachments
+            start += len(results)
+
+    def download_attachment(self, download_link: str, etag: str | None = None) -> tuple[bytes | None, str | None]:
+        """Downloads an attachment, using a conditional request when an ETag is known.
+
+        Args:
+            download_link: The attachment's download link, relative to the base URL.
+            etag: The ETag of a previously downloaded copy, if any.
+
+        Returns:
+            A ``(content, etag)`` tuple. ``content`` is None if the server
+            reports that the previously downloaded copy is still current.
+
+        Raises:
+            RuntimeError: If the download fails.
+        """
+        headers = {"If-None-Match": etag} if etag else {}
         try:
-            children = self.client.get_child_pages(page_id)
+            response = self.client.session.get(
+                f"{self.client.url}{download_link}", headers=headers, timeout=self.client.timeout
+            )
+            if response.status_code == 304:
+                return None, etag
+            response.raise_for_status()
         except Exception as exc:
-            raise RuntimeError(f"Failed to fetch child pages: {exc}") from exc
-        return list(children) if children is not None else []
+            raise RuntimeError(f"Failed to download attachment {download_link}: {exc}") from exc
+        return response.content, response.headers.get("ETag")
+
+
+def _page_summary(content: dict) -> dict:
+    return {"id": content.get("id"), "title": content.get("title"), "version": content.get("version", {}).get("number")}
+
+
+def _cql_quote(value: str) -> str:
+    """Escape a value for use inside a double-quoted CQL string."""
+    return value.replace("\\", "\\\\").replace('"', '\\"')
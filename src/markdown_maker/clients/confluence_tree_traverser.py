@@ -1,12 +1,25 @@
-from collections.abc import Callable
+import itertools
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from typing import NamedTuple
 
 import click
 from atlassian.errors import ApiError
 from bs4 import BeautifulSoup, Tag
 
+from markdown_maker.clients.attachment_downloader import AttachmentDownloader
 from markdown_maker.clients.confluence_client import ConfluenceClient
+from markdown_maker.clients.negative_cache import NegativeCache, is_inaccessible
+from markdown_maker.clients.title_resolver import TitleResolver
+from markdown_maker.converters.cache import ConversionCache
 from markdown_maker.converters.html_to_markdown import convert_html_to_markdown
-from markdown_maker.utils.helpers import extract_page_id_from_url
+from markdown_maker.converters.streaming import StreamingConverter
+from markdown_maker.utils.helpers import classify_url, extract_page_id_from_url, release_soup
+from markdown_maker.utils.journal import ExportJournal
+from markdown_maker.utils.work_queue import WorkQueue
+
+TRAVERSAL_ORDERS = ("depth-first", "breadth-first")
 
 
 class ConfluenceTreeTraverser:
@@ -16,18 +29,50 @@ class ConfluenceTreeTraverser:
         self,
         client: ConfluenceClient,
         max_depth: int,
-        handle_page: Callable[[str, str, str, int, str | None], str],
+        handle_page: Callable[[str, str, str | Iterable[str], int, str | None, dict], str],
         parent_context: str = "",
         parent_dir: str | None = None,
         skip_strikethrough_links: bool = False,
+        journal: ExportJournal | None = None,
+        cache: ConversionCache | None = None,
+        converter: Callable[..., str] | None = None,
+        title_resolver: TitleResolver | None = None,
+        attachments: AttachmentDownloader | None = None,
+        order: str = "depth-first",
+        max_pages: int | None = None,
+        deadline: float | None = None,
+        stream_threshold: int | None = None,
+        negative_cache: NegativeCache | None = None,
     ):
         self.client = client
         self.max_depth = max_depth
         self.handle_page = handle_page
         self.parent_context = parent_context
         self.parent_dir = parent_dir
-        self.visited: set[str] = set()
+        # Shallowest depth each page has been reached at, and the frontier found on it.
+        self.visited: dict[str, int] = {}
+        self._frontiers: dict[str, dict] = {}
         self.skip_strikethrough_links = skip_strikethrough_links
+        self.journal = journal
+        self.cache = cache
+        self.converter = converter
+        self.title_resolver = title_resolver
+        self.attachments = attachments
+        if order not in TRAVERSAL_ORDERS:
+            raise ValueError(f"Unknown traversal order '{order}'. Choose one of: {', '.join(TRAVERSAL_ORDERS)}.")
+        self.order = order
+        # Budgets: stop before fetching a new page once max_pages have been
+        # written or time.monotonic() passes the deadline.
+        self.max_pages = max_pages
+        self.deadline = deadline
+        self.pages_written = 0
+        self.stop_reason: str | None = None
+        # Pages whose storage body has at least this many characters are
+        # converted by the streaming converter and handed to handle_page as an
+        # iterator of Markdown chunks, bypassing the converter and the cache.
+        self.stream_threshold = stream_threshold
+        # Pages known to be restricted or deleted are reported without a request.
+        self.negative_cache = negative_cache
 
     def traverse(
         self,
@@ -40,20 +85,285 @@ class ConfluenceTreeTraverser:
         parent_id: str | None = None,
         parent_dir: str | None = None,
     ) -> None:
-        if current_depth > self.max_depth or pid in self.visited:
-            return
-        self.visited.add(pid)
+        """Export ``pid`` and the pages reachable from it, in the configured order.
+
+        Stops early, leaving ``stop_reason`` set, once the page or time budget
+        is used up. Pages written until then are complete.
+        """
+        for _ in self.traverse_steps(
+            pid, page_url, current_depth, link_type, child_title, parent_title, parent_id, parent_dir
+        ):
+            pass
+
+    def traverse_steps(
+        self,
+        pid: str,
+        page_url: str,
+        current_depth: int = 1,
+        link_type: str = "root",
+        child_title: str | None = None,
+        parent_title: str | None = None,
+        parent_id: str | None = None,
+        parent_dir: str | None = None,
+    ) -> Iterator[None]:
+        """Like ``traverse``, but yield after each visit so the caller can interleave work.
+
+        Closing the generator stops the traversal between two visits.
+        """
+        # Each pending entry yields the visits of one page's frontier. Frontiers
+        # are consumed lazily, so a page with thousands of children is
+        # descended into while its child listing is still being paged through.
+        root = _Visit(pid, page_url, current_depth, link_type, child_title, parent_title, parent_id, parent_dir)
+        pending: deque[Iterator[_Visit]] = deque([iter([root])])
+        breadth_first = self.order == "breadth-first"
+        while pending and self.stop_reason is None:
+            visit = next(pending[0] if breadth_first else pending[-1], None)
+            if visit is None:
+                if breadth_first:
+                    pending.popleft()
+                else:
+                    pending.pop()
+                continue
+            frontier = self._visit(visit)
+            if frontier is not None:
+                pending.append(frontier)
+            yield
+
+    def traverse_queue(
+        self, queue: WorkQueue, worker_id: str, pid: str, page_url: str, poll_interval: float = 1.0
+    ) -> None:
+        """Export pages claimed from a work queue shared with other worker processes.
+
+        The root is queued unless the queue already knows it. The pages found on
+        each exported page are added to the queue, which drops those already
+        known to any worker. Returns once every queued page is done, or when a
+        budget runs out; the page in hand is then returned to the queue.
+
+        Args:
+            queue: The shared work queue.
+            worker_id: Identifies this worker's claims.
+            pid: The root page ID.
+            page_url: The root page URL.
+            poll_interval: Seconds to wait for other workers when nothing can be claimed.
+        """
+        queue.add([_Visit(pid, page_url, 1, "root", None, None, None, None)])
+        while self.stop_reason is None:
+            claimed = queue.claim(worker_id)
+            if claimed is None:
+                if queue.is_finished():
+                    return
+                # Other workers hold the remaining pages and may still find more.
+                time.sleep(poll_interval)
+                continue
+            visit = _Visit(*claimed)
+            try:
+                frontier = self._visit(visit)
+                if self.stop_reason is not None:
+                    queue.release(visit.pid)
+                    return
+                visits = (v for v in frontier or () if v.depth <= self.max_depth)
+                for batch in itertools.batched(visits, 100):
+                    queue.add(list(batch))
+            except BaseException:
+                queue.release(visit.pid)
+                raise
+            queue.complete(visit.pid)
+
+    def will_fetch(self, pid: str) -> bool:
+        """Return whether visiting a newly listed child would fetch its content.
+
+        Pages visited already, written by an interrupted run or known to be
+        inaccessible are not fetched again; a ``PrefetchingClient`` skips them.
+        """
+        if pid in self.visited or (self.journal is not None and self.journal.get(pid) is not None):
+            return False
+        return self.negative_cache is None or self.negative_cache.get(pid) is None
+
+    def _budget_exhausted(self) -> bool:
+        if self.max_pages is not None and self.pages_written >= self.max_pages:
+            self.stop_reason = f"page budget of {self.max_pages} reached"
+        elif self.deadline is not None and time.monotonic() >= self.deadline:
+            self.stop_reason = "deadline reached"
+        return self.stop_reason is not None
+
+    def _visit(self, visit: "_Visit") -> Iterator["_Visit"] | None:
+        """Export one page and return the visits for its children and links."""
+        pid, page_url, current_depth, link_type, child_title, parent_title, parent_id, parent_dir = visit
+        best_depth = self.visited.get(pid)
+        if current_depth > self.max_depth or (best_depth is not None and best_depth <= current_depth):
+            return None
+        descend = current_depth < self.max_depth
+        if best_depth is not None:
+            if pid not in self._frontiers:
+                # Failed when reached deeper; the error has been reported already.
+                return None
+            # Reached deeper before, so written already: expand the levels that were cut off.
+            self.visited[pid] = current_depth
+            return self._expand_known(pid, current_depth) if descend else None
+        entry = self.journal.get(pid) if self.journal else None
+        if entry is not None and (entry["expanded"] or not descend or "found_links" in entry):
+            # Already written by an interrupted run: replay its frontier without refetching.
+            self.visited[pid] = current_depth
+            self._frontiers[pid] = entry
+            if self.attachments:
+                self.attachments.submit_page(pid, entry["page_dir"])
+            if not descend:
+                return None
+            return self._expand_known(pid, current_depth)
+        if self._budget_exhausted():
+            return None
+        self.visited[pid] = current_depth
+        known_error = self.negative_cache.get(pid) if self.negative_cache else None
+        if known_error is not None:
+            reason = f"{known_error} (cached, not fetched again)"
+            self._handle_error(reason, link_type, pid, page_url, current_depth, child_title, parent_title, parent_id)
+            return None
         try:
             page = self.client.get_page_content(pid)
         except ApiError as exc:
+            if self.negative_cache and is_inaccessible(exc):
+                self.negative_cache.add(pid, str(exc))
             self._handle_error(exc, link_type, pid, page_url, current_depth, child_title, parent_title, parent_id)
-            return
-        html = page.get("body", {}).get("storage", {}).get("value", "")
-        markdown = convert_html_to_markdown(html)
+            return None
         title = page.get("title", "confluence_page")
-        page_dir = self.handle_page(title, page_url, markdown, current_depth, parent_dir or self.parent_dir)
-        self._traverse_children(pid, title, page_dir, current_depth)
-        self._traverse_embedded_links(html, page_dir, current_depth)
+        html = page.get("body", {}).get("storage", {}).get("value", "")
+        space_key = page.get("space", {}).get("key", "")
+        info = self._page_info(page, pid, title, page_url, current_depth, parent_id, link_type)
+        # Drop the API response and parse trees before moving on so that only
+        # ids and titles stay alive in the pending visits.
+        del page
+        streaming = self._streaming_converter(html, space_key)
+        if streaming is not None:
+            markdown = streaming.iter_markdown(html)
+            if self.attachments:
+                markdown = (self.attachments.rewrite_links(chunk, pid) for chunk in markdown)
+        else:
+            # Links of pages at the depth limit are kept unresolved, for a later shallower visit.
+            found = self._find_links(html, space_key)
+            embedded_links = self._resolve_links(found) if descend else []
+            info["links"] = [link_id for link_id, _ in embedded_links]
+            if self.cache:
+                markdown = self.cache.convert(html, space_key)
+            elif self.converter:
+                markdown = self.converter(html, space_key=space_key)
+            else:
+                markdown = convert_html_to_markdown(html)
+            if self.attachments:
+                markdown = self.attachments.rewrite_links(markdown, pid)
+        del html
+        page_dir = self.handle_page(title, page_url, markdown, current_depth, parent_dir or self.parent_dir, info)
+        del markdown
+        if streaming is not None:
+            # The links are complete once the handler has consumed the Markdown.
+            found = streaming.links
+            embedded_links = self._resolve_links(found) if descend else []
+            info["links"] = [link_id for link_id, _ in embedded_links]
+        self.pages_written += 1
+        if self.attachments:
+            self.attachments.submit_page(pid, page_dir)
+        # Children are listed lazily by the frontier; the journal record is
+        # completed once the listing has been consumed.
+        entry = {
+            "title": title,
+            "depth": current_depth,
+            "page_dir": page_dir,
+            "children": None if descend else [],
+            "links": embedded_links,
+            "expanded": descend,
+            "found_links": None if descend else found,
+        }
+        self._frontiers[pid] = entry
+        if self.journal:
+            self.journal.record_page(
+                pid, title, current_depth, page_dir, entry["children"], embedded_links, descend, entry["found_links"]
+            )
+        if not descend:
+            return None
+        return self._frontier_visits(entry, pid, current_depth)
+
+    def _expand_known(self, pid: str, current_depth: int) -> Iterator["_Visit"]:
+        """Return the frontier of an already written page, visited from a shallower depth.
+
+        The cached children and links are reused. Pages written at the depth
+        limit have no frontier yet; their links were found when they were
+        converted and are resolved now, and their children are listed lazily.
+        The page is neither fetched nor written again.
+        """
+        entry = self._frontiers[pid]
+        if not entry["expanded"]:
+            found = entry.pop("found_links", None)
+            if found is None:
+                # Journaled without its links by an earlier version: fetch the body to find them.
+                try:
+                    page = self.client.get_page_content(pid)
+                except ApiError:
+                    page = {}
+                html = page.get("body", {}).get("storage", {}).get("value", "")
+                found = self._find_links(html, page.get("space", {}).get("key", "")) if html else []
+                del page, html
+            # Journal records hold references as lists; the title resolver keys them by tuple.
+            found = [(page_id, tuple(ref) if ref else None, href) for page_id, ref, href in found]
+            entry.update(children=None, links=self._resolve_links(found), expanded=True)
+        return self._frontier_visits(entry, pid, current_depth)
+
+    def _frontier_visits(self, entry: dict, pid: str, current_depth: int) -> Iterator["_Visit"]:
+        """Yield visits for a page's children followed by its embedded links."""
+        children = entry["children"] if entry["children"] is not None else self._list_children(pid, entry)
+        for child_id, child_title in children:
+            yield _Visit(
+                child_id,
+                f"https://company.atlassian.net/wiki/pages/viewpage.action?pageId={child_id}",
+                current_depth + 1,
+                "child",
+                child_title,
+                entry["title"],
+                pid,
+                entry["page_dir"],
+            )
+        for embedded_page_id, href in entry["links"]:
+            yield _Visit(embedded_page_id, href, current_depth + 1, "embedded", None, None, pid, entry["page_dir"])
+
+    def _list_children(self, pid: str, entry: dict) -> Iterator[tuple[str, str]]:
+        """Yield a page's children as they are listed, then store and journal the full list.
+
+        If the traversal stops before the listing is consumed, the children stay
+        unknown and are listed again by a later expansion or resumed run. So do
+        they if the listing fails part way, after the children listed so far
+        have been visited.
+        """
+        children = []
+        try:
+            for child in self._fetch_children(pid):
+                children.append(child)
+                yield child
+        except Exception as exc:
+            click.echo(f"Could not list the children of '{entry['title']}' (id {pid}): {exc}", err=True)
+            return
+        entry["children"] = children
+        if self.journal:
+            self.journal.record_page(
+                pid, entry["title"], entry["depth"], entry["page_dir"], children, entry["links"], entry["expanded"]
+            )
+
+    @staticmethod
+    def _page_info(
+        page: dict, pid: str, title: str, page_url: str, depth: int, parent_id: str | None, link_type: str
+    ) -> dict:
+        """Return the metadata passed to page handlers alongside the Markdown.
+
+        ``links`` is added once the page's embedded links are extracted; it is
+        empty for pages at the depth limit, whose links are not followed.
+        """
+        return {
+            "id": pid,
+            "title": title,
+            "url": page_url,
+            "version": page.get("version", {}).get("number"),
+            "depth": depth,
+            "parent_id": parent_id,
+            "link_type": link_type,
+            "ancestors": [{"id": a.get("id"), "title": a.get("title")} for a in page.get("ancestors", [])],
+        }
 
     def _handle_error(self, exc, link_type, pid, page_url, current_depth, child_title, parent_title, parent_id):
         if link_type == "child":
@@ -72,56 +382,86 @@ class ConfluenceTreeTraverser:
             context = self.parent_context or f"page id {pid}"
             click.echo(f"Could not access {context}: {exc}", err=True)
 
-    def _traverse_children(self, pid, title, page_dir, current_depth):
-        try:
-            children = self.client.get_child_pages(pid)
-        except Exception:
-            children = []
-        for child in children:
-            child_id = child.get("id")
-            child_title = child.get("title", "unknown")
-            child_url = f"https://company.atlassian.net/wiki/pages/viewpage.action?pageId={child_id}"
-            self.traverse(
-                child_id,
-                child_url,
-                current_depth + 1,
-                link_type="child",
-                child_title=child_title,
-                parent_title=title,
-                parent_id=pid,
-                parent_dir=page_dir,
-            )
+    def _fetch_children(self, pid: str) -> Iterator[tuple[str, str]]:
+        """Yield ``(id, title)`` pairs for the children of a page, page by page."""
+        for child in self.client.get_child_pages(pid):
+            yield child.get("id"), child.get("title", "unknown")
 
-    def _traverse_embedded_links(self, html, page_dir, current_depth):
+    def _streaming_converter(self, html: str, space_key: str) -> StreamingConverter | None:
+        """Return a streaming converter for pages at or above the stream threshold."""
+        if self.stream_threshold is None or len(html) < self.stream_threshold:
+            return None
+        return StreamingConverter(
+            space_key, self.skip_strikethrough_links, local_attachments=self.attachments is not None
+        )
+
+    def _find_links(self, html: str, space_key: str = "") -> list[tuple[str | None, tuple[str, str] | None, str]]:
+        """Return the Confluence links in ``html``, without any request.
+
+        Links by ID are read directly. Links by title, either ``ac:link``
+        elements or ``/display/SPACE/Title`` URLs, are returned as
+        ``(space, title)`` references for ``_resolve_links``.
+        """
         soup = BeautifulSoup(html, "html.parser")
-        for a in soup.find_all("a"):
-            if isinstance(a, Tag):
-                href = a.get("href")
-                if not isinstance(href, str):
-                    continue
-                # Skip if struck through and flag is set
-                if self.skip_strikethrough_links:
-                    el = a
-                    is_struck = False
-                    while el is not None:
-                        if el.name in {"s", "strike"}:
-                            is_struck = True
-                            break
-                        style = el.get("style", "")
-                        if isinstance(style, str) and "line-through" in style:
-                            is_struck = True
-                            break
-                        el = el.parent if hasattr(el, "parent") else None
-                    if is_struck:
-                        continue
-                try:
-                    embedded_page_id = extract_page_id_from_url(href)
-                except ValueError:
+        # Entries are (page_id, None, href) or (None, (space, title), href), in document order.
+        found: list[tuple[str | None, tuple[str, str] | None, str]] = []
+        for el in soup.find_all(["a", "ac:link"]):
+            if not isinstance(el, Tag):
+                continue
+            # Skip if struck through and flag is set
+            if self.skip_strikethrough_links and self._is_struck(el):
+                continue
+            if el.name == "ac:link":
+                target = el.find("ri:page", recursive=False)
+                if isinstance(target, Tag) and target.get("ri:content-title"):
+                    ref = (target.get("ri:space-key") or space_key, target.get("ri:content-title"))
+                    found.append((None, ref, ""))
+                continue
+            href = el.get("href")
+            if not isinstance(href, str):
+                continue
+            link = classify_url(href)
+            if link is not None:
+                found.append((*link, href))
+        # The tree is full of parent/child cycles; break them now instead of
+        # waiting for the cyclic garbage collector.
+        release_soup(soup)
+        return found
+
+    def _resolve_links(self, found: list[tuple[str | None, tuple[str, str] | None, str]]) -> list[tuple[str, str]]:
+        """Return ``(page_id, href)`` pairs for found links, resolving links by title in one batch."""
+        refs = [ref for _, ref, _ in found if ref is not None]
+        resolved = self.title_resolver.resolve(refs) if refs and self.title_resolver else {}
+        links = []
+        for page_id, ref, href in found:
+            if ref is not None:
+                page_id = resolved.get(ref)
+                if page_id is None:
                     continue
-                self.traverse(
-                    embedded_page_id,
-                    href,
-                    current_depth + 1,
-                    link_type="embedded",
-                    parent_dir=page_dir,
-                )
+                href = href or f"https://company.atlassian.net/wiki/pages/viewpage.action?pageId={page_id}"
+            links.append((page_id, href))
+        return links
+
+    @staticmethod
+    def _is_struck(el: Tag) -> bool:
+        while el is not None:
+            if el.name in {"s", "strike"}:
+                return True
+            style = el.get("style", "")
+            if isinstance(style, str) and "line-through" in style:
+                return True
+            el = el.parent if hasattr(el, "parent") else None
+        return False
+
+
+class _Visit(NamedTuple):
+    """A pending page visit: the page, how it was reached and where its output goes."""
+
+    pid: str
+    page_url: str
+    depth: int
+    link_type: str
+    child_title: str | None
+    parent_title: str | None
+    parent_id: str | None
+    parent_dir: str | None
@@ -0,0 +1,232 @@
+"""Watch mode that keeps a multi-file export up to date.
+
+This module provides the ExportWatcher class. It exports a page tree once and
+then polls a CQL change feed for pages below the root modified since the last
+poll, reconverting only those pages with the same long-lived client. Every
+exported page, including pages reached through embedded links outside the
+root's tree, is also looked up by ID on each poll, so that its changes are
+picked up and its files are removed once it is deleted. The location, depth and
+version of every exported page are kept in a state file in the output
+directory, so a restarted watcher continues from its last poll.
+"""
+
+import json
+import math
+import os
+import time
+from collections.abc import Callable
+
+import click
+from atlassian.errors import ApiError
+from requests import RequestException
+
+from markdown_maker.clients.confluence_client import ConfluenceClient
+from markdown_maker.clients.confluence_tree_traverser import ConfluenceTreeTraverser
+from markdown_maker.converters.engines import get_converter
+from markdown_maker.utils.handlers import make_handle_page_multi
+from markdown_maker.utils.helpers import write_if_changed
+
+WATCH_STATE_FILENAME = ".markdown_maker_watch.json"
+# Network, timeout and HTTP errors; the watcher logs them and retries on its next poll.
+TRANSIENT_ERRORS = (RequestException, ConnectionError, TimeoutError)
+
+
+class ExportWatcher:
+    """Keeps the export of one page tree fresh by reconverting changed pages."""
+
+    def __init__(
+        self,
+        client: ConfluenceClient,
+        page_id: str,
+        output_dir: str,
+        max_depth: int,
+        converter: Callable[..., str] | None = None,
+        overlap: float = 120.0,
+    ) -> None:
+        """Initialize the watcher, loading the state of an earlier run.
+
+        Args:
+            client: The Confluence client, kept for the lifetime of the watcher.
+            page_id: The root page ID of the watched tree.
+            output_dir: The output directory of the multi-file export.
+            max_depth: Maximum depth of exported pages below the root.
+            converter: Conversion function, as returned by ``get_converter``;
+                defaults to markdownify.
+            overlap: Seconds added to each look-back window so that pages
+                indexed late by the search are not missed.
+
+        Raises:
+            ValueError: If the state file belongs to a different root page.
+        """
+        self.client = client
+        self.page_id = page_id
+        self.output_dir = output_dir
+        self.max_depth = max_depth
+        self.converter = converter or get_converter()
+        self.overlap = overlap
+        self.state_path = os.path.join(output_dir, WATCH_STATE_FILENAME)
+        self.checkpoint: float | None = None
+        # Page ID -> {"page_dir": relative directory, "depth": int, "version": int | None}
+        self.pages: dict[str, dict] = {}
+        if os.path.exists(self.state_path):
+            with open(self.state_path, encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("root") != page_id:
+                raise ValueError(
+                    f"Watch state at {self.state_path} belongs to page {state.get('root')}, not {page_id}."
+                )
+            self.checkpoint = state["checkpoint"]
+            self.pages = state["pages"]
+        self._handle_page = make_handle_page_multi(output_dir)
+
+    def save(self) -> None:
+        """Persist the checkpoint and the exported pages."""
+        state = {"root": self.page_id, "checkpoint": self.checkpoint, "pages": self.pages}
+        write_if_changed(self.state_path, json.dumps(state, indent=2, sort_keys=True))
+
+    def initial_export(self) -> int:
+        """Export the whole tree and start the change feed from now.
+
+        Returns:
+            The number of pages written.
+        """
+        started = time.time()
+
+        def handle_page(title, page_url, markdown, depth, parent_dir, info=None):
+            page_dir = self._handle_page(title, page_url, markdown, depth, parent_dir, info)
+            self._remember(info["id"], page_dir, depth, info.get("version"))
+            return page_dir
+
+        traverser = ConfluenceTreeTraverser(
+            client=self.client,
+            max_depth=self.max_depth,
+            handle_page=handle_page,
+            converter=self.converter,
+        )
+        traverser.traverse(
+            self.page_id, f"https://company.atlassian.net/wiki/pages/viewpage.action?pageId={self.page_id}"
+        )
+        self.checkpoint = started
+        self.save()
+        return traverser.pages_written
+
+    def poll(self) -> int:
+        """Reconvert the pages changed since the last poll and remove deleted pages.
+
+        New and changed pages below the root come from the change feed. The
+        versions of all exported pages are looked up as well, which covers
+        pages outside the root's tree; an exported page that can no longer be
+        found is removed once fetching it confirms that it is gone.
+
+        The checkpoint only advances if no page failed with a network or HTTP
+        error, so that the next poll retries those pages.
+
+        Returns:
+            The number of pages written.
+        """
+        started = time.time()
+        minutes = max(1, math.ceil((started - self.checkpoint + self.overlap) / 60))
+        changes = {change["id"]: change["version"] for change in self.client.find_changed_pages(self.page_id, minutes)}
+        versions = self.client.get_page_versions(list(self.pages))
+        missing = [pid for pid in self.pages if pid not in versions]
+        for pid, version in versions.items():
+            changes.setdefault(pid, version)
+        written = 0
+        failed = False
+        for pid, version in changes.items():
+            known = self.pages.get(pid)
+            if known is not None and version is not None and known["version"] == version:
+                continue
+            try:
+                written += self._update_page(pid)
+            except TRANSIENT_ERRORS as exc:
+                click.echo(f"Could not update changed page id {pid}: {exc}", err=True)
+                failed = True
+        for pid in missing:
+            try:
+                self.client.get_page_metadata(pid)
+            except (ApiError, ValueError):
+                self._remove_page(pid)
+            except TRANSIENT_ERRORS as exc:
+                click.echo(f"Could not check missing page id {pid}: {exc}", err=True)
+                failed = True
+            # Otherwise the page exists but is not searchable yet; the next poll looks again.
+        if not failed:
+            # Otherwise the next poll covers this window again; pages updated now are skipped by version.
+            self.checkpoint = started
+        self.save()
+        return written
+
+    def _update_page(self, pid: str) -> int:
+        try:
+            page = self.client.get_page_content(pid)
+        except (ApiError, ValueError) as exc:
+            click.echo(f"Could not access changed page id {pid}: {exc}", err=True)
+            return 0
+        title = page.get("title", "confluence_page")
+        version = page.get("version", {}).get("number")
+        html = page.get("body", {}).get("storage", {}).get("value", "")
+        markdown = self.converter(html, space_key=page.get("space", {}).get("key", ""))
+        known = self.pages.get(pid)
+        if known is not None:
+            # Keep the page where it was exported, even if it was renamed.
+            page_dir = os.path.join(self.output_dir, known["page_dir"])
+            os.makedirs(page_dir, exist_ok=True)
+            write_if_changed(os.path.join(page_dir, "index.md"), markdown)
+            known["version"] = version
+            return 1
+        # A new page: place it below its closest exported ancestor.
+        for ancestor in reversed(page.get("ancestors", [])):
+            parent = self.pages.get(ancestor.get("id"))
+            if parent is None:
+                continue
+            depth = parent["depth"] + 1
+            if depth > self.max_depth:
+                return 0
+            page_url = f"https://company.atlassian.net/wiki/pages/viewpage.action?pageId={pid}"
+            parent_dir = os.path.join(self.output_dir, parent["page_dir"])
+            page_dir = self._handle_page(title, page_url, markdown, depth, parent_dir, None)
+            self._remember(pid, page_dir, depth, version)
+            return 1
+        return 0
+
+    def _remove_page(self, pid: str) -> None:
+        """Delete the Markdown file of a page that no longer exists and forget the page."""
+        page_dir = os.path.join(self.output_dir, self.pages.pop(pid)["page_dir"])
+        index = os.path.join(page_dir, "index.md")
+        if os.path.exists(index):
+            os.remove(index)
+        try:
+            # Child pages and attachments keep the directory in place.
+            os.rmdir(page_dir)
+        except OSError:
+            pass
+        click.echo(f"Removed page id {pid}, which was deleted or is no longer accessible.")
+
+    def _remember(self, pid: str, page_dir: str, depth: int, version: int | None) -> None:
+        self.pages[pid] = {"page_dir": os.path.relpath(page_dir, self.output_dir), "depth": depth, "version": version}
+
+    def run(self, interval: float, once: bool = False) -> None:
+        """Export the tree if needed, then poll for changes every ``interval`` seconds.
+
+        Args:
+            interval: Seconds between the start of two polls.
+            once: If True, return after the first export or poll.
+        """
+        while True:
+            started = time.monotonic()
+            if self.checkpoint is None:
+                try:
+                    click.echo(f"Exported {self.initial_export()} pages.")
+                except (RuntimeError, *TRANSIENT_ERRORS) as exc:
+                    # Without a checkpoint the next round exports the tree again.
+                    click.echo(f"Exporting the tree failed: {exc}", err=True)
+            else:
+                try:
+                    click.echo(f"Updated {self.poll()} changed pages.")
+                except (RuntimeError, *TRANSIENT_ERRORS) as exc:
+                    # Keep the checkpoint so that the next poll covers the missed window.
+                    click.echo(f"Polling for changes failed: {exc}", err=True)
+            if once:
+                return
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
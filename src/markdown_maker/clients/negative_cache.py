@@ -0,0 +1,81 @@
+"""Negative cache of pages that could not be fetched.
+
+Links to restricted or deleted pages fail with a permission or not found
+error, and each such request is a slow round trip. This module provides the
+NegativeCache class, which remembers those page IDs for a limited time, and
+can persist them between runs, so that they are skipped without a request.
+Processes sharing the cache file merge their entries into it.
+"""
+
+import json
+import os
+import time
+
+from atlassian.errors import ApiError, ApiNotFoundError, ApiPermissionError
+
+from markdown_maker.utils.helpers import update_json_file
+
+NEGATIVE_CACHE_FILENAME = "inaccessible.json"
+# How long a page is assumed to stay inaccessible, unless configured.
+DEFAULT_NEGATIVE_CACHE_TTL = 24 * 3600.0
+# HTTP statuses that mean the page is restricted or gone, rather than a transient failure.
+INACCESSIBLE_STATUSES = frozenset({403, 404, 410})
+
+
+def is_inaccessible(exc: ApiError) -> bool:
+    """Return whether a failed fetch means the page is restricted or missing.
+
+    Server errors, timeouts and rate limiting are transient and not cached.
+    """
+    if isinstance(exc, ApiNotFoundError | ApiPermissionError):
+        return True
+    response = getattr(exc.reason, "response", None)
+    return getattr(response, "status_code", None) in INACCESSIBLE_STATUSES
+
+
+class NegativeCache:
+    """Remembers inaccessible page IDs, each for ``ttl`` seconds after it failed."""
+
+    def __init__(self, cache_path: str | None = None, ttl: float = DEFAULT_NEGATIVE_CACHE_TTL) -> None:
+        """Initialize the cache, loading the persisted entries if there are any.
+
+        Args:
+            cache_path: Optional JSON file persisting the entries across runs.
+            ttl: Seconds after which a page is fetched again. Zero disables the cache.
+        """
+        self.cache_path = cache_path
+        self.ttl = ttl
+        # Page ID to (time of the failure, error message).
+        self._entries: dict[str, tuple[float, str]] = {}
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, encoding="utf-8") as f:
+                self._entries = {pid: (failed_at, reason) for pid, failed_at, reason in json.load(f)}
+
+    def get(self, pid: str) -> str | None:
+        """Return the error of a page that failed within the TTL, or None."""
+        entry = self._entries.get(pid)
+        if entry is None or time.time() - entry[0] >= self.ttl:
+            return None
+        return entry[1]
+
+    def add(self, pid: str, reason: str) -> None:
+        """Record that fetching a page failed just now."""
+        self._entries[pid] = (time.time(), reason)
+
+    def save(self) -> None:
+        """Merge the unexpired entries into the cache file, if one is configured."""
+        if not self.cache_path:
+            return
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+        now = time.time()
+
+        def merge(stored: list | None) -> list:
+            entries = {pid: (failed_at, reason) for pid, failed_at, reason in stored or []}
+            for pid, entry in self._entries.items():
+                if pid not in entries or entries[pid][0] < entry[0]:
+                    entries[pid] = entry
+            return sorted(
+                [pid, failed_at, reason] for pid, (failed_at, reason) in entries.items() if now - failed_at < self.ttl
+            )
+
+        update_json_file(self.cache_path, merge, ensure_ascii=False)
@@ -0,0 +1,106 @@
+"""Read-ahead wrapper that fetches child pages concurrently.
+
+This module provides the PrefetchingClient class. It wraps a ConfluenceClient
+and, while a child listing is consumed, fetches the next few children's page
+content on a thread pool, so that the sequential traversal finds most bodies
+already downloaded when it reaches them. Children the traversal will not fetch,
+such as pages it has visited already, are not prefetched, and only the
+read-ahead of the listings being consumed is held, however deep a depth-first
+traversal descends.
+"""
+
+import threading
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from markdown_maker.clients.confluence_client import ConfluenceClient
+
+
+class PrefetchingClient:
+    """Wraps a ConfluenceClient, prefetching page content of upcoming children."""
+
+    def __init__(
+        self, client: ConfluenceClient, workers: int = 4, should_prefetch: Callable[[str], bool] | None = None
+    ) -> None:
+        """Start the prefetch pool.
+
+        Args:
+            client: The client used for all requests.
+            workers: Number of concurrent page fetches, which is also how many
+                children of a listing are read ahead.
+            should_prefetch: Called with a child's ID when it is listed; children
+                it returns False for are not prefetched. Defaults to prefetching
+                every child. May also be set after construction, e.g. to
+                ``ConfluenceTreeTraverser.will_fetch``.
+        """
+        self.client = client
+        self.workers = workers
+        self.should_prefetch = should_prefetch
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="page-prefetch")
+        self._lock = threading.Lock()
+        self._prefetched: dict[str, Future] = {}
+
+    def __getattr__(self, name: str):
+        # Everything that is not prefetched goes straight to the wrapped client.
+        return getattr(self.client, name)
+
+    def get_page_content(self, page_id: str) -> dict:
+        """Return a page's content, from the prefetched copy when there is one."""
+        with self._lock:
+            future = self._prefetched.pop(page_id, None)
+        if future is None:
+            return self.client.get_page_content(page_id)
+        return future.result()
+
+    def get_child_pages(self, page_id: str) -> Iterator[dict]:
+        """Yield a page's children, prefetching the content of the next ``workers`` children.
+
+        The traversal visits each child before it asks for the next one, so a
+        prefetch that is still unclaimed by then belongs to a child that was
+        skipped, and is dropped.
+        """
+        ahead: deque[dict] = deque()
+        try:
+            try:
+                for child in self.client.get_child_pages(page_id):
+                    self._prefetch(child.get("id"))
+                    ahead.append(child)
+                    if len(ahead) > self.workers:
+                        yield from self._hand_out(ahead.popleft())
+            except Exception:
+                # Children listed before the failure are still visited.
+                while ahead:
+                    yield from self._hand_out(ahead.popleft())
+                raise
+            while ahead:
+                yield from self._hand_out(ahead.popleft())
+        finally:
+            # The traversal stopped before reaching these children.
+            for child in ahead:
+                self._discard(child.get("id"))
+
+    def _hand_out(self, child: dict) -> Iterator[dict]:
+        yield child
+        self._discard(child.get("id"))
+
+    def _prefetch(self, page_id: str | None) -> None:
+        if page_id is None or (self.should_prefetch is not None and not self.should_prefetch(page_id)):
+            return
+        with self._lock:
+            if page_id not in self._prefetched:
+                self._prefetched[page_id] = self._executor.submit(self.client.get_page_content, page_id)
+
+    def _discard(self, page_id: str | None) -> None:
+        with self._lock:
+            future = self._prefetched.pop(page_id, None)
+        if future is not None:
+            future.cancel()
+
+    def close(self) -> None:
+        """Discard unclaimed prefetches and stop the pool."""
+        with self._lock:
+            for future in self._prefetched.values():
+                future.cancel()
+            self._prefetched.clear()
+        self._executor.shutdown(wait=True)
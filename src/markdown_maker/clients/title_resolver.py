@@ -0,0 +1,76 @@
+"""Batched resolution of page titles to page IDs.
+
+Confluence storage format usually links to other pages by space key and title
+rather than by ID. This module provides the TitleResolver class, which
+resolves such references through batched CQL searches, many titles per
+request, and remembers the results in a title to ID cache that can be
+persisted between runs, and shared by processes exporting at the same time.
+"""
+
+import json
+import os
+
+from markdown_maker.clients.confluence_client import ConfluenceClient
+from markdown_maker.utils.helpers import update_json_file
+
+TITLE_CACHE_FILENAME = "titles.json"
+
+
+class TitleResolver:
+    """Resolves ``(space_key, title)`` references to page IDs in batches."""
+
+    def __init__(self, client: ConfluenceClient, cache_path: str | None = None, batch_size: int = 25) -> None:
+        """Initialize the resolver, loading the persisted cache if there is one.
+
+        Args:
+            client: The Confluence client used for CQL searches.
+            cache_path: Optional JSON file persisting resolved titles across runs.
+            batch_size: Maximum number of titles per search request, which keeps
+                the CQL query within URL length limits.
+        """
+        self.client = client
+        self.cache_path = cache_path
+        self.batch_size = batch_size
+        self._ids: dict[tuple[str, str], str] = {}
+        # Titles that did not resolve in this run; not persisted, pages may appear later.
+        self._missing: set[tuple[str, str]] = set()
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, encoding="utf-8") as f:
+                self._ids = {(space, title): page_id for space, title, page_id in json.load(f)}
+
+    def resolve(self, refs: list[tuple[str, str]]) -> dict[tuple[str, str], str]:
+        """Resolve references, only searching for those not already known.
+
+        Args:
+            refs: ``(space_key, title)`` pairs.
+
+        Returns:
+            A dictionary mapping each resolvable reference to its page ID.
+        """
+        unknown = list(dict.fromkeys(ref for ref in refs if ref not in self._ids and ref not in self._missing))
+        for start in range(0, len(unknown), self.batch_size):
+            batch = unknown[start : start + self.batch_size]
+            try:
+                found = self.client.find_page_ids_by_title(batch)
+            except RuntimeError:
+                continue
+            self._ids.update(found)
+            self._missing.update(ref for ref in batch if ref not in found)
+        return {ref: self._ids[ref] for ref in refs if ref in self._ids}
+
+    def lookup(self, ref: tuple[str, str]) -> str | None:
+        """Return the page ID of an already resolved reference, without searching."""
+        return self._ids.get(ref)
+
+    def save(self) -> None:
+        """Merge the resolved titles into the cache file, if one is configured."""
+        if not self.cache_path:
+            return
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+
+        def merge(entries: list | None) -> list:
+            ids = {(space, title): page_id for space, title, page_id in entries or []}
+            ids.update(self._ids)
+            return sorted([space, title, page_id] for (space, title), page_id in ids.items())
+
+        update_json_file(self.cache_path, merge, ensure_ascii=False)
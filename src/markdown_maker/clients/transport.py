@@ -0,0 +1,305 @@
+"""HTTP transport for the Confluence client.
+
+This module builds the requests session the ConfluenceClient talks through.
+The session's transport adapter holds the connection pool, sized to the
+number of threads sharing the client, and applies the configured timeouts
+and compression to every request. The default transport is urllib3 through
+requests; with the ``http2`` extra installed, httpx can be used instead to
+multiplex requests over HTTP/2 connections.
+
+Settings are read from ``config.yml``:
+
+- ``http_transport``: ``requests`` (default) or ``httpx``.
+- ``http_pool_size``: Connections kept open; defaults to the number of workers, at least 10.
+- ``http_connect_timeout`` and ``http_read_timeout``: Timeouts in seconds.
+- ``http_compression``: Request gzip-compressed responses (default: true).
+"""
+
+import os
+import ssl
+import threading
+from collections.abc import Callable, Iterator
+from typing import Any
+
+import certifi
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import select_proxy
+
+TRANSPORTS = ("requests", "httpx")
+# urllib3's own pool size, kept as the minimum.
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CONNECT_TIMEOUT = 10.0
+# atlassian-python-api's default request timeout.
+DEFAULT_READ_TIMEOUT = 75.0
+# Headers that only apply to an HTTP/1.1 connection and are rejected over HTTP/2.
+_HOP_BY_HOP_HEADERS = frozenset({"connection", "keep-alive", "proxy-connection", "transfer-encoding", "upgrade"})
+
+
+def build_session(config: dict[str, Any], workers: int = 1) -> requests.Session:
+    """Return a session whose transport is configured from ``config``.
+
+    Args:
+        config: The loaded configuration; see the module docstring for the keys.
+        workers: Number of threads issuing requests through the session
+            concurrently. The pool holds at least one connection per worker,
+            so that none waits for a connection or opens one that is then
+            discarded.
+
+    Returns:
+        The session, with the transport mounted for ``http://`` and ``https://``.
+
+    Raises:
+        ValueError: If ``http_transport`` is not one of ``TRANSPORTS``.
+        ImportError: If the httpx transport is configured but httpx is not installed.
+    """
+    transport = config.get("http_transport", "requests")
+    if transport not in TRANSPORTS:
+        raise ValueError(f"Unknown http_transport '{transport}'. Choose one of: {', '.join(TRANSPORTS)}.")
+    pool_size = int(config.get("http_pool_size") or max(DEFAULT_POOL_SIZE, workers))
+    timeout = (
+        float(config.get("http_connect_timeout", DEFAULT_CONNECT_TIMEOUT)),
+        float(config.get("http_read_timeout", DEFAULT_READ_TIMEOUT)),
+    )
+    if transport == "httpx":
+        adapter: BaseAdapter = Http2Adapter(pool_size, timeout)
+    else:
+        adapter = PooledHTTPAdapter(pool_size, timeout)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    # requests asks for gzip and deflate by default.
+    if not config.get("http_compression", True):
+        session.headers["Accept-Encoding"] = "identity"
+    return session
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """urllib3 adapter with a pool of ``pool_size`` connections and fixed timeouts."""
+
+    def __init__(self, pool_size: int, timeout: tuple[float, float]) -> None:
+        """Initialize the adapter.
+
+        Args:
+            pool_size: Connections kept open per host. Requests beyond that
+                wait for a free connection instead of opening a throwaway one.
+            timeout: ``(connect, read)`` timeouts in seconds, replacing the
+                single timeout the Confluence library passes with each request.
+        """
+        super().__init__(pool_maxsize=pool_size, pool_block=True)
+        self.timeout = timeout
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+class Http2Adapter(BaseAdapter):
+    """Adapter sending requests through httpx clients, over HTTP/2 where the server supports it.
+
+    httpx configures TLS verification, client certificates and proxies per
+    client rather than per request, so one client is kept for each combination
+    of the ``verify``, ``cert`` and ``proxies`` arguments requests passes to
+    ``send``. Like ``PooledHTTPAdapter``, the configured timeouts replace the
+    per-request timeout. httpx errors are raised as the matching
+    ``requests.exceptions`` types, which the callers handle.
+    """
+
+    def __init__(self, pool_size: int, timeout: tuple[float, float]) -> None:
+        """Check that httpx is available and store the client settings.
+
+        Args:
+            pool_size: Maximum number of connections per client; each HTTP/2
+                connection carries many concurrent requests.
+            timeout: ``(connect, read)`` timeouts in seconds.
+
+        Raises:
+            ImportError: If httpx or its HTTP/2 support is not installed.
+        """
+        super().__init__()
+        try:
+            # httpx only imports h2 once an HTTP/2 client is created.
+            import h2  # noqa: F401
+            import httpx
+        except ImportError as exc:
+            raise ImportError(
+                "http_transport 'httpx' needs the http2 extra: pip install 'markdown_maker[http2]'"
+            ) from exc
+        self._httpx = httpx
+        self._limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        connect, read = timeout
+        self._timeout = httpx.Timeout(read, connect=connect)
+        self._clients: dict[tuple, Any] = {}
+        self._lock = threading.Lock()
+
+    def send(
+        self,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+        timeout: Any = None,
+        verify: bool | str = True,
+        cert: str | tuple[str, str] | None = None,
+        proxies: dict[str, str] | None = None,
+    ) -> requests.Response:
+        """Send a prepared request through the httpx client for its settings.
+
+        Args:
+            request: The request to send.
+            stream: If True, the body is read only as the caller consumes it.
+            timeout: Ignored; the configured timeouts apply.
+            verify: Whether to verify the server's certificate, or the path of
+                a CA bundle or directory to verify it against.
+            cert: A client certificate file, or a ``(certificate, key)`` pair.
+            proxies: Proxy URLs by scheme or host, as selected by requests.
+
+        Returns:
+            The response.
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails.
+        """
+        httpx = self._httpx
+        client = self._client(verify, cert, select_proxy(request.url, proxies or {}))
+        headers = {name: value for name, value in request.headers.items() if name.lower() not in _HOP_BY_HOP_HEADERS}
+        try:
+            sent = client.send(
+                client.build_request(request.method, request.url, headers=headers, content=request.body),
+                stream=stream,
+            )
+        except httpx.HTTPError as exc:
+            raise self._translate(exc, request) from exc
+        response = requests.Response()
+        response.status_code = sent.status_code
+        response.reason = sent.reason_phrase
+        response.headers = CaseInsensitiveDict(sent.headers)
+        response.encoding = sent.charset_encoding
+        response.url = request.url
+        response.request = request
+        if stream:
+            response.raw = _StreamedBody(sent, httpx.HTTPError, lambda exc: self._translate(exc, request))
+        else:
+            # httpx has already decompressed the body.
+            response._content = sent.content
+        return response
+
+    def close(self) -> None:
+        with self._lock:
+            clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            client.close()
+
+    def _client(self, verify: bool | str, cert: str | tuple[str, str] | None, proxy: str | None) -> Any:
+        """Return the httpx client for these TLS and proxy settings, creating it on first use."""
+        key = (verify, cert, proxy)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._httpx.Client(
+                    http2=True,
+                    verify=_ssl_context(verify, cert),
+                    proxy=proxy,
+                    limits=self._limits,
+                    timeout=self._timeout,
+                    # requests has already merged the environment's proxy and CA settings.
+                    trust_env=False,
+                )
+                self._clients[key] = client
+        return client
+
+    def _translate(self, exc: Exception, request: requests.PreparedRequest) -> requests.RequestException:
+        """Map an httpx error to the requests exception raised for the same failure."""
+        httpx = self._httpx
+        if isinstance(exc, httpx.ConnectTimeout):
+            error: type[requests.RequestException] = requests.exceptions.ConnectTimeout
+        elif isinstance(exc, httpx.TimeoutException):
+            error = requests.exceptions.ReadTimeout
+        elif isinstance(exc, httpx.ProxyError):
+            error = requests.exceptions.ProxyError
+        elif isinstance(exc, httpx.ConnectError) and _caused_by(exc, ssl.SSLError):
+            error = requests.exceptions.SSLError
+        elif isinstance(exc, httpx.UnsupportedProtocol):
+            error = requests.exceptions.InvalidSchema
+        elif isinstance(exc, httpx.InvalidURL):
+            error = requests.exceptions.InvalidURL
+        elif isinstance(exc, httpx.DecodingError):
+            error = requests.exceptions.ContentDecodingError
+        elif isinstance(exc, httpx.TransportError):
+            error = requests.exceptions.ConnectionError
+        else:
+            error = requests.RequestException
+        return error(str(exc), request=request)
+
+
+class _StreamedBody:
+    """The ``raw`` body of a streamed response, read from the httpx response on demand."""
+
+    def __init__(self, response: Any, errors: type[Exception], translate: Callable[[Exception], Exception]) -> None:
+        self._response = response
+        self._errors = errors
+        self._translate = translate
+        self._chunks: Iterator[bytes] | None = None
+        self._buffer = b""
+
+    def stream(self, chunk_size: int | None = None, decode_content: bool = True) -> Iterator[bytes]:
+        """Yield the decompressed body in chunks of about ``chunk_size`` bytes."""
+        if self._buffer:
+            yield self._buffer
+            self._buffer = b""
+        yield from self._iter(chunk_size)
+
+    def read(self, amt: int | None = None) -> bytes:
+        """Read up to ``amt`` decompressed bytes, or the rest of the body."""
+        chunks = self._iter(amt)
+        while amt is None or len(self._buffer) < amt:
+            chunk = next(chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        data, self._buffer = (self._buffer, b"") if amt is None else (self._buffer[:amt], self._buffer[amt:])
+        return data
+
+    def close(self) -> None:
+        self._response.close()
+
+    def _iter(self, chunk_size: int | None) -> Iterator[bytes]:
+        # httpx allows iterating over a response body only once.
+        if self._chunks is None:
+            self._chunks = self._read_chunks(chunk_size)
+        return self._chunks
+
+    def _read_chunks(self, chunk_size: int | None) -> Iterator[bytes]:
+        try:
+            yield from self._response.iter_bytes(chunk_size)
+        except self._errors as exc:
+            raise self._translate(exc) from exc
+        finally:
+            self._response.close()
+
+
+def _ssl_context(verify: bool | str, cert: str | tuple[str, str] | None) -> ssl.SSLContext:
+    """Build the TLS context requests would use for ``verify`` and ``cert``."""
+    if verify is False:
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    elif isinstance(verify, str) and os.path.isdir(verify):
+        context = ssl.create_default_context(capath=verify)
+    elif isinstance(verify, str):
+        context = ssl.create_default_context(cafile=verify)
+    else:
+        context = ssl.create_default_context(cafile=certifi.where())
+    if isinstance(cert, str):
+        context.load_cert_chain(cert)
+    elif cert:
+        context.load_cert_chain(*cert)
+    return context
+
+
+def _caused_by(exc: BaseException | None, error: type[BaseException]) -> bool:
+    """Return whether ``error`` is in the chain of exceptions that led to ``exc``."""
+    while exc is not None:
+        if isinstance(exc, error):
+            return True
+        exc = exc.__cause__ or exc.__context__
+    return False
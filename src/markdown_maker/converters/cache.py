@@ -0,0 +1,76 @@
+"""Content-addressed cache for HTML to Markdown conversions.
+
+Converted Markdown is stored on disk under a key derived from the storage
+format HTML, the converter engine and its options and version, so unchanged
+pages skip BeautifulSoup and markdownify entirely on later runs, regardless
+of where or how their output is written.
+"""
+
+import hashlib
+import json
+import os
+from importlib.metadata import version
+
+from markdown_maker.converters.engines import DEFAULT_ENGINE, engine_fingerprint, get_converter
+from markdown_maker.utils.helpers import write_if_changed
+
+# Bump when the conversion pipeline changes in a way the options do not capture.
+CONVERTER_VERSION = "3"
+
+
+class ConversionCache:
+    """Caches Markdown conversions on disk, keyed by the hash of their input."""
+
+    def __init__(self, cache_dir: str, engine: str = DEFAULT_ENGINE, local_attachments: bool = False) -> None:
+        """Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding the cached conversions. Created on
+                first write.
+            engine: The converter engine used on cache misses.
+            local_attachments: Whether attachments are downloaded next to the
+                pages; see ``get_converter``.
+        """
+        self.cache_dir = cache_dir
+        self.engine = engine
+        self.local_attachments = local_attachments
+        fingerprint = json.dumps(
+            {
+                "converter": CONVERTER_VERSION,
+                "markdownify": version("markdownify"),
+                **engine_fingerprint(engine, local_attachments),
+            },
+            sort_keys=True,
+        )
+        self._prefix = hashlib.sha256(fingerprint.encode("utf-8")).digest()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, html: str, space_key: str) -> str:
+        digest = hashlib.sha256(self._prefix + f"{space_key}\0{html}".encode()).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.md")
+
+    def convert(self, html: str, space_key: str = "") -> str:
+        """Return the Markdown for ``html``, converting and caching it on a miss.
+
+        Args:
+            html: The storage format HTML to convert.
+            space_key: The page's space, for page links that do not name one.
+
+        Returns:
+            The converted Markdown string.
+        """
+        path = self._path(html, space_key)
+        try:
+            with open(path, "rb") as f:
+                markdown = f.read().decode("utf-8")
+        except FileNotFoundError:
+            pass
+        else:
+            self.hits += 1
+            return markdown
+        self.misses += 1
+        markdown = get_converter(self.engine, self.local_attachments)(html, space_key=space_key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_if_changed(path, markdown)
+        return markdown
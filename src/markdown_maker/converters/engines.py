@@ -0,0 +1,74 @@
+"""Registry of HTML to Markdown converter engines.
+
+Two engines are available:
+
+* ``markdownify``: the generic HTML converter in ``html_to_markdown``.
+* ``storage``: the native Confluence storage-format converter in ``storage_format``.
+"""
+
+from collections.abc import Callable
+from functools import partial
+
+from markdown_maker.converters import html_to_markdown, storage_format
+
+DEFAULT_ENGINE = "markdownify"
+ENGINES = ("markdownify", "storage")
+
+
+def get_converter(engine: str = DEFAULT_ENGINE, local_attachments: bool = False) -> Callable[..., str]:
+    """Return the conversion function for a named engine.
+
+    Args:
+        engine: One of ``ENGINES``.
+        local_attachments: Whether attachments are downloaded next to the
+            pages, so that attachment links and images point at the files.
+
+    Returns:
+        A function converting a page's storage-format HTML to Markdown. It
+        takes the key of the page's space as ``space_key``, for page links
+        that do not name one.
+
+    Raises:
+        ValueError: If the engine is unknown.
+    """
+    # Looked up on each call so the module-level functions can be patched in tests.
+    if engine == "markdownify":
+        return partial(_convert_markdownify, local_attachments=local_attachments)
+    if engine == "storage":
+        if local_attachments:
+            return partial(storage_format.convert_storage_to_markdown, local_attachments=True)
+        return storage_format.convert_storage_to_markdown
+    raise ValueError(f"Unknown converter engine '{engine}'. Choose one of: {', '.join(ENGINES)}.")
+
+
+def _convert_markdownify(html: str, space_key: str = "", local_attachments: bool = False) -> str:
+    # markdownify renders page links by their labels, so it needs no space key.
+    return html_to_markdown.convert_html_to_markdown(html, local_attachments=local_attachments)
+
+
+def engine_fingerprint(engine: str = DEFAULT_ENGINE, local_attachments: bool = False) -> dict:
+    """Return the settings that determine an engine's output, for cache keys.
+
+    Args:
+        engine: One of ``ENGINES``.
+        local_attachments: As passed to ``get_converter``.
+
+    Returns:
+        A JSON-serializable description of the engine and its configuration.
+
+    Raises:
+        ValueError: If the engine is unknown.
+    """
+    if engine == "markdownify":
+        return {
+            "engine": engine,
+            "options": html_to_markdown.MARKDOWNIFY_OPTIONS,
+            "local_attachments": local_attachments,
+        }
+    if engine == "storage":
+        return {
+            "engine": engine,
+            "version": storage_format.STORAGE_CONVERTER_VERSION,
+            "local_attachments": local_attachments,
+        }
+    raise ValueError(f"Unknown converter engine '{engine}'. Choose one of: {', '.join(ENGINES)}.")
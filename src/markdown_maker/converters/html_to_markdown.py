@@ -1,47 +1,81 @@
 """HTML to Markdown conversion utilities.
 
 This module provides a function to convert HTML content to Markdown using
-BeautifulSoup and markdownify.
+BeautifulSoup and markdownify. Simple tables take a faster path with the same
+output; see ``markdown_maker.converters.tables``.
 
 Functions:
-    convert_html_to_markdown(html: str) -> str: Convert HTML to Markdown.
-    write_markdown_page(f, title: str, page_url: str, markdown: str, is_first: bool = True) -> None:
+    convert_html_to_markdown(html: str, local_attachments: bool = False) -> str: Convert HTML to Markdown.
+    write_markdown_page(f, title: str, page_url: str, markdown: str | Iterable[str], is_first: bool = True) -> None:
         Write a Markdown page to a file-like object.
 """
 
-from bs4 import BeautifulSoup
-from markdownify import markdownify as md
+from collections.abc import Iterable
+from urllib.parse import quote
 
+from bs4 import BeautifulSoup, Tag
+from markdownify import MarkdownConverter
 
-def convert_html_to_markdown(html: str) -> str:
+from markdown_maker.converters.tables import extract_simple_tables, restore_tables
+from markdown_maker.utils.helpers import attachment_filename, release_soup
+
+# Options passed to markdownify. They are part of the conversion cache key, so
+# changing them invalidates previously cached conversions.
+MARKDOWNIFY_OPTIONS = {
+    "heading_style": "ATX",  # Use # for headings
+    "bullets": "-*",  # Use - or * for unordered lists
+    "code_language_detection": True,  # Try to detect code block language
+    "strip": ["style", "script"],  # Remove style/script tags
+    "escape_underscores": False,  # Allow underscores in text
+    "wrap": True,  # Enable line wrapping
+    "wrap_width": 120,  # Set wrap width to 120
+}
+
+
+def convert_html_to_markdown(html: str, local_attachments: bool = False) -> str:
     """Convert HTML content to Markdown format.
 
     Args:
         html: The HTML string to convert.
+        local_attachments: Render attachment images as images of the file next
+            to the page, for exports that download attachments.
 
     Returns:
         The converted Markdown string.
     """
     soup = BeautifulSoup(html, "html.parser")
-    # Use only supported markdownify options for bold/italic
-    markdown = md(
-        str(soup),
-        heading_style="ATX",  # Use # for headings
-        bullets="-*",  # Use - or * for unordered lists
-        code_language_detection=True,  # Try to detect code block language
-        strip=["style", "script"],  # Remove style/script tags
-        escape_underscores=False,  # Allow underscores in text
-        wrap=True,  # Enable line wrapping
-        wrap_width=120,  # Set wrap width to 120
-    )
-    return markdown
+    if local_attachments:
+        _inline_attachment_images(soup)
+    converter = MarkdownConverter(**MARKDOWNIFY_OPTIONS)
+    prefix, tables = extract_simple_tables(soup, converter)
+    cleaned = str(soup)
+    release_soup(soup)
+    markdown = converter.convert(cleaned)
+    return restore_tables(markdown, prefix, tables)
+
+
+def _inline_attachment_images(soup: BeautifulSoup) -> None:
+    """Replace ``ac:image`` attachment references with ``img`` tags markdownify understands.
+
+    The image source is the name the attachment is downloaded under next to
+    the page's Markdown.
+    """
+    for el in soup.find_all("ac:image"):
+        attachment = el.find("ri:attachment", recursive=False) if isinstance(el, Tag) else None
+        if not isinstance(attachment, Tag) or not attachment.get("ri:filename"):
+            continue
+        filename = attachment["ri:filename"]
+        img = soup.new_tag(
+            "img", src=quote(attachment_filename(filename)), alt=el.get("ac:alt") or el.get("ac:title") or filename
+        )
+        el.replace_with(img)
 
 
 def write_markdown_page(
     f,
     title: str,
     page_url: str,
-    markdown: str,
+    markdown: str | Iterable[str],
     is_first: bool = True,
 ) -> None:
     """Write a Markdown page to a file-like object, with heading and source link.
@@ -50,12 +84,22 @@ def write_markdown_page(
         f: File-like object to write to.
         title: The page title.
         page_url: The source URL.
-        markdown: The Markdown content.
+        markdown: The Markdown content, or chunks of it as produced by the
+            streaming converter, which are written as they come.
         is_first: If True, do not prepend a separator.
     """
     if not is_first:
         f.write("\n\n---\n\n")
     f.write(f"# {title}\n\n")
     f.write(f"Source: [{page_url}]({page_url})\n\n")
-    f.write(markdown.strip())
-    f.write("\n")
+    if isinstance(markdown, str):
+        f.write(markdown.strip())
+        f.write("\n")
+        return
+    # Streamed Markdown has no leading blank lines and ends with a newline.
+    ends_with_newline = False
+    for chunk in markdown:
+        f.write(chunk)
+        ends_with_newline = chunk.endswith("\n")
+    if not ends_with_newline:
+        f.write("\n")
@@ -0,0 +1,441 @@
+"""Native converter for the Confluence storage format.
+
+This module renders Confluence storage-format XHTML to Markdown in a single
+walk over the parsed document. Every element is rendered through a dispatch
+table keyed by tag name, with dedicated handlers for the ``ac:`` and ``ri:``
+vocabulary (macros, page links, images and task lists) that a generic HTML
+converter treats as unknown tags.
+
+Functions:
+    convert_storage_to_markdown(html: str, space_key: str = "", local_attachments: bool = False) -> str:
+        Convert storage format to Markdown.
+"""
+
+import re
+from collections.abc import Callable
+from urllib.parse import quote, quote_plus
+
+from bs4 import BeautifulSoup, CData, Comment, Declaration, Doctype, NavigableString, ProcessingInstruction, Tag
+
+from markdown_maker.utils.helpers import attachment_filename, release_soup
+
+# Bump when the rendered output changes, so cached conversions are invalidated.
+STORAGE_CONVERTER_VERSION = "3"
+
+_WHITESPACE = re.compile(r"\s+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+# Marks the blank lines of code blocks, so the blank lines between blocks can be collapsed around them.
+_CODE_BLANK = "\ue000"
+_MARKED_BLANK = re.compile(rf" *{_CODE_BLANK}(?=\n|$)")
+_SKIPPED_STRINGS = (Comment, Declaration, Doctype, ProcessingInstruction)
+
+# Containers whose whitespace-only text nodes are layout noise between blocks.
+_BLOCK_CONTAINERS = frozenset(
+    {
+        "[document]",
+        "html",
+        "body",
+        "div",
+        "section",
+        "blockquote",
+        "ul",
+        "ol",
+        "table",
+        "thead",
+        "tbody",
+        "tfoot",
+        "tr",
+        "ac:rich-text-body",
+        "ac:structured-macro",
+        "ac:layout",
+        "ac:layout-section",
+        "ac:layout-cell",
+        "ac:task-list",
+        "ac:task",
+    }
+)
+
+# Elements rendered as blocks of their own, which whitespace around them does not add to.
+_BLOCK_ELEMENTS = frozenset(
+    {"p", "div", "pre", "blockquote", "ul", "ol", "table", "hr", "h1", "h2", "h3", "h4", "h5", "h6", "ac:task-list"}
+)
+
+Handler = Callable[[Tag], str]
+
+
+def convert_storage_to_markdown(html: str, space_key: str = "", local_attachments: bool = False) -> str:
+    """Convert Confluence storage-format content to Markdown.
+
+    Args:
+        html: The storage-format XHTML of a page.
+        space_key: The page's space, for page links that do not name one.
+        local_attachments: Link attachments and render attachment images as
+            the files downloaded next to the page; otherwise attachment links
+            keep only their label and attachment images are left out.
+
+    Returns:
+        The converted Markdown string.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    _apply_page_context(soup, space_key, local_attachments)
+    markdown = _render_children(soup)
+    release_soup(soup)
+    markdown = _unmark_code(_BLANK_LINES.sub("\n\n", markdown).strip())
+    return f"{markdown}\n" if markdown else ""
+
+
+def _apply_page_context(soup: BeautifulSoup, space_key: str, local_attachments: bool) -> None:
+    """Resolve the references that depend on the page rather than on its content."""
+    if space_key:
+        for page in soup.find_all("ri:page"):
+            if not page.get("ri:space-key"):
+                page["ri:space-key"] = space_key
+    if not local_attachments:
+        for attachment in soup.find_all("ri:attachment"):
+            if attachment.parent is not None and attachment.parent.name in {"ac:link", "ac:image"}:
+                attachment.decompose()
+
+
+def _render(node) -> str:
+    if isinstance(node, Tag):
+        return _ELEMENT_HANDLERS.get(node.name, _render_children)(node)
+    if isinstance(node, CData):
+        return str(node)
+    if isinstance(node, _SKIPPED_STRINGS):
+        return ""
+    if isinstance(node, NavigableString):
+        text = _WHITESPACE.sub(" ", node)
+        if text == " " and node.parent is not None and (node.parent.name in _BLOCK_CONTAINERS or _next_to_block(node)):
+            return ""
+        return text.replace("*", r"\*")
+    return ""
+
+
+def _next_to_block(node: NavigableString) -> bool:
+    """Return whether a whitespace-only text node only separates content from a block."""
+    siblings = (node.previous_sibling, node.next_sibling)
+    return any(isinstance(sibling, Tag) and sibling.name in _BLOCK_ELEMENTS for sibling in siblings)
+
+
+def _render_children(el: Tag) -> str:
+    return "".join([_render(child) for child in el.children])
+
+
+def _inline(el: Tag) -> str:
+    """Render an element's children as a single line of inline Markdown."""
+    return _WHITESPACE.sub(" ", _unmark_code(_render_children(el))).strip()
+
+
+def _block(text: str) -> str:
+    return f"\n\n{text}\n\n" if text else ""
+
+
+def _wrap(el: Tag, marker: str) -> str:
+    text = _render_children(el)
+    stripped = text.strip()
+    if not stripped:
+        return text
+    lead = text[: len(text) - len(text.lstrip())]
+    trail = text[len(text.rstrip()) :]
+    return f"{lead}{marker}{stripped}{marker}{trail}"
+
+
+def _fence(code: str, language: str = "") -> str:
+    fence = "```"
+    while fence in code:
+        fence += "`"
+    lines = code.strip("\n").split("\n")
+    code = "\n".join(line if line.strip() else f"{_CODE_BLANK}{line}" for line in lines)
+    return _block(f"{fence}{language}\n{code}\n{fence}")
+
+
+def _unmark_code(markdown: str) -> str:
+    """Restore the blank lines of code blocks, without the line prefixes added to them."""
+    return _MARKED_BLANK.sub("", markdown).replace(_CODE_BLANK, "")
+
+
+def _heading(level: int) -> Handler:
+    def render(el: Tag) -> str:
+        return _block(f"{'#' * level} {_inline(el)}")
+
+    return render
+
+
+def _paragraph(el: Tag) -> str:
+    return _block(_render_children(el).strip())
+
+
+def _blockquote(el: Tag) -> str:
+    body = _BLANK_LINES.sub("\n\n", _render_children(el)).strip()
+    if not body:
+        return ""
+    return _block("\n".join(f"> {line}" if line else ">" for line in body.split("\n")))
+
+
+def _pre(el: Tag) -> str:
+    return _fence(el.get_text())
+
+
+def _code(el: Tag) -> str:
+    text = el.get_text()
+    if not text:
+        return ""
+    ticks = "`"
+    while ticks in text:
+        ticks += "`"
+    pad = " " if text.startswith("`") or text.endswith("`") else ""
+    return f"{ticks}{pad}{text}{pad}{ticks}"
+
+
+def _link(el: Tag) -> str:
+    text = _inline(el)
+    href = el.get("href")
+    if not isinstance(href, str) or not href:
+        return text
+    if not text or text == href:
+        return f"<{href}>"
+    return f"[{text}]({href})"
+
+
+def _image(el: Tag) -> str:
+    src = el.get("src")
+    return f"![{el.get('alt', '')}]({src})" if src else ""
+
+
+def _line_break(el: Tag) -> str:
+    return "  \n"
+
+
+def _rule(el: Tag) -> str:
+    return _block("---")
+
+
+def _list_item_body(li: Tag) -> str:
+    body = _BLANK_LINES.sub("\n\n", _render_children(li)).strip()
+    if li.find(["p", "pre", "ac:structured-macro"], recursive=False) is None:
+        # Keep simple items and their nested lists tight.
+        body = re.sub(r"\n\s*\n", "\n", body)
+    return body
+
+
+def _list(ordered: bool) -> Handler:
+    def render(el: Tag) -> str:
+        start = el.get("start", "1")
+        number = int(start) if isinstance(start, str) and start.isdigit() else 1
+        items = []
+        for li in el.find_all("li", recursive=False):
+            marker = f"{number}." if ordered else "-"
+            number += 1
+            lines = _list_item_body(li).split("\n")
+            indent = " " * (len(marker) + 1)
+            rest = "".join(f"\n{indent}{line}" if line else "\n" for line in lines[1:])
+            first = f"{marker} {lines[0]}" if lines[0] else marker
+            items.append(f"{first}{rest}")
+        return _block("\n".join(items))
+
+    return render
+
+
+def _table_rows(table: Tag) -> list[Tag]:
+    rows = []
+    for child in table.children:
+        if not isinstance(child, Tag):
+            continue
+        if child.name == "tr":
+            rows.append(child)
+        elif child.name in {"thead", "tbody", "tfoot"}:
+            rows.extend(child.find_all("tr", recursive=False))
+    return rows
+
+
+def _cell(el: Tag) -> str:
+    return _inline(el).replace("|", r"\|")
+
+
+def _table(el: Tag) -> str:
+    rows = [[_cell(cell) for cell in tr.find_all(["th", "td"], recursive=False)] for tr in _table_rows(el)]
+    rows = [row for row in rows if row]
+    if not rows:
+        return ""
+    width = max(len(row) for row in rows)
+    lines = []
+    for index, row in enumerate(rows):
+        cells = row + [""] * (width - len(row))
+        lines.append(f"| {' | '.join(cells)} |")
+        if index == 0:
+            lines.append(f"|{'|'.join([' --- '] * width)}|")
+    return _block("\n".join(lines))
+
+
+def _time(el: Tag) -> str:
+    value = el.get("datetime")
+    return value if isinstance(value, str) else _render_children(el)
+
+
+def _skip(el: Tag) -> str:
+    return ""
+
+
+def _ac_link(el: Tag) -> str:
+    label_el = el.find(["ac:plain-text-link-body", "ac:link-body"], recursive=False)
+    label = _inline(label_el) if label_el else ""
+    page = el.find("ri:page", recursive=False)
+    if page is not None:
+        title = page.get("ri:content-title", "")
+        space = page.get("ri:space-key")
+        label = label or title
+        if title and space:
+            return f"[{label}](/wiki/display/{space}/{quote_plus(title)})"
+        return label
+    attachment = el.find("ri:attachment", recursive=False)
+    if attachment is not None:
+        filename = attachment.get("ri:filename", "")
+        return f"[{label or filename}]({quote(attachment_filename(filename))})"
+    url = el.find("ri:url", recursive=False)
+    if url is not None:
+        href = url.get("ri:value", "")
+        return f"[{label or href}]({href})"
+    anchor = el.get("ac:anchor")
+    if anchor:
+        return f"[{label or anchor}](#{anchor})"
+    return label
+
+
+def _ac_image(el: Tag) -> str:
+    alt = el.get("ac:alt") or el.get("ac:title") or ""
+    attachment = el.find("ri:attachment", recursive=False)
+    if attachment is not None:
+        filename = attachment.get("ri:filename", "")
+        return f"![{alt or filename}]({quote(attachment_filename(filename))})"
+    url = el.find("ri:url", recursive=False)
+    if url is not None:
+        return f"![{alt}]({url.get('ri:value', '')})"
+    return ""
+
+
+def _ac_task_list(el: Tag) -> str:
+    items = []
+    for task in el.find_all("ac:task", recursive=False):
+        status = task.find("ac:task-status", recursive=False)
+        body = task.find("ac:task-body", recursive=False)
+        checked = "x" if status is not None and status.get_text().strip() == "complete" else " "
+        items.append(f"- [{checked}] {_inline(body) if body else ''}".rstrip())
+    return _block("\n".join(items))
+
+
+def _ac_emoticon(el: Tag) -> str:
+    fallback = el.get("ac:emoji-fallback")
+    return fallback if isinstance(fallback, str) else ""
+
+
+def _macro_parameter(el: Tag, name: str) -> str:
+    for param in el.find_all("ac:parameter", recursive=False):
+        if param.get("ac:name") == name:
+            return param.get_text().strip()
+    return ""
+
+
+def _macro_body(el: Tag) -> str:
+    rich = el.find("ac:rich-text-body", recursive=False)
+    if rich is not None:
+        return _render_children(rich)
+    plain = el.find("ac:plain-text-body", recursive=False)
+    return _fence(plain.get_text()) if plain is not None else ""
+
+
+def _macro_code(el: Tag) -> str:
+    plain = el.find("ac:plain-text-body", recursive=False)
+    return _fence(plain.get_text() if plain else "", _macro_parameter(el, "language"))
+
+
+def _macro_panel(label: str) -> Handler:
+    def render(el: Tag) -> str:
+        title = _macro_parameter(el, "title")
+        heading = f"**{label}: {title}**" if title else f"**{label}:**"
+        body = _BLANK_LINES.sub("\n\n", _macro_body(el)).strip()
+        text = f"{heading} {body}" if body and "\n" not in body else f"{heading}\n\n{body}".strip()
+        return _block("\n".join(f"> {line}" if line else ">" for line in text.split("\n")))
+
+    return render
+
+
+def _macro_expand(el: Tag) -> str:
+    title = _macro_parameter(el, "title") or "Details"
+    return _block(f"**{title}**") + _macro_body(el)
+
+
+def _macro_status(el: Tag) -> str:
+    title = _macro_parameter(el, "title")
+    return f"**[{title}]**" if title else ""
+
+
+def _macro_jira(el: Tag) -> str:
+    return _macro_parameter(el, "key")
+
+
+def _structured_macro(el: Tag) -> str:
+    return _MACRO_HANDLERS.get(el.get("ac:name", ""), _macro_body)(el)
+
+
+_MACRO_HANDLERS: dict[str, Handler] = {
+    "code": _macro_code,
+    "noformat": _macro_code,
+    "info": _macro_panel("Info"),
+    "note": _macro_panel("Note"),
+    "warning": _macro_panel("Warning"),
+    "tip": _macro_panel("Tip"),
+    "panel": _macro_panel("Panel"),
+    "expand": _macro_expand,
+    "status": _macro_status,
+    "jira": _macro_jira,
+    "toc": _skip,
+    "children": _skip,
+    "pagetree": _skip,
+    "anchor": _skip,
+    "recently-updated": _skip,
+    "contentbylabel": _skip,
+}
+
+_ELEMENT_HANDLERS: dict[str, Handler] = {
+    "h1": _heading(1),
+    "h2": _heading(2),
+    "h3": _heading(3),
+    "h4": _heading(4),
+    "h5": _heading(5),
+    "h6": _heading(6),
+    "p": _paragraph,
+    "div": lambda el: _block(_render_children(el).strip()),
+    "blockquote": _blockquote,
+    "pre": _pre,
+    "code": _code,
+    "strong": lambda el: _wrap(el, "**"),
+    "b": lambda el: _wrap(el, "**"),
+    "em": lambda el: _wrap(el, "*"),
+    "i": lambda el: _wrap(el, "*"),
+    "s": lambda el: _wrap(el, "~~"),
+    "del": lambda el: _wrap(el, "~~"),
+    "strike": lambda el: _wrap(el, "~~"),
+    "a": _link,
+    "img": _image,
+    "br": _line_break,
+    "hr": _rule,
+    "ul": _list(ordered=False),
+    "ol": _list(ordered=True),
+    "table": _table,
+    "time": _time,
+    "style": _skip,
+    "script": _skip,
+    "colgroup": _skip,
+    "ac:structured-macro": _structured_macro,
+    "ac:link": _ac_link,
+    "ac:image": _ac_image,
+    "ac:task-list": _ac_task_list,
+    "ac:emoticon": _ac_emoticon,
+    "ac:parameter": _skip,
+    "ac:placeholder": _skip,
+    "ac:plain-text-body": lambda el: _fence(el.get_text()),
+    "ri:page": _skip,
+    "ri:attachment": _skip,
+    "ri:url": _skip,
+    "ri:user": _skip,
+}
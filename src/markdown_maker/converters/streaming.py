@@ -0,0 +1,819 @@
+"""Streaming converter for very large storage-format pages.
+
+This module converts storage-format XHTML to Markdown from parse events, for
+pages whose bodies are too large to hold as a parse tree, a serialized copy
+and a Markdown string at once. The page is fed to ``html.parser`` in slices,
+and Markdown is produced as complete lines while the page is parsed, so it can
+be written straight to the output file. Only the stack of open elements is
+kept, together with the content of open inline elements and tables, so
+memory grows with nesting depth and table size rather than page size.
+
+The output follows the native ``storage`` engine. A table is written once it
+ends, so that its header spans the widest row, and a panel heading is held
+until its body turns out to span more than one line. Where the layout depends
+on what follows, such as whether a list item keeps its blank lines or how long
+a code fence must be, the source of the element is scanned ahead. Spacing
+around inline formatting and line breaks may differ from the storage engine,
+as may quotes and panels of several paragraphs inside table cells.
+Embedded page links found on the way are collected for the traversal.
+
+Classes:
+    StreamingConverter: Converts one page to an iterator of Markdown chunks.
+"""
+
+import re
+from collections.abc import Iterator
+from html.parser import HTMLParser
+from urllib.parse import quote, quote_plus
+
+from markdown_maker.utils.helpers import attachment_filename, classify_url
+
+_WHITESPACE = re.compile(r"\s+")
+_HEADING = re.compile(r"h[1-6]")
+_CDATA_START = "<![CDATA["
+_CDATA_END = "]]>"
+_BACKTICKS = re.compile(r"`{3,}")
+# Tags, and the CDATA sections and comments whose content is not markup.
+_SOURCE_TAG = re.compile(r"<!\[CDATA\[.*?\]\]>|<!--.*?-->|<(/?)([A-Za-z][\w:.-]*)(?:\s[^>]*?)?(/?)>", re.DOTALL)
+
+_VOID_TAGS = frozenset({"br", "hr", "img", "col", "input", "meta", "link", "wbr", "area", "base", "source"})
+_SKIPPED_TAGS = frozenset(
+    {"style", "script", "colgroup", "ac:placeholder", "ac:task-id", "ri:user", "ri:space", "ri:content-entity"}
+)
+_SKIPPED_MACROS = frozenset({"toc", "children", "pagetree", "anchor", "recently-updated", "contentbylabel"})
+_PANEL_MACROS = {"info": "Info", "note": "Note", "warning": "Warning", "tip": "Tip", "panel": "Panel"}
+_CODE_MACROS = frozenset({"code", "noformat"})
+_WRAP_MARKERS = {"strong": "**", "b": "**", "em": "*", "i": "*", "s": "~~", "del": "~~", "strike": "~~"}
+_BLOCK_TAGS = frozenset({"p", "div", "section", "ac:layout", "ac:layout-section", "ac:layout-cell"})
+# Links, whose labels are stripped of surrounding spaces.
+_LABELLED_TAGS = frozenset({"a", "ac:link"})
+# Children that make the storage engine keep the blank lines in a list item.
+_LOOSE_ITEM_CHILDREN = frozenset({"p", "pre", "ac:structured-macro"})
+
+
+class StreamingConverter:
+    """Converts one storage-format page to Markdown chunks, collecting its page links."""
+
+    def __init__(
+        self,
+        space_key: str = "",
+        skip_strikethrough_links: bool = False,
+        chunk_size: int = 1 << 16,
+        local_attachments: bool = False,
+    ):
+        """Initialize the converter.
+
+        Args:
+            space_key: The page's space, for page links that do not name one.
+            skip_strikethrough_links: If True, do not collect struck-through links.
+            chunk_size: Number of characters fed to the parser at a time.
+            local_attachments: Link attachments and render attachment images
+                as the files downloaded next to the page, as the storage
+                engine does.
+        """
+        self.space_key = space_key
+        self.skip_strikethrough_links = skip_strikethrough_links
+        self.chunk_size = chunk_size
+        self.local_attachments = local_attachments
+        # Entries are (page_id, None, href) or (None, (space, title), href), in document order.
+        self.links: list[tuple[str | None, tuple[str, str] | None, str]] = []
+
+    def iter_markdown(self, html: str) -> Iterator[str]:
+        """Yield the Markdown of ``html`` as chunks of complete lines.
+
+        ``links`` is complete once the iterator is exhausted.
+        """
+        parser = _MarkdownParser(self, html)
+        out = parser.out
+        size = self.chunk_size
+        pos = 0
+        in_cdata = False
+        while pos < len(html):
+            # CDATA sections bypass the parser, which would buffer them whole.
+            marker = _CDATA_END if in_cdata else _CDATA_START
+            found = html.find(marker, pos, pos + size + len(marker))
+            end = found if found >= 0 else min(pos + size, len(html))
+            if in_cdata:
+                parser.handle_cdata(html[pos:end])
+            else:
+                # The parser keeps unparsed input from the previous slice in front of this one.
+                parser.source_base = pos - len(parser.rawdata)
+                parser.feed(html[pos:end])
+            if found >= 0:
+                pos = found + len(marker)
+                in_cdata = not in_cdata
+            else:
+                pos = end
+            chunk = out.take()
+            if chunk:
+                yield chunk
+        parser.close()
+        out.finish()
+        chunk = out.take(final=True)
+        if chunk:
+            yield chunk
+
+
+class _Output:
+    """Line-oriented Markdown writer with block separation and line prefixes."""
+
+    def __init__(self) -> None:
+        self.parts: list[str] = []
+        self.prefixes: list[str] = []
+        self.at_line_start = True
+        self.marker_only = False
+        self.started = False
+        self.pending_breaks = 0
+        # Whether a marker was alone on its line, for each quote opened but still empty.
+        self.unopened: list[bool] = []
+        # Offset and line prefix of each open panel body that may still join its heading's line;
+        # None once the body is known to span several lines.
+        self.held: list[tuple[int, str] | None] = []
+
+    def request_break(self, newlines: int) -> None:
+        """Separate the next content from the previous content by ``newlines`` line ends."""
+        if self.started and not self.marker_only:
+            self.pending_breaks = max(self.pending_breaks, newlines)
+
+    def push_prefix(self, prefix: str) -> None:
+        self._flush_breaks()
+        self.prefixes.append(prefix)
+
+    def open_quote(self) -> None:
+        """Start a quote; like a list marker, breaks requested before its content are dropped.
+
+        Nothing is written until the quote has content, as an empty quote is left out.
+        """
+        self.unopened.append(self.marker_only)
+        self.prefixes.append("> ")
+        self.marker_only = True
+
+    def pop_prefix(self) -> None:
+        if self.unopened:
+            self.prefixes.pop()
+            self.marker_only = self.unopened.pop()
+            return
+        # Pending breaks now separate the quote or item from what follows it.
+        self._end_marker_line()
+        self.prefixes.pop()
+        self.marker_only = False
+
+    def drop_breaks(self) -> None:
+        """Forget the breaks requested so far, as at the end of a list item."""
+        self.pending_breaks = 0
+
+    def write(self, text: str, raw: bool = False) -> None:
+        if not text:
+            return
+        if not raw and (self.at_line_start or self.pending_breaks):
+            text = text.lstrip(" ")
+            if not text:
+                return
+        if self.unopened:
+            self._open_quotes()
+        self._flush_breaks()
+        self.started = True
+        self.marker_only = False
+        if not self.prefixes:
+            self.parts.append(text)
+            self.at_line_start = text.endswith("\n")
+            return
+        lines = text.split("\n")
+        for index, line in enumerate(lines):
+            if index:
+                self._newline()
+            if line:
+                if self.at_line_start:
+                    self.parts.append("".join(self.prefixes))
+                self.parts.append(line)
+                self.at_line_start = False
+
+    def write_marker(self, marker: str) -> None:
+        """Start a list item line with ``marker``; breaks requested before its content are dropped."""
+        self.write(marker)
+        self.marker_only = True
+
+    def hold(self) -> None:
+        """Keep the heading just written until the following body is known to span several lines."""
+        text = "".join(self.parts)
+        self.parts = [text]
+        self.held.append((len(text), "".join(self.prefixes)))
+
+    def release(self) -> None:
+        """Join a held heading and its body when the body is a single line."""
+        held = self.held.pop() if self.held else None
+        if held is None:
+            return
+        start, prefix = held
+        text = "".join(self.parts)
+        body = text[start:]
+        # A started body is the blank separator line followed by its first line.
+        if body.count("\n") == 2 and body.startswith(f"\n{prefix.rstrip()}\n{prefix}"):
+            self.parts = [f"{text[:start]} {body[len(prefix.rstrip()) + 2 + len(prefix) :]}"]
+
+    def finish(self) -> None:
+        self.held = []
+        if not self.at_line_start:
+            self._newline()
+
+    def take(self, final: bool = False) -> str:
+        """Return the complete lines written so far, or everything when ``final``."""
+        text = "".join(self.parts)
+        if not final:
+            # Innermost first, as an inner body joining its heading shortens the outer ones.
+            for index in reversed(range(len(self.held))):
+                held = self.held[index]
+                if held is not None and text.count("\n", held[0]) <= 2:
+                    return ""
+                # The body spans several lines, so its heading stays on its own line.
+                self.held[index] = None
+        cut = len(text) if final else text.rfind("\n") + 1
+        self.parts = [text[cut:]] if cut < len(text) else []
+        return text[:cut]
+
+    def _open_quotes(self) -> None:
+        count = len(self.unopened)
+        self.unopened = []
+        quotes = self.prefixes[-count:]
+        del self.prefixes[-count:]
+        # The breaks before the quotes are separated by the enclosing prefixes.
+        self._flush_breaks()
+        if not self.at_line_start:
+            # A quote opening a list item shares the item marker's line.
+            self.parts.append("".join(quotes))
+        self.prefixes.extend(quotes)
+
+    def _flush_breaks(self) -> None:
+        breaks, self.pending_breaks = self.pending_breaks, 0
+        if breaks and not self.at_line_start:
+            self._newline()
+            breaks -= 1
+        for _ in range(breaks):
+            self._newline()
+
+    def _end_marker_line(self) -> None:
+        if self.marker_only and not self.at_line_start:
+            # An empty list item is its marker alone.
+            self.parts[-1] = self.parts[-1].rstrip(" ")
+
+    def _newline(self) -> None:
+        self._end_marker_line()
+        if self.at_line_start:
+            # A blank line inside a quote keeps its marker.
+            self.parts.append("".join(self.prefixes).rstrip())
+        self.parts.append("\n")
+        self.at_line_start = True
+
+
+class _Frame:
+    """An open element: its tag, what it renders as and the content captured for it."""
+
+    __slots__ = ("tag", "kind", "attrs", "buffer", "struck", "data")
+
+    def __init__(self, tag: str, kind: str, attrs: dict, struck: bool) -> None:
+        self.tag = tag
+        self.kind = kind
+        self.attrs = attrs
+        self.buffer: list[str] | None = None
+        self.struck = struck
+        self.data: dict = {}
+
+
+class _MarkdownParser(HTMLParser):
+    def __init__(self, converter: StreamingConverter, source: str) -> None:
+        super().__init__(convert_charrefs=True)
+        self.converter = converter
+        # The whole page, scanned ahead where the storage engine's layout depends on what follows.
+        self.source = source
+        # Offsets in the source of the parser's unparsed input and of the start tag being handled.
+        self.source_base = 0
+        self.tag_start = 0
+        # Number of open list items whose blank lines the storage engine removes.
+        self.tight_items = 0
+        self.out = _Output()
+        self.stack: list[_Frame] = []
+        self.captures: list[_Frame] = []
+        self.skipping = 0
+        self.raw = 0
+        self.pending_space = False
+        # Newlines held back at the end of code, so fences close without blank lines.
+        self.raw_newlines = 0
+        self.code_started = False
+
+    # Sinks
+
+    def _write(self, text: str, raw: bool = False) -> None:
+        if self.captures:
+            self.captures[-1].buffer.append(text)
+        else:
+            self.out.write(text, raw)
+
+    def _text(self, text: str) -> None:
+        if self.pending_space:
+            self.pending_space = False
+            self._write(" ")
+        self._write(text)
+
+    def _block_break(self, newlines: int = 2) -> None:
+        if self.captures:
+            self.pending_space = True
+        else:
+            self.pending_space = False
+            self.out.request_break(min(newlines, 1) if self.tight_items else newlines)
+
+    def _capture(self, frame: _Frame) -> None:
+        if frame.tag in _LABELLED_TAGS:
+            # Written with the element, which may render as nothing.
+            frame.data["space"] = self.pending_space
+        elif self.pending_space:
+            self._write(" ")
+        self.pending_space = False
+        frame.buffer = []
+        self.captures.append(frame)
+
+    def _release(self, frame: _Frame) -> str:
+        self.captures.remove(frame)
+        return "".join(frame.buffer)
+
+    # Parse events
+
+    def parse_starttag(self, i: int) -> int:
+        self.tag_start = self.source_base + i
+        return super().parse_starttag(i)
+
+    def handle_data(self, data: str) -> None:
+        if self.skipping:
+            return
+        if self.raw:
+            self._raw(data)
+            return
+        text = _WHITESPACE.sub(" ", data)
+        if text.startswith(" "):
+            self.pending_space = True
+            text = text[1:]
+        if not text:
+            return
+        trailing = text.endswith(" ")
+        if trailing:
+            text = text[:-1]
+        if text:
+            self._text(text.replace("*", r"\*"))
+        self.pending_space = trailing
+
+    def handle_cdata(self, data: str) -> None:
+        if self.raw:
+            self._raw(data)
+        else:
+            self.handle_data(data)
+
+    def _raw(self, data: str) -> None:
+        if self.captures:
+            self.captures[-1].buffer.append(data)
+            return
+        if not self.code_started:
+            data = data.lstrip("\n")
+            if not data:
+                return
+            self.code_started = True
+        stripped = data.rstrip("\n")
+        if stripped:
+            self.out.write("\n" * self.raw_newlines, raw=True)
+            self.out.write(stripped, raw=True)
+            self.raw_newlines = 0
+        self.raw_newlines += len(data) - len(stripped)
+
+    def handle_startendtag(self, tag: str, attrs: list) -> None:
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        attributes = {name: value or "" for name, value in attrs}
+        if self.skipping or self.raw:
+            if tag not in _VOID_TAGS:
+                self._push(tag, "ignored", attributes)
+            return
+        if tag in _VOID_TAGS:
+            self._void(tag, attributes)
+            return
+        self._start(self._push(tag, "", attributes))
+
+    def handle_endtag(self, tag: str) -> None:
+        for index in range(len(self.stack) - 1, -1, -1):
+            if self.stack[index].tag == tag:
+                break
+        else:
+            return
+        while len(self.stack) > index:
+            self._end(self.stack.pop())
+
+    def close(self) -> None:
+        super().close()
+        while self.stack:
+            self._end(self.stack.pop())
+
+    def _push(self, tag: str, kind: str, attrs: dict) -> _Frame:
+        parent_struck = self.stack[-1].struck if self.stack else False
+        struck = parent_struck or tag in {"s", "strike"} or "line-through" in attrs.get("style", "")
+        frame = _Frame(tag, kind, attrs, struck)
+        self.stack.append(frame)
+        return frame
+
+    # Element handling
+
+    def _void(self, tag: str, attrs: dict) -> None:
+        if tag == "br":
+            if self.captures:
+                self.pending_space = True
+            else:
+                self.pending_space = False
+                self.out.write("  \n")
+        elif tag == "hr":
+            self._block_break()
+            self._text("---")
+            self._block_break()
+        elif tag == "img" and attrs.get("src"):
+            self._text(f"![{attrs.get('alt', '')}]({attrs['src']})")
+
+    def _start(self, frame: _Frame) -> None:  # noqa: C901
+        tag, attrs = frame.tag, frame.attrs
+        if tag in _SKIPPED_TAGS or tag.startswith("ri:") and not self._in("ac:link", "ac:image"):
+            if tag.startswith("ri:"):
+                return
+            frame.kind = "skip"
+            self.skipping += 1
+        elif tag in _BLOCK_TAGS:
+            frame.kind = "block"
+            self._block_break()
+        elif _HEADING.fullmatch(tag):
+            frame.kind = "heading"
+            self._block_break()
+            self._capture(frame)
+        elif tag in _WRAP_MARKERS or tag in {"a", "code", "ac:link", "ac:task-body", "ac:parameter"}:
+            frame.kind = "capture"
+            self._capture(frame)
+        elif tag == "ac:task-status":
+            frame.kind = "capture"
+            self._capture(frame)
+        elif tag == "ri:page" or tag == "ri:attachment" or tag == "ri:url":
+            owner = self._owner("ac:link", "ac:image")
+            if owner is not None:
+                owner.data.setdefault("target", (tag, attrs))
+        elif tag == "blockquote":
+            frame.kind = "quote"
+            self._block_break()
+            if self.captures:
+                self._text(">")
+                self.pending_space = True
+            else:
+                self._open_quote(frame)
+        elif tag in {"ul", "ol"}:
+            frame.kind = "list"
+            start = attrs.get("start", "1")
+            frame.data["number"] = int(start) if start.isdigit() else 1
+            self._block_break()
+        elif tag == "li":
+            frame.kind = "item"
+            owner = self._owner("ul", "ol")
+            marker = "-"
+            if owner is not None and owner.tag == "ol":
+                marker = f"{owner.data['number']}."
+                owner.data["number"] += 1
+            if self.captures:
+                # Table cells hold the item on one line with the rest of the list.
+                self.pending_space = True
+                self._text(marker)
+                self.pending_space = True
+            else:
+                self.pending_space = False
+                self.out.request_break(1)
+                self.out.write_marker(f"{marker} ")
+                self.out.push_prefix(" " * (len(marker) + 1))
+                frame.data["prefixed"] = True
+                if not self._is_loose_item():
+                    frame.data["tight"] = True
+                    self.tight_items += 1
+        elif tag == "pre":
+            self._open_fence(frame, "", self._fence_for(tag))
+        elif tag == "table":
+            frame.kind = "table"
+            frame.data["rows"] = []
+            self._block_break()
+        elif tag == "tr":
+            frame.kind = "row"
+            frame.data["cells"] = []
+        elif tag in {"td", "th"}:
+            frame.kind = "cell"
+            self._capture(frame)
+        elif tag == "time" and attrs.get("datetime"):
+            self._text(attrs["datetime"])
+            frame.kind = "skip"
+            self.skipping += 1
+        elif tag == "ac:structured-macro":
+            self._start_macro(frame)
+        elif tag == "ac:rich-text-body":
+            self._start_rich_body(frame)
+        elif tag == "ac:plain-text-body":
+            macro = self._owner("ac:structured-macro")
+            language = macro.data.get("params", {}).get("language", "") if macro else ""
+            self._open_fence(frame, language, self._fence_for(tag))
+        elif tag == "ac:image":
+            frame.kind = "image"
+        elif tag == "ac:task-list":
+            frame.kind = "block"
+            self._block_break()
+        elif tag == "ac:task":
+            frame.kind = "task"
+        elif tag == "ac:emoticon":
+            self._text(attrs.get("ac:emoji-fallback", ""))
+
+    def _end(self, frame: _Frame) -> None:  # noqa: C901
+        kind = frame.kind
+        if kind == "ignored" or not kind:
+            return
+        if kind == "skip":
+            self.skipping -= 1
+        elif kind == "block":
+            self._block_break()
+        elif kind == "heading":
+            text = _WHITESPACE.sub(" ", self._release(frame)).strip()
+            level = int(frame.tag[1])
+            if text:
+                self._text(f"{'#' * level} {text}")
+            self._block_break()
+        elif kind == "capture":
+            self._end_capture(frame)
+        elif kind == "quote":
+            if "> " in self.out.prefixes and not self.captures:
+                self._close_quote(frame)
+            self._block_break()
+        elif kind == "list":
+            self._block_break()
+        elif kind == "item":
+            if frame.data.get("prefixed"):
+                self.out.pop_prefix()
+                # Items follow each other on the next line, whatever they end with.
+                self.out.drop_breaks()
+            if frame.data.get("tight"):
+                self.tight_items -= 1
+            self.pending_space = False
+        elif kind == "fence":
+            self._close_fence(frame)
+        elif kind == "table":
+            self._end_table(frame)
+        elif kind == "row":
+            self._end_row(frame)
+        elif kind == "cell":
+            text = _WHITESPACE.sub(" ", self._release(frame)).strip().replace("|", r"\|")
+            row = self._owner("tr")
+            if row is not None:
+                row.data["cells"].append(text)
+            self.pending_space = False
+        elif kind == "macro":
+            self._end_macro(frame)
+        elif kind == "panel-body":
+            if not self.captures:
+                self.out.release()
+                self._close_quote(frame)
+            self._block_break()
+        elif kind == "image":
+            self._end_image(frame)
+        elif kind == "task":
+            self._end_task(frame)
+
+    def _end_capture(self, frame: _Frame) -> None:
+        text = self._release(frame)
+        tag = frame.tag
+        if tag in _LABELLED_TAGS:
+            # Spaces at the end of a label are dropped with it.
+            self.pending_space = frame.data["space"]
+        if tag in _WRAP_MARKERS:
+            stripped = text.strip()
+            if stripped:
+                lead = text[: len(text) - len(text.lstrip())]
+                trail = text[len(text.rstrip()) :]
+                self._write(f"{lead}{_WRAP_MARKERS[tag]}{stripped}{_WRAP_MARKERS[tag]}")
+                self.pending_space = self.pending_space or bool(trail)
+        elif tag == "code":
+            self._end_code(text.replace(r"\*", "*"))
+        elif tag == "a":
+            self._end_link(frame, _WHITESPACE.sub(" ", text).strip())
+        elif tag == "ac:link":
+            self._end_ac_link(frame, _WHITESPACE.sub(" ", text).strip())
+        elif tag == "ac:parameter":
+            macro = self._owner("ac:structured-macro")
+            if macro is not None:
+                macro.data.setdefault("params", {})[frame.attrs.get("ac:name", "")] = text.replace(r"\*", "*").strip()
+        elif tag == "ac:task-status":
+            task = self._owner("ac:task")
+            if task is not None:
+                task.data["complete"] = text.strip() == "complete"
+        elif tag == "ac:task-body":
+            task = self._owner("ac:task")
+            if task is not None:
+                task.data["body"] = _WHITESPACE.sub(" ", text).strip()
+
+    def _end_code(self, text: str) -> None:
+        if not text:
+            return
+        ticks = "`"
+        while ticks in text:
+            ticks += "`"
+        pad = " " if text.startswith("`") or text.endswith("`") else ""
+        self._text(f"{ticks}{pad}{text}{pad}{ticks}")
+
+    def _end_link(self, frame: _Frame, text: str) -> None:
+        href = frame.attrs.get("href", "")
+        if href and not (self.converter.skip_strikethrough_links and frame.struck):
+            link = classify_url(href)
+            if link is not None:
+                self.converter.links.append((*link, href))
+        if not href:
+            self._text(text)
+        elif not text or text == href:
+            self._text(f"<{href}>")
+        else:
+            self._text(f"[{text}]({href})")
+
+    def _end_ac_link(self, frame: _Frame, label: str) -> None:
+        kind, attrs = frame.data.get("target", (None, {}))
+        if kind == "ri:page":
+            title = attrs.get("ri:content-title", "")
+            space = attrs.get("ri:space-key") or self.converter.space_key
+            if title and not (self.converter.skip_strikethrough_links and frame.struck):
+                self.converter.links.append((None, (space, title), ""))
+            label = label or title
+            self._text(f"[{label}](/wiki/display/{space}/{quote_plus(title)})" if title and space else label)
+        elif kind == "ri:attachment" and self.converter.local_attachments:
+            filename = attrs.get("ri:filename", "")
+            self._text(f"[{label or filename}]({quote(attachment_filename(filename))})")
+        elif kind == "ri:url":
+            href = attrs.get("ri:value", "")
+            self._text(f"[{label or href}]({href})")
+        elif frame.attrs.get("ac:anchor"):
+            anchor = frame.attrs["ac:anchor"]
+            self._text(f"[{label or anchor}](#{anchor})")
+        elif label:
+            self._text(label)
+
+    def _end_image(self, frame: _Frame) -> None:
+        alt = frame.attrs.get("ac:alt") or frame.attrs.get("ac:title") or ""
+        kind, attrs = frame.data.get("target", (None, {}))
+        if kind == "ri:attachment":
+            if self.converter.local_attachments:
+                filename = attrs.get("ri:filename", "")
+                self._text(f"![{alt or filename}]({quote(attachment_filename(filename))})")
+        elif kind == "ri:url":
+            self._text(f"![{alt}]({attrs.get('ri:value', '')})")
+
+    def _end_row(self, frame: _Frame) -> None:
+        cells = frame.data["cells"]
+        table = self._owner("table")
+        if not cells or table is None:
+            return
+        if self.captures:
+            self._text(f"| {' | '.join(cells)} |")
+            self.pending_space = True
+            return
+        table.data["rows"].append(cells)
+
+    def _end_table(self, frame: _Frame) -> None:
+        rows = frame.data["rows"]
+        if rows:
+            # Rows are padded to the widest one, which is only known at the end of the table.
+            width = max(len(cells) for cells in rows)
+            for index, cells in enumerate(rows):
+                self.out.request_break(1)
+                self.out.write(f"| {' | '.join(cells + [''] * (width - len(cells)))} |")
+                if index == 0:
+                    self.out.write(f"\n|{'|'.join([' --- '] * width)}|")
+        self._block_break()
+
+    def _end_task(self, frame: _Frame) -> None:
+        checked = "x" if frame.data.get("complete") else " "
+        line = f"- [{checked}] {frame.data.get('body', '')}".rstrip()
+        if self.captures:
+            self._text(line)
+            self.pending_space = True
+            return
+        self.out.request_break(1)
+        self.out.write(line)
+
+    def _start_macro(self, frame: _Frame) -> None:
+        name = frame.attrs.get("ac:name", "")
+        frame.kind = "macro"
+        frame.data["name"] = name
+        if name in _SKIPPED_MACROS:
+            frame.kind = "skip"
+            self.skipping += 1
+
+    def _end_macro(self, frame: _Frame) -> None:
+        name = frame.data["name"]
+        params = frame.data.get("params", {})
+        if name == "status" and params.get("title"):
+            self._text(f"**[{params['title']}]**")
+        elif name == "jira" and params.get("key"):
+            self._text(params["key"])
+        elif name in _CODE_MACROS and not frame.data.get("body"):
+            self._open_fence(frame, params.get("language", ""))
+            self._close_fence(frame)
+
+    def _start_rich_body(self, frame: _Frame) -> None:
+        macro = self._owner("ac:structured-macro")
+        if macro is None:
+            return
+        macro.data["body"] = True
+        name = macro.data["name"]
+        title = macro.data.get("params", {}).get("title", "")
+        if name in _PANEL_MACROS:
+            label = _PANEL_MACROS[name]
+            self._block_break()
+            if self.captures:
+                self._text(">")
+                self.pending_space = True
+            else:
+                self._open_quote(frame)
+                frame.kind = "panel-body"
+            self._text(f"**{label}: {title}**" if title else f"**{label}:**")
+            self._block_break()
+            if not self.captures:
+                self.out.hold()
+        elif name == "expand":
+            self._block_break()
+            self._text(f"**{title or 'Details'}**")
+            self._block_break()
+
+    def _open_quote(self, frame: _Frame) -> None:
+        self.out.open_quote()
+        # Blank lines in a quote keep their marker, so a tight list item around it keeps them.
+        frame.data["tight_items"] = self.tight_items
+        self.tight_items = 0
+
+    def _close_quote(self, frame: _Frame) -> None:
+        self.out.pop_prefix()
+        self.tight_items = frame.data.pop("tight_items", self.tight_items)
+        if self.tight_items:
+            self.out.pending_breaks = min(self.out.pending_breaks, 1)
+
+    def _open_fence(self, frame: _Frame, language: str, fence: str = "```") -> None:
+        macro = self._owner("ac:structured-macro")
+        if macro is not None:
+            macro.data["body"] = True
+        frame.kind = "fence"
+        frame.data["fence"] = fence
+        self.raw += 1
+        self.raw_newlines = 0
+        self.code_started = False
+        if self.captures:
+            # Table cells hold the code block on one line.
+            self.pending_space = True
+            self._text(f"{fence}{language}")
+            self._write(" ")
+            return
+        self._block_break()
+        self.out.write(f"{fence}{language}\n", raw=True)
+
+    def _close_fence(self, frame: _Frame) -> None:
+        self.raw -= 1
+        self.raw_newlines = 0
+        if self.captures:
+            self._write(f" {frame.data['fence']}")
+            self.pending_space = True
+            return
+        self.out.write(f"\n{frame.data['fence']}", raw=True)
+        self._block_break()
+
+    def _fence_for(self, tag: str) -> str:
+        """Return a fence longer than any backtick run in the code of the element being started."""
+        end = self.source.find(f"</{tag}", self.tag_start)
+        runs = _BACKTICKS.finditer(self.source, self.tag_start, end if end >= 0 else len(self.source))
+        longest = max((len(run.group()) for run in runs), default=0)
+        return "`" * (longest + 1) if longest >= 3 else "```"
+
+    def _is_loose_item(self) -> bool:
+        """Return whether the list item being started has a paragraph, code block or macro child."""
+        depth = 0
+        for match in _SOURCE_TAG.finditer(self.source, self.tag_start):
+            closing, name, self_closing = match.groups()
+            if name is None:
+                continue
+            name = name.lower()
+            if closing:
+                depth -= 1
+                if depth <= 0:
+                    return False
+            else:
+                if depth == 1 and name in _LOOSE_ITEM_CHILDREN:
+                    return True
+                if not self_closing and name not in _VOID_TAGS:
+                    depth += 1
+        return False
+
+    def _in(self, *tags: str) -> bool:
+        return any(frame.tag in tags for frame in self.stack)
+
+    def _owner(self, *tags: str) -> _Frame | None:
+        for frame in reversed(self.stack):
+            if frame.tag in tags:
+                return frame
+        return None
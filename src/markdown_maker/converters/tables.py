@@ -0,0 +1,134 @@
+"""Fast path for tables in the markdownify converter.
+
+markdownify serializes and re-parses the page and then visits every node,
+which dominates the conversion of pages with tables of thousands of rows, such
+as Jira or inventory exports. Simple tables, without merged cells, captions or
+nested tables, are rendered here in one pass over the already parsed rows:
+plain-text cells are escaped directly, and only cells with markup go through
+markdownify's node visitor. Rows use markdownify's own row layout, so the
+output is the same as markdownify's. Other tables are left to markdownify.
+
+The fast path calls the converter's ``convert_tr``, ``escape`` and
+``process_tag`` methods, which markdownify does not document as stable, so
+the dependency is pinned to the minor release it is tested against.
+"""
+
+import re
+import secrets
+
+from bs4 import BeautifulSoup, NavigableString, Tag
+from markdownify import MarkdownConverter
+
+_ROW_GROUPS = {"thead", "tbody", "tfoot"}
+
+# Containers that markdownify renders as plain blocks. Tables inside lists,
+# quotes or other tables are indented or inlined and take the general path.
+_BLOCK_ANCESTORS = {"[document]", "html", "body", "div", "section", "ac:layout", "ac:layout-section", "ac:layout-cell"}
+
+_WHITESPACE_RE = re.compile(r"[\t \r\n]+")
+
+
+def extract_simple_tables(soup: BeautifulSoup, converter: MarkdownConverter) -> tuple[str, list[str]]:
+    """Render the simple tables of a page and replace them with placeholder paragraphs.
+
+    Args:
+        soup: The parsed page, modified in place.
+        converter: The markdownify converter the rest of the page is converted with.
+
+    Returns:
+        The placeholder prefix, followed by the table number in each
+        placeholder, and the Markdown of each table.
+    """
+    prefix = f"mdtable{secrets.token_hex(8)}n"
+    tables: list[str] = []
+    for table in soup.find_all("table"):
+        if not isinstance(table, Tag) or table.parent is None or not _in_block_context(table):
+            continue
+        markdown = render_simple_table(table, converter)
+        if markdown is None:
+            continue
+        placeholder = soup.new_tag("p")
+        placeholder.string = f"{prefix}{len(tables)}"
+        table.replace_with(placeholder)
+        tables.append(markdown)
+    return prefix, tables
+
+
+def restore_tables(markdown: str, prefix: str, tables: list[str]) -> str:
+    """Replace the placeholders left by ``extract_simple_tables`` with the tables."""
+    if not tables:
+        return markdown
+    return re.sub(f"{prefix}(\\d+)", lambda m: tables[int(m.group(1))], markdown)
+
+
+def render_simple_table(table: Tag, converter: MarkdownConverter) -> str | None:
+    """Return the Markdown of a table, or None if it is not simple.
+
+    Args:
+        table: The ``table`` element.
+        converter: The markdownify converter whose options and row layout are used.
+
+    Returns:
+        The table's Markdown, without surrounding blank lines.
+    """
+    rows = _rows(table)
+    if rows is None or table.find("table") is not None:
+        return None
+    parent_tags = {"table", "tbody", "tr"}
+    lines = []
+    group = None
+    for tr in rows:
+        cells = []
+        for cell in tr.children:
+            if isinstance(cell, Tag):
+                if cell.name not in ("td", "th") or cell.get("colspan", "1") != "1" or cell.get("rowspan", "1") != "1":
+                    return None
+                cells.append(cell)
+            elif str(cell).strip():
+                return None
+        text = "".join(_cell(cell, converter, parent_tags) for cell in cells)
+        if tr.parent is group:
+            # Only the first row of a group can carry the header separator.
+            lines.append(f"|{text}\n")
+        else:
+            group = tr.parent
+            lines.append(converter.convert_tr(tr, text, parent_tags))
+    return "".join(lines).strip()
+
+
+def _in_block_context(table: Tag) -> bool:
+    return all(parent.name in _BLOCK_ANCESTORS for parent in table.parents)
+
+
+def _rows(table: Tag) -> list[Tag] | None:
+    """Return the rows of a table, or None if it holds anything but row groups and rows."""
+    rows = []
+    for child in table.children:
+        if isinstance(child, NavigableString):
+            if str(child).strip() and type(child) is NavigableString:
+                return None
+            continue
+        if child.name == "tr":
+            rows.append(child)
+        elif child.name in _ROW_GROUPS:
+            for row in child.children:
+                if isinstance(row, Tag):
+                    if row.name != "tr":
+                        return None
+                    rows.append(row)
+                elif str(row).strip() and type(row) is NavigableString:
+                    return None
+        else:
+            return None
+    return rows
+
+
+def _cell(cell: Tag, converter: MarkdownConverter, parent_tags: set[str]) -> str:
+    contents = cell.contents
+    if not contents:
+        return "  |"
+    if len(contents) == 1 and type(contents[0]) is NavigableString:
+        # Plain text: what markdownify's text and cell conversions amount to.
+        text = converter.escape(_WHITESPACE_RE.sub(" ", str(contents[0])), parent_tags)
+        return f" {text.strip()} |"
+    return converter.process_tag(cell, parent_tags=parent_tags)
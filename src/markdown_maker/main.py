@@ -1,12 +1,37 @@
 """Main entry point for the Markdown Maker CLI."""
 
+import os
+import socket
+import time
+from datetime import timedelta
+
 import click
 
+from markdown_maker.clients.attachment_downloader import AttachmentDownloader
 from markdown_maker.clients.confluence_client import ConfluenceClient
-from markdown_maker.clients.confluence_tree_traverser import ConfluenceTreeTraverser
+from markdown_maker.clients.confluence_tree_traverser import TRAVERSAL_ORDERS, ConfluenceTreeTraverser
+from markdown_maker.clients.export_planner import ExportPlanner
+from markdown_maker.clients.export_watcher import ExportWatcher
+from markdown_maker.clients.negative_cache import DEFAULT_NEGATIVE_CACHE_TTL, NEGATIVE_CACHE_FILENAME, NegativeCache
+from markdown_maker.clients.title_resolver import TITLE_CACHE_FILENAME, TitleResolver
+from markdown_maker.converters.cache import ConversionCache
+from markdown_maker.converters.engines import DEFAULT_ENGINE, ENGINES, get_converter
 from markdown_maker.converters.html_to_markdown import convert_html_to_markdown
-from markdown_maker.utils.handlers import make_handle_page_multi, make_handle_page_single
-from markdown_maker.utils.helpers import extract_page_id_from_url
+from markdown_maker.converters.streaming import StreamingConverter
+from markdown_maker.utils.archive import ARCHIVE_SUFFIXES, PageArchive
+from markdown_maker.utils.handlers import (
+    make_handle_page_archive,
+    make_handle_page_jsonl,
+    make_handle_page_multi,
+    make_handle_page_single,
+    make_handle_page_store,
+)
+from markdown_maker.utils.helpers import extract_page_id_from_url, parse_duration, parse_size
+from markdown_maker.utils.journal import JOURNAL_FILENAME, ExportJournal
+from markdown_maker.utils.link_index import LinkIndex
+from markdown_maker.utils.page_store import PageStore
+from markdown_maker.utils.work_queue import WorkQueue
+from markdown_maker.utils.writer import BackgroundWriter
 
 
 @click.group()
@@ -34,7 +59,23 @@ def traverse_and_write(
     output_path: str | None = None,
     parent_context: str = "",
     skip_strikethrough_links: bool = False,
-) -> None:
+    journal_path: str | None = None,
+    resume: bool = False,
+    io_workers: int = 0,
+    archive_path: str | None = None,
+    jsonl_path: str | None = None,
+    database_path: str | None = None,
+    cache_dir: str | None = None,
+    engine: str = DEFAULT_ENGINE,
+    download_workers: int = 0,
+    local_links: bool = False,
+    order: str = "depth-first",
+    max_pages: int | None = None,
+    deadline: float | None = None,
+    queue: WorkQueue | None = None,
+    stream_threshold: int | None = None,
+    negative_cache_ttl: float = DEFAULT_NEGATIVE_CACHE_TTL,
+) -> str | None:
     """Unified recursive traversal for both single-file and multi-file output modes.
 
     Args:
@@ -46,31 +87,194 @@ def traverse_and_write(
         output_path: Output file path for single-file mode.
         parent_context: Context for error messages.
         skip_strikethrough_links: If True, skip recursion into struck-through links.
+        journal_path: If set, checkpoint progress to this journal file. The
+            journal is removed once the traversal completes.
+        resume: If True, continue from an existing journal at journal_path
+            instead of starting over.
+        io_workers: Number of background threads writing files in multi-file
+            mode. Zero writes each page inline on the traversal thread.
+        archive_path: If set, write pages into this zip or tar archive, using
+            the multi-file layout, instead of into output_dir.
+        jsonl_path: If set, write one JSON record per page to this file, or to
+            stdout for ``-``, instead of into output_dir.
+        database_path: If set, write pages, their links and a full-text index
+            into this SQLite database instead of into output_dir.
+        cache_dir: If set, reuse and store conversions in this content-addressed
+            cache directory. Resolved page titles and inaccessible pages are
+            persisted there as well.
+        engine: The converter engine, one of ``ENGINES``.
+        download_workers: If positive, download page attachments next to each
+            page's Markdown in multi-file mode, with this many concurrent downloads.
+        local_links: If True, rewrite links between exported pages to relative
+            paths in multi-file mode.
+        order: Traversal order, one of ``TRAVERSAL_ORDERS``.
+        max_pages: If set, stop after writing this many pages.
+        deadline: If set, stop fetching new pages after this many seconds.
+        queue: If set, export pages claimed from this work queue, shared with
+            other worker processes, in multi-file mode.
+        stream_threshold: If set, convert pages whose storage body has at
+            least this many characters with the streaming converter and write
+            them chunk by chunk, in multi-file or single-file mode.
+        negative_cache_ttl: Seconds for which a restricted or deleted page is
+            skipped without a request once fetching it failed.
+
+    Returns:
+        None if the traversal completed, otherwise why it stopped early. The
+        journal, or the queue, keeps the progress in that case so that the
+        export can be resumed.
     """
+    journal = ExportJournal(journal_path, page_id, resume=resume) if journal_path else None
+    writer = None
+    archive = None
+    stream = None
+    store = None
+    links = None
     if single_file:
         if not output_path:
             raise ValueError("output_path must be provided for single_file mode.")
-        # Truncate file before writing
-        with open(output_path, "w", encoding="utf-8"):
-            pass
+        if not (journal and journal.resumed):
+            # Truncate file before writing
+            with open(output_path, "w", encoding="utf-8"):
+                pass
         handler = make_handle_page_single(output_path)
+    elif jsonl_path:
+        stream = click.open_file(jsonl_path, "a" if journal and journal.resumed else "w", encoding="utf-8")
+        handler = make_handle_page_jsonl(stream)
+    elif archive_path:
+        archive = PageArchive(archive_path)
+        handler = make_handle_page_archive(archive)
+    elif database_path:
+        store = PageStore(database_path, reset=not (journal and journal.resumed))
+        if journal:
+            # Pages are journaled once they are committed.
+            journal.output = store
+        handler = make_handle_page_store(store)
     else:
         if not output_dir:
             raise ValueError("output_dir must be provided for multi-file mode.")
-        handler = make_handle_page_multi(output_dir)
+        writer = BackgroundWriter(io_workers) if io_workers > 0 else None
+        if journal and writer:
+            # Pages are journaled once their files are written.
+            journal.output = writer
+        links = LinkIndex() if local_links else None
+        handler = make_handle_page_multi(output_dir, writer, links)
+    # Only JSONL records include page ancestors; skip fetching them otherwise.
+    content_profile = "record" if jsonl_path else "conversion"
+    attachments = None
+    if download_workers > 0 and not (single_file or jsonl_path or archive_path or database_path):
+        # The traversal and every download share the client's connection pool.
+        client = ConfluenceClient(workers=1 + download_workers, content_profile=content_profile)
+        attachments = AttachmentDownloader(client, output_dir, download_workers)
+    else:
+        client = ConfluenceClient(content_profile=content_profile)
+    # Attachment images only resolve when the attachments are downloaded.
+    local_attachments = attachments is not None
+    title_resolver = TitleResolver(client, os.path.join(cache_dir, TITLE_CACHE_FILENAME) if cache_dir else None)
+    negative_cache = NegativeCache(
+        os.path.join(cache_dir, NEGATIVE_CACHE_FILENAME) if cache_dir else None, negative_cache_ttl
+    )
+    if links:
+        links.title_resolver = title_resolver
+        if journal:
+            # Pages written by an interrupted run are not handled again; seed their locations and
+            # patch their links once the export is complete.
+            for entry in journal.completed.values():
+                links.register_written(entry["id"], entry["page_dir"])
     traverser = ConfluenceTreeTraverser(
-        client=ConfluenceClient(),
+        client=client,
         max_depth=max_depth,
         handle_page=handler,
         parent_context=parent_context,
         parent_dir=None,
         skip_strikethrough_links=skip_strikethrough_links,
+        journal=journal,
+        cache=ConversionCache(cache_dir, engine, local_attachments) if cache_dir else None,
+        converter=get_converter(engine, local_attachments) if engine != DEFAULT_ENGINE or local_attachments else None,
+        title_resolver=title_resolver,
+        attachments=attachments,
+        order=order,
+        max_pages=max_pages,
+        deadline=time.monotonic() + deadline if deadline is not None else None,
+        stream_threshold=stream_threshold,
+        negative_cache=negative_cache,
     )
-    traverser.traverse(
-        pid=page_id,
-        page_url=url if single_file else f"https://company.atlassian.net/wiki/pages/viewpage.action?pageId={page_id}",
-        current_depth=1,
+    root_url = url if single_file else f"https://company.atlassian.net/wiki/pages/viewpage.action?pageId={page_id}"
+    try:
+        try:
+            if queue:
+                traverser.traverse_queue(queue, f"{socket.gethostname()}-{os.getpid()}", page_id, root_url)
+            else:
+                traverser.traverse(pid=page_id, page_url=root_url, current_depth=1)
+        finally:
+            # Flush queued writes even on failure so that the pages written are journaled.
+            if writer:
+                writer.close()
+            if links:
+                links.finalize()
+            if attachments:
+                attachments.close()
+            if archive:
+                archive.close()
+            if stream:
+                stream.close()
+            if store:
+                store.close()
+            title_resolver.save()
+            negative_cache.save()
+    except BaseException:
+        if journal:
+            journal.close()
+        raise
+    if journal:
+        if traverser.stop_reason:
+            journal.close()
+        else:
+            journal.discard()
+    return traverser.stop_reason
+
+
+def _parse_duration_option(ctx: click.Context, param: click.Parameter, value: str | None) -> float | None:
+    if value is None:
+        return None
+    try:
+        return parse_duration(value)
+    except ValueError as exc:
+        raise click.BadParameter(str(exc)) from exc
+
+
+def _parse_size_option(ctx: click.Context, param: click.Parameter, value: str | None) -> int | None:
+    if value is None:
+        return None
+    try:
+        return parse_size(value)
+    except ValueError as exc:
+        raise click.BadParameter(str(exc)) from exc
+
+
+def _format_bytes(size: float) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def print_plan(plan: dict, max_depth: int, requests_per_second: float) -> None:
+    """Print the report of ``ExportPlanner.plan``."""
+    click.echo(f"Plan for '{plan['root_title']}' (max depth {max_depth}):")
+    click.echo(f"Pages: {plan['pages']}")
+    histogram = ", ".join(f"{depth}: {count}" for depth, count in plan["depth_histogram"].items())
+    click.echo(f"Pages per depth: {histogram}")
+    click.echo(f"Sampled bodies: {plan['sampled']}")
+    click.echo(f"Average body size: {_format_bytes(plan['avg_body_bytes'])}")
+    click.echo(f"Estimated total size: {_format_bytes(plan['estimated_total_bytes'])}")
+    click.echo(
+        f"Embedded links per page: {plan['avg_links_per_page']:.1f} "
+        "(not followed by the plan; the export may reach more pages)"
     )
+    click.echo(f"Estimated requests: {plan['estimated_requests']}")
+    duration = timedelta(seconds=round(plan["estimated_seconds"]))
+    click.echo(f"Estimated run time: {duration} at {requests_per_second:g} requests/s")
 
 
 @cli.command()
@@ -99,6 +303,128 @@ def traverse_and_write(
     is_flag=True,
     help="Do not recurse into links that are struck through in the HTML.",
 )
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Continue an interrupted recursive export from its journal in the output directory.",
+)
+@click.option(
+    "--io-workers",
+    default=4,
+    show_default=True,
+    type=click.IntRange(min=0),
+    help="Background threads writing output files in multi-file mode (0 writes inline).",
+)
+@click.option(
+    "--archive",
+    "archive_path",
+    default=None,
+    type=click.Path(dir_okay=False, writable=True, resolve_path=True),
+    help=f"Write recursive output into one archive ({', '.join(ARCHIVE_SUFFIXES)}) instead of a directory tree.",
+)
+@click.option(
+    "--format",
+    "output_format",
+    default="markdown",
+    show_default=True,
+    type=click.Choice(["markdown", "jsonl"]),
+    help="Output format. 'jsonl' streams one JSON record per page and implies --recursive.",
+)
+@click.option(
+    "--jsonl-file",
+    default=None,
+    type=click.Path(dir_okay=False, allow_dash=True),
+    help="Destination for --format jsonl ('-' for stdout). Defaults to <page title>.jsonl in the output directory.",
+)
+@click.option(
+    "--database",
+    "database_path",
+    default=None,
+    type=click.Path(dir_okay=False, writable=True, resolve_path=True),
+    help="Write recursive output into one SQLite database with a full-text index instead of a directory tree.",
+)
+@click.option(
+    "--cache-dir",
+    default=None,
+    envvar="MARKDOWN_MAKER_CACHE_DIR",
+    type=click.Path(file_okay=False, dir_okay=True, writable=True, resolve_path=True),
+    help="Cache conversions here, keyed by a hash of the page HTML, so unchanged pages are not reconverted.",
+)
+@click.option(
+    "--engine",
+    default=DEFAULT_ENGINE,
+    show_default=True,
+    type=click.Choice(ENGINES),
+    help="Converter engine: the generic 'markdownify' HTML converter or the native Confluence 'storage' converter.",
+)
+@click.option(
+    "--plan",
+    is_flag=True,
+    help="Estimate the pages, size and run time of a recursive export without exporting anything.",
+)
+@click.option(
+    "--plan-sample",
+    default=20,
+    show_default=True,
+    type=click.IntRange(min=0),
+    help="Number of page bodies --plan fetches to estimate body size and link fan-out.",
+)
+@click.option(
+    "--order",
+    default="depth-first",
+    show_default=True,
+    type=click.Choice(TRAVERSAL_ORDERS),
+    help="Traversal order. 'breadth-first' exports all pages of a level before going deeper.",
+)
+@click.option(
+    "--max-pages",
+    default=None,
+    type=click.IntRange(min=1),
+    help="Stop after writing this many pages.",
+)
+@click.option(
+    "--deadline",
+    default=None,
+    callback=_parse_duration_option,
+    help="Stop fetching new pages after this long, e.g. 90s, 30m or 2h.",
+)
+@click.option(
+    "--local-links",
+    is_flag=True,
+    help="Rewrite links between exported pages to relative paths in recursive multi-file output.",
+)
+@click.option(
+    "--download-attachments",
+    is_flag=True,
+    help="Download page attachments and images next to the Markdown and link to the local copies.",
+)
+@click.option(
+    "--download-workers",
+    default=8,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Concurrent attachment downloads for --download-attachments.",
+)
+@click.option(
+    "--queue",
+    "queue_path",
+    default=None,
+    type=click.Path(dir_okay=False, writable=True, resolve_path=True),
+    help="Share a recursive export with other processes started with the same --queue and --output-dir.",
+)
+@click.option(
+    "--stream-threshold",
+    default=None,
+    callback=_parse_size_option,
+    help="Convert pages whose storage body is at least this large, e.g. 10M, with the streaming converter.",
+)
+@click.option(
+    "--negative-cache-ttl",
+    default="24h",
+    show_default=True,
+    callback=_parse_duration_option,
+    help="Skip restricted or deleted pages without a request for this long after fetching them failed; 0 disables.",
+)
 def convert(
     url: str,
     output_dir: str,
@@ -106,49 +432,194 @@ def convert(
     max_depth: int,
     single_file: bool,
     skip_strikethrough_links: bool,
+    resume: bool,
+    io_workers: int,
+    archive_path: str | None,
+    output_format: str,
+    jsonl_file: str | None,
+    database_path: str | None,
+    cache_dir: str | None,
+    engine: str,
+    plan: bool,
+    plan_sample: int,
+    order: str,
+    max_pages: int | None,
+    deadline: float | None,
+    local_links: bool,
+    download_attachments: bool,
+    download_workers: int,
+    queue_path: str | None,
+    stream_threshold: int | None,
+    negative_cache_ttl: float,
 ) -> None:
     """Converts a Confluence page to a Markdown file."""
-    import os
+    if output_format == "jsonl":
+        if single_file or archive_path:
+            raise click.UsageError("--format jsonl cannot be combined with --single-file or --archive.")
+        recursive = True
+    # Keep stdout clean for the records when streaming JSONL to it.
+    summary_to_stderr = output_format == "jsonl" and jsonl_file == "-"
+
+    if archive_path:
+        if single_file:
+            raise click.UsageError("--archive cannot be combined with --single-file.")
+        if resume:
+            raise click.UsageError("--resume is not supported with --archive.")
+        if not archive_path.lower().endswith(ARCHIVE_SUFFIXES):
+            raise click.UsageError(f"--archive must end with one of: {', '.join(ARCHIVE_SUFFIXES)}.")
+        recursive = True
+
+    if database_path:
+        if single_file or archive_path or output_format == "jsonl" or queue_path:
+            raise click.UsageError(
+                "--database cannot be combined with --single-file, --archive, --format jsonl or --queue."
+            )
+        recursive = True
+
+    if download_attachments and (single_file or archive_path or output_format == "jsonl" or database_path):
+        raise click.UsageError(
+            "--download-attachments requires directory output; it cannot be combined with "
+            "--single-file, --archive, --format jsonl or --database."
+        )
+
+    if local_links and (single_file or archive_path or output_format == "jsonl" or database_path):
+        raise click.UsageError(
+            "--local-links cannot be combined with --single-file, --archive, --format jsonl or --database."
+        )
+
+    if queue_path:
+        if single_file or archive_path or output_format == "jsonl":
+            raise click.UsageError(
+                "--queue requires directory output; it cannot be combined with "
+                "--single-file, --archive or --format jsonl."
+            )
+        if local_links or resume:
+            raise click.UsageError("--queue cannot be combined with --local-links or --resume.")
+        recursive = True
+
+    if stream_threshold is not None and (archive_path or output_format == "jsonl" or database_path):
+        raise click.UsageError(
+            "--stream-threshold requires directory or --single-file output; it cannot be combined with "
+            "--archive, --format jsonl or --database."
+        )
+    if stream_threshold is not None and engine != "storage":
+        # Streamed pages follow the storage engine; other pages must match them.
+        raise click.UsageError("--stream-threshold requires --engine storage.")
 
     page_id = extract_page_id_from_url(url)
+    if plan:
+        client = ConfluenceClient(content_profile="conversion")
+        report = ExportPlanner(client, max_depth, plan_sample).plan(page_id)
+        print_plan(report, max_depth, client.requests_per_second)
+        return
     os.makedirs(output_dir, exist_ok=True)
 
-    client = ConfluenceClient()
-    page = client.get_page_content(page_id)
+    client = ConfluenceClient(content_profile="conversion")
+    # The traversal fetches the root page's body itself; only its title is needed here.
+    page = client.get_page_metadata(page_id) if single_file or recursive else client.get_page_content(page_id)
     title = page.get("title", "confluence_page")
     output_filename = sanitize_filename(title)
     output_path = os.path.join(output_dir, output_filename)
 
+    if output_format == "jsonl" and not jsonl_file:
+        jsonl_file = os.path.join(output_dir, f"{os.path.splitext(output_filename)[0]}.jsonl")
+
     if single_file or recursive:
-        if single_file and os.path.exists(output_path):
+        # A shared queue keeps the progress of the export itself.
+        journal_path = None if archive_path or queue_path else os.path.join(output_dir, JOURNAL_FILENAME)
+        resume = resume and os.path.exists(journal_path)
+        if resume:
+            click.echo(f"Resuming from journal: {journal_path}", err=summary_to_stderr)
+        elif single_file and os.path.exists(output_path):
             click.echo(f"Warning: {output_path} already exists.", err=True)
             if not click.confirm(f"Overwrite {output_path}?", default=False):
                 click.echo("Aborted by user.", err=True)
                 return
-        traverse_and_write(
-            page_id=page_id,
-            url=url,
-            output_dir=output_dir,
-            max_depth=max_depth,
-            single_file=single_file,
-            output_path=output_path if single_file else None,
-            skip_strikethrough_links=skip_strikethrough_links,
-        )
+        queue = None
+        if queue_path:
+            try:
+                queue = WorkQueue(queue_path, page_id, output_dir)
+            except ValueError as exc:
+                raise click.UsageError(str(exc)) from exc
+        try:
+            stop_reason = traverse_and_write(
+                page_id=page_id,
+                url=url,
+                output_dir=output_dir,
+                max_depth=max_depth,
+                single_file=single_file,
+                output_path=output_path if single_file else None,
+                skip_strikethrough_links=skip_strikethrough_links,
+                journal_path=journal_path,
+                resume=resume,
+                io_workers=io_workers,
+                archive_path=archive_path,
+                jsonl_path=jsonl_file,
+                database_path=database_path,
+                cache_dir=cache_dir,
+                engine=engine,
+                download_workers=download_workers if download_attachments else 0,
+                local_links=local_links,
+                order=order,
+                max_pages=max_pages,
+                deadline=deadline,
+                queue=queue,
+                stream_threshold=stream_threshold,
+                negative_cache_ttl=negative_cache_ttl,
+            )
+            if queue:
+                counts = queue.counts()
+                click.echo(
+                    f"Queue: {counts['done']} pages done, {counts['pending']} pending, "
+                    f"{counts['claimed']} claimed by other workers."
+                )
+        finally:
+            if queue:
+                queue.close()
+        if stop_reason:
+            if queue_path:
+                hint = " Run again with the same --queue to continue."
+            else:
+                hint = "" if archive_path else " Run again with --resume to continue."
+            click.echo(f"Stopped early: {stop_reason}.{hint}", err=True)
         if single_file:
             click.echo(f"Saved: {output_path}")
-        click.echo(f"URL: {url}")
-        click.echo(f"Output Directory: {output_dir}")
-        click.echo(f"Recursive: {recursive}")
-        click.echo(f"Max Depth: {max_depth}")
+        if archive_path:
+            click.echo(f"Saved: {archive_path}")
+        if database_path:
+            click.echo(f"Saved: {database_path}")
+        if jsonl_file and jsonl_file != "-":
+            click.echo(f"Saved: {jsonl_file}")
+        click.echo(f"URL: {url}", err=summary_to_stderr)
+        click.echo(f"Output Directory: {output_dir}", err=summary_to_stderr)
+        click.echo(f"Recursive: {recursive}", err=summary_to_stderr)
+        click.echo(f"Max Depth: {max_depth}", err=summary_to_stderr)
         return
 
     # Default: single page, not recursive, not single-file
     html = page.get("body", {}).get("storage", {}).get("value", "")
-    markdown = convert_html_to_markdown(html)
+    space_key = page.get("space", {}).get("key", "")
+    del page
     filename = sanitize_filename(title)
     output_path = os.path.join(output_dir, filename)
+    if stream_threshold is not None and len(html) >= stream_threshold:
+        # Large pages are written chunk by chunk as they are converted.
+        markdown = StreamingConverter(space_key, local_attachments=download_attachments).iter_markdown(html)
+    elif cache_dir:
+        markdown = ConversionCache(cache_dir, engine, download_attachments).convert(html, space_key)
+    elif engine == DEFAULT_ENGINE:
+        markdown = convert_html_to_markdown(html, local_attachments=download_attachments)
+    else:
+        markdown = get_converter(engine, download_attachments)(html, space_key=space_key)
+    del html
+    chunks = [markdown] if isinstance(markdown, str) else markdown
     with open(output_path, "w", encoding="utf-8") as f:
-        f.write(markdown)
+        for chunk in chunks:
+            f.write(AttachmentDownloader.rewrite_links(chunk, page_id) if download_attachments else chunk)
+    if download_attachments:
+        downloader = AttachmentDownloader(client, output_dir, download_workers)
+        downloader.submit_page(page_id, output_dir)
+        downloader.close()
     click.echo(f"Saved: {output_path}")
     click.echo(f"URL: {url}")
     click.echo(f"Output Directory: {output_dir}")
@@ -157,5 +628,51 @@ def convert(
         click.echo(f"Max Depth: {max_depth}")
 
 
+@cli.command()
+@click.option("--url", required=True, help="The URL of the root Confluence page to keep exported.")
+@click.option(
+    "--output-dir",
+    default=".",
+    help="The directory holding the multi-file export.",
+    type=click.Path(file_okay=False, dir_okay=True, writable=True, resolve_path=True),
+)
+@click.option(
+    "--max-depth",
+    default=3,
+    show_default=True,
+    type=int,
+    help="Maximum recursion depth for child/embedded pages.",
+)
+@click.option(
+    "--interval",
+    default="5m",
+    show_default=True,
+    callback=_parse_duration_option,
+    help="Time between polls for changed pages, e.g. 30s, 5m or 1h.",
+)
+@click.option(
+    "--engine",
+    default=DEFAULT_ENGINE,
+    show_default=True,
+    type=click.Choice(ENGINES),
+    help="Converter engine: the generic 'markdownify' HTML converter or the native Confluence 'storage' converter.",
+)
+@click.option("--once", is_flag=True, help="Export or poll once and exit instead of running continuously.")
+def watch(url: str, output_dir: str, max_depth: int, interval: float, engine: str, once: bool) -> None:
+    """Keeps a recursive export fresh by reconverting pages as they change."""
+    page_id = extract_page_id_from_url(url)
+    os.makedirs(output_dir, exist_ok=True)
+    try:
+        # New pages are placed below their closest exported ancestor.
+        client = ConfluenceClient(content_profile="record")
+        watcher = ExportWatcher(client, page_id, output_dir, max_depth, get_converter(engine))
+    except ValueError as exc:
+        raise click.UsageError(str(exc)) from exc
+    try:
+        watcher.run(interval, once=once)
+    except KeyboardInterrupt:
+        click.echo("Stopped watching.", err=True)
+
+
 if __name__ == "__main__":
     cli()
@@ -0,0 +1,63 @@
+"""Archive output for recursive Markdown exports.
+
+This module provides the PageArchive class, which streams converted pages into
+a single ``.zip``, ``.tar``, ``.tar.gz`` or ``.tgz`` file instead of creating a
+directory tree on disk.
+"""
+
+import io
+import tarfile
+import time
+import zipfile
+
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz")
+
+
+class PageArchive:
+    """Writes pages as members of a zip or tar archive."""
+
+    def __init__(self, path: str) -> None:
+        """Create the archive, choosing its format from the file extension.
+
+        Args:
+            path: The archive file to create. Any existing file is replaced.
+
+        Raises:
+            ValueError: If the extension is not a supported archive format.
+        """
+        lower = path.lower()
+        self._zip: zipfile.ZipFile | None = None
+        self._tar: tarfile.TarFile | None = None
+        if lower.endswith(".zip"):
+            self._zip = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED)
+        elif lower.endswith((".tar.gz", ".tgz")):
+            self._tar = tarfile.open(path, "w:gz")
+        elif lower.endswith(".tar"):
+            self._tar = tarfile.open(path, "w")
+        else:
+            raise ValueError(f"Unsupported archive format for {path}. Use one of: {', '.join(ARCHIVE_SUFFIXES)}.")
+
+    def add(self, name: str, content: str) -> None:
+        """Append a text file to the archive.
+
+        Args:
+            name: The member path inside the archive, using ``/`` separators.
+            content: The file content, encoded as UTF-8.
+        """
+        data = content.encode("utf-8")
+        if self._zip is not None:
+            info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            self._zip.writestr(info, data)
+        else:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            self._tar.addfile(info, io.BytesIO(data))
+
+    def close(self) -> None:
+        """Finish and close the archive."""
+        if self._zip is not None:
+            self._zip.close()
+        else:
+            self._tar.close()
@@ -1,15 +1,33 @@
+import json
 import os
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
+from typing import TextIO
 
 from markdown_maker.converters.html_to_markdown import write_markdown_page
-from markdown_maker.utils.helpers import sanitize_dirname
+from markdown_maker.utils.archive import PageArchive
+from markdown_maker.utils.helpers import sanitize_dirname, write_chunks_if_changed, write_if_changed
+from markdown_maker.utils.link_index import LinkIndex
+from markdown_maker.utils.page_store import PageStore
+from markdown_maker.utils.writer import BackgroundWriter
 
 
 def make_handle_page_single(output_path: str) -> Callable:
-    """Return a handler for single-file markdown output."""
-    first_page = [True]
+    """Return a handler for single-file markdown output.
 
-    def handle_page(title: str, page_url: str, markdown: str, depth: int, parent_dir: str | None) -> str:
+    Pages are appended, so a resumed export continues after the pages already
+    in the file. Streamed pages, given as an iterable of chunks, are appended
+    chunk by chunk.
+    """
+    first_page = [not os.path.exists(output_path) or os.path.getsize(output_path) == 0]
+
+    def handle_page(
+        title: str,
+        page_url: str,
+        markdown: str | Iterable[str],
+        depth: int,
+        parent_dir: str | None,
+        info: dict | None = None,
+    ) -> str:
         with open(output_path, "a", encoding="utf-8") as f:
             write_markdown_page(f, title, page_url, markdown, is_first=first_page[0])
         first_page[0] = False
@@ -18,16 +36,98 @@ def make_handle_page_single(output_path: str) -> Callable:
     return handle_page
 
 
-def make_handle_page_multi(output_dir: str) -> Callable:
-    """Return a handler for multi-file markdown output."""
+def make_handle_page_multi(
+    output_dir: str, writer: BackgroundWriter | None = None, links: LinkIndex | None = None
+) -> Callable:
+    """Return a handler for multi-file markdown output.
+
+    Existing ``index.md`` files whose content is unchanged are left untouched.
+    When a writer is given, files are written in the background and the caller
+    must close the writer once traversal is done. When a link index is given,
+    links to exported pages are rewritten to relative paths and the caller
+    must finalize the index after closing the writer. Streamed pages, given as
+    an iterable of chunks, are written inline chunk by chunk.
+    """
 
-    def handle_page(title: str, page_url: str, markdown: str, depth: int, parent_dir: str | None) -> str:
+    def handle_page(
+        title: str,
+        page_url: str,
+        markdown: str | Iterable[str],
+        depth: int,
+        parent_dir: str | None,
+        info: dict | None = None,
+    ) -> str:
         dir_name = sanitize_dirname(title)
         page_dir = os.path.join(parent_dir, dir_name) if parent_dir else os.path.join(output_dir, dir_name)
-        os.makedirs(page_dir, exist_ok=True)
         out_path = os.path.join(page_dir, "index.md")
-        with open(out_path, "w", encoding="utf-8") as f:
-            f.write(markdown)
+        if links and info:
+            links.register(info["id"], page_dir)
+        if not isinstance(markdown, str):
+            if links:
+                markdown = (links.rewrite(chunk, page_dir) for chunk in markdown)
+            os.makedirs(page_dir, exist_ok=True)
+            write_chunks_if_changed(out_path, markdown)
+            return page_dir
+        if links:
+            markdown = links.rewrite(markdown, page_dir)
+        if writer:
+            writer.submit(out_path, markdown)
+        else:
+            os.makedirs(page_dir, exist_ok=True)
+            write_if_changed(out_path, markdown)
+        return page_dir
+
+    return handle_page
+
+
+def make_handle_page_archive(archive: PageArchive) -> Callable:
+    """Return a handler that streams pages into an archive.
+
+    Members use the same relative paths as the multi-file layout, and the
+    returned page directory is relative to the archive root.
+    """
+
+    def handle_page(
+        title: str, page_url: str, markdown: str, depth: int, parent_dir: str | None, info: dict | None = None
+    ) -> str:
+        dir_name = sanitize_dirname(title)
+        page_dir = f"{parent_dir}/{dir_name}" if parent_dir else dir_name
+        archive.add(f"{page_dir}/index.md", markdown)
+        return page_dir
+
+    return handle_page
+
+
+def make_handle_page_store(store: PageStore) -> Callable:
+    """Return a handler that writes pages into a SQLite page store.
+
+    Pages are stored under the relative paths of the multi-file layout, and the
+    returned page directory is that path.
+    """
+
+    def handle_page(
+        title: str, page_url: str, markdown: str, depth: int, parent_dir: str | None, info: dict | None = None
+    ) -> str:
+        page_dir = f"{parent_dir}/{sanitize_dirname(title)}" if parent_dir else sanitize_dirname(title)
+        store.add(page_dir, markdown, info or {"id": page_dir, "title": title, "url": page_url, "depth": depth})
         return page_dir
 
     return handle_page
+
+
+def make_handle_page_jsonl(stream: TextIO) -> Callable:
+    """Return a handler that writes one JSON record per page to a stream.
+
+    Each record holds the page metadata from the traverser plus its Markdown
+    and is flushed as soon as the page is converted.
+    """
+
+    def handle_page(
+        title: str, page_url: str, markdown: str, depth: int, parent_dir: str | None, info: dict | None = None
+    ) -> str:
+        record = {**(info or {"title": title, "url": page_url, "depth": depth}), "markdown": markdown}
+        stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        stream.flush()
+        return ""
+
+    return handle_page
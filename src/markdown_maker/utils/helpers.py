@@ -3,13 +3,99 @@
 This module provides utility functions for the Markdown Maker project.
 """
 
+import base64
+import filecmp
+import json
+import os
 import re
+import threading
+from collections.abc import Callable, Iterable
+from typing import Any
+from urllib.parse import unquote_plus
+
+from bs4 import BeautifulSoup
+
+# Confluence link forms in priority order, as (marker, pattern, kind). A rule is
+# only tried on URLs containing its literal marker, which rejects most external
+# links with a few substring checks. Each pattern's groups hold a page ID
+# ("id"), a tiny link code ("tiny"), or a space key and title ("title"); forms
+# of kind None are Confluence URLs that do not identify a page.
+_URL_RULES: tuple[tuple[str, re.Pattern, str | None], ...] = tuple(
+    (marker, re.compile(pattern), kind)
+    for marker, pattern, kind in (
+        ("/pages/", r"/pages/(?:edit-v2/|edit/)?(\d+)(?:[/?#]|$)", "id"),
+        ("Id=", r"[?&](?:pageId|contentId)=(\d+)", "id"),
+        ("/blog/", r"/spaces/[^/?#]+/blog/(?:\d{4}/\d{2}/\d{2}/)?(\d+)(?:[/?#]|$)", "id"),
+        # Tiny links, e.g. /wiki/x/AgAB. Absolute ones must be below /wiki,
+        # since /x/ at the root of another site is too common to be taken for one.
+        ("/x/", r"(?:^|/wiki)/x/([A-Za-z0-9_-]{1,11})(?:[/?#]|$)", "tiny"),
+        # Blog posts by date cannot be resolved by title.
+        ("/display/", r"/display/[^/?#]+/\d{4}/\d{2}/\d{2}/", None),
+        ("/display/", r"/display/([^/?#]+)/([^/?#]+)", "title"),
+    )
+)
+
+
+def classify_url(url: str) -> tuple[str | None, tuple[str, str] | None] | None:
+    """Classify a link as a Confluence page link, decoding the page ID locally where possible.
+
+    Recognizes ``/pages/<id>`` and ``/pages/edit-v2/<id>`` paths, ``pageId``
+    and ``contentId`` parameters, ``/spaces/<SPACE>/blog/.../<id>`` blog posts,
+    ``/x/<code>`` tiny links, whose code encodes the page ID, and
+    ``/display/<SPACE>/<Title>`` links by title.
+
+    Args:
+        url: The link target.
+
+    Returns:
+        ``(page_id, None)`` for links that identify a page by ID,
+        ``(None, (space_key, title))`` for links by title, or None if the
+        link does not identify a Confluence page.
+    """
+    for marker, pattern, kind in _URL_RULES:
+        if marker not in url:
+            continue
+        match = pattern.search(url)
+        if match is None:
+            continue
+        if kind == "id":
+            return match.group(1), None
+        if kind == "tiny":
+            page_id = decode_tiny_link(match.group(1))
+            return (page_id, None) if page_id else None
+        if kind == "title":
+            return None, (match.group(1), unquote_plus(match.group(2)))
+        return None
+    return None
+
+
+def decode_tiny_link(code: str) -> str | None:
+    """Decode the page ID from the code of a Confluence tiny link, such as ``AgAB`` in ``/x/AgAB``.
+
+    The code is the page ID as 8 little-endian bytes in base64, with ``-`` and
+    ``_`` for ``/`` and ``+`` and without padding or trailing ``A`` characters.
+
+    Args:
+        code: The tiny link code.
+
+    Returns:
+        The page ID, or None if the code is not a valid tiny link code.
+    """
+    if not 0 < len(code) <= 11:
+        return None
+    encoded = code.replace("-", "/").replace("_", "+") + "A" * (11 - len(code)) + "="
+    try:
+        page_id = int.from_bytes(base64.b64decode(encoded, validate=True), "little")
+    except ValueError:
+        return None
+    return str(page_id) if page_id else None
 
 
 def extract_page_id_from_url(url: str) -> str:
     """Extract the Confluence page_id from a given Confluence URL.
 
-    Supports both canonical and viewpage.action URL formats.
+    Supports the URL forms of ``classify_url`` that identify a page by ID,
+    including tiny links.
 
     Args:
         url: The Confluence page URL.
@@ -20,15 +106,79 @@ def extract_page_id_from_url(url: str) -> str:
     Raises:
         ValueError: If the page_id cannot be found in the URL.
     """
-    # Try canonical URL: .../pages/<page_id>/
-    match = re.search(r"/pages/(\d+)(/|$)", url)
-    if match:
-        return match.group(1)
-    # Try viewpage.action URL: ...pageId=<page_id>
-    match = re.search(r"[?&]pageId=(\d+)", url)
-    if match:
-        return match.group(1)
-    raise ValueError(f"Could not extract page_id from URL: {url}")
+    link = classify_url(url)
+    if link is None or link[0] is None:
+        raise ValueError(f"Could not extract page_id from URL: {url}")
+    return link[0]
+
+
+def extract_title_ref_from_url(url: str) -> tuple[str, str]:
+    """Extract the space key and page title from a Confluence display URL.
+
+    Supports ``.../display/<SPACE>/<Title+With+Plus>`` URLs, which identify a
+    page by title rather than by ID.
+
+    Args:
+        url: The Confluence page URL.
+
+    Returns:
+        A ``(space_key, title)`` tuple.
+
+    Raises:
+        ValueError: If the URL is not a display URL.
+    """
+    link = classify_url(url)
+    if link is None or link[1] is None:
+        raise ValueError(f"Could not extract page title from URL: {url}")
+    return link[1]
+
+
+def parse_duration(text: str) -> float:
+    """Parse a duration such as ``90``, ``45s``, ``30m``, ``2h`` or ``1h30m`` into seconds.
+
+    Args:
+        text: The duration. A bare number is read as seconds.
+
+    Returns:
+        The duration in seconds.
+
+    Raises:
+        ValueError: If the text is not a valid duration.
+    """
+    text = text.strip().lower()
+    if re.fullmatch(r"\d+(\.\d+)?", text):
+        return float(text)
+    parts = re.findall(r"(\d+(?:\.\d+)?)([hms])", text)
+    if not parts or "".join(number + unit for number, unit in parts) != text:
+        raise ValueError(f"Invalid duration: {text!r}. Use e.g. 90, 45s, 30m, 2h or 1h30m.")
+    return sum(float(number) * {"h": 3600, "m": 60, "s": 1}[unit] for number, unit in parts)
+
+
+def parse_size(text: str) -> int:
+    """Parse a size such as ``4096``, ``512K``, ``20M`` or ``1GiB`` into bytes.
+
+    Units are binary and case-insensitive; ``K``, ``KB`` and ``KiB`` all mean 1024 bytes.
+
+    Args:
+        text: The size. A bare number is read as bytes.
+
+    Returns:
+        The size in bytes.
+
+    Raises:
+        ValueError: If the text is not a valid size.
+    """
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)\s*(?:([kmg])(?:i?b)?|b)?", text.strip().lower())
+    if not match:
+        raise ValueError(f"Invalid size: {text!r}. Use e.g. 4096, 512K, 20M or 1G.")
+    number, unit = match.groups()
+    return int(float(number) * {None: 1, "k": 1 << 10, "m": 1 << 20, "g": 1 << 30}[unit])
+
+
+def attachment_filename(title: str) -> str:
+    """Return the local file name an attachment is downloaded under."""
+    name = title.replace("/", "_").replace("\\", "_").strip()
+    return "_index.md" if name == "index.md" else name or "attachment"
 
 
 def sanitize_dirname(title: str) -> str:
@@ -39,3 +189,135 @@ def sanitize_dirname(title: str) -> str:
     name = re.sub(r"[^a-z0-9]+", "_", name)
     name = re.sub(r"_+", "_", name).strip("_")
     return name
+
+
+def write_if_changed(path: str, content: str | bytes) -> bool:
+    """Write ``content`` to ``path`` unless the file already holds exactly that text.
+
+    The size of the existing file is checked first, so the file is only read
+    back when it could be identical. Leaving unchanged files untouched keeps
+    their modification times stable for downstream sync tools. New content is
+    written to a temporary file next to ``path`` and renamed over it, so
+    readers never see a partially written file.
+
+    Args:
+        path: The file to write.
+        content: The text to write, encoded as UTF-8, or raw bytes.
+
+    Returns:
+        True if the file was written, False if it was already up to date.
+    """
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    try:
+        if os.path.getsize(path) == len(data):
+            with open(path, "rb") as f:
+                if f.read() == data:
+                    return False
+    except FileNotFoundError:
+        pass
+    tmp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return True
+
+
+def write_chunks_if_changed(path: str, chunks: Iterable[str]) -> bool:
+    """Like ``write_if_changed``, for text produced in chunks that is too large to hold at once.
+
+    The chunks are written to a temporary file next to ``path``, which then
+    replaces ``path`` unless the two files are identical.
+
+    Args:
+        path: The file to write.
+        chunks: The text to write, encoded as UTF-8.
+
+    Returns:
+        True if the file was written, False if it was already up to date.
+    """
+    tmp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        if os.path.exists(path) and filecmp.cmp(tmp_path, path, shallow=False):
+            os.remove(tmp_path)
+            return False
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return True
+
+
+def update_json_file(path: str, merge: Callable[[Any], Any], **dump_options: Any) -> None:
+    """Merge new data into a JSON file that other processes may update at the same time.
+
+    The file is read, merged and written while holding an exclusive lock on a
+    ``.lock`` file next to it, so that processes sharing an output or cache
+    directory, such as ``--queue`` workers, do not overwrite each other's
+    entries.
+
+    Args:
+        path: The JSON file to update.
+        merge: Called with the file's current data, or None if there is no
+            file yet, and returning the data to write.
+        **dump_options: Passed on to ``json.dumps``.
+    """
+    with open(f"{path}.lock", "a+b") as lock:
+        _lock_file(lock)
+        try:
+            current = None
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    current = json.load(f)
+            write_if_changed(path, json.dumps(merge(current), **dump_options))
+        finally:
+            _unlock_file(lock)
+
+
+if os.name == "nt":
+    import msvcrt
+
+    def _lock_file(lock) -> None:
+        lock.seek(0)
+        while True:
+            try:
+                msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                # LK_LOCK gives up after ten seconds.
+                continue
+
+    def _unlock_file(lock) -> None:
+        lock.seek(0)
+        msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _lock_file(lock) -> None:
+        fcntl.lockf(lock, fcntl.LOCK_EX)
+
+    def _unlock_file(lock) -> None:
+        fcntl.lockf(lock, fcntl.LOCK_UN)
+
+
+def release_soup(soup: BeautifulSoup) -> None:
+    """Break the reference cycles of a parsed document so it is freed immediately.
+
+    ``BeautifulSoup.decompose`` does not reach the document's own children, so
+    each top-level node is decomposed individually.
+
+    Args:
+        soup: The parsed document to release. It must not be used afterwards.
+    """
+    for node in list(soup.contents):
+        node.decompose()
+    soup.decompose()
@@ -0,0 +1,144 @@
+"""Export journal for checkpointing and resuming recursive conversions.
+
+The journal is an append-only JSON Lines file. The first line identifies the
+root page of the export and every following line records a page that has been
+fully written, together with the output path it was written to and the child
+and embedded-link frontier discovered on it. A resumed traversal replays the
+frontier of completed pages instead of fetching them again.
+
+When pages are written behind the traversal, the journal is given the output
+stage, which counts the pages it was handed and those that are durable. A
+record is then appended only once every page handed to the output before it
+is durable, so the journal never claims a page whose output a crash can lose.
+"""
+
+import json
+import os
+from collections import deque
+
+from markdown_maker.utils.page_store import PageStore
+from markdown_maker.utils.writer import BackgroundWriter
+
+JOURNAL_FILENAME = ".markdown_maker_journal.jsonl"
+
+
+class ExportJournal:
+    """Records completed pages of an export so an interrupted run can resume."""
+
+    def __init__(self, path: str, root_id: str, resume: bool = False) -> None:
+        """Open the journal, loading existing progress when resuming.
+
+        Args:
+            path: Location of the journal file.
+            root_id: The root page ID of the export.
+            resume: If True and a journal exists, continue from it instead of
+                starting a new one.
+
+        Raises:
+            ValueError: If the existing journal belongs to a different root page.
+        """
+        self.path = path
+        self.completed: dict[str, dict] = {}
+        # Set to an output that writes behind the traversal to hold records until their pages are durable.
+        self.output: BackgroundWriter | PageStore | None = None
+        self._held: deque[tuple[int, dict]] = deque()
+        self.resumed = resume and os.path.exists(path)
+        if self.resumed:
+            self._load(root_id)
+            self._file = open(path, "a", encoding="utf-8")
+            if self._partial_line:
+                self._file.write("\n")
+        else:
+            self._file = open(path, "w", encoding="utf-8")
+            self._append({"root": root_id})
+
+    def _load(self, root_id: str) -> None:
+        with open(self.path, encoding="utf-8") as f:
+            text = f.read()
+        self._partial_line = bool(text) and not text.endswith("\n")
+        for index, line in enumerate(text.splitlines()):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash mid-write can leave a truncated final line.
+                continue
+            if index == 0:
+                if record.get("root") != root_id:
+                    raise ValueError(f"Journal at {self.path} belongs to page {record.get('root')}, not {root_id}.")
+                continue
+            self.completed[record["id"]] = record
+
+    def _append(self, record: dict) -> None:
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    def get(self, page_id: str) -> dict | None:
+        """Return the journal record of a completed page, if any."""
+        return self.completed.get(page_id)
+
+    def record_page(
+        self,
+        page_id: str,
+        title: str,
+        depth: int,
+        page_dir: str,
+        children: list[tuple[str, str]] | None,
+        links: list[tuple[str, str]],
+        expanded: bool,
+        found_links: list | None = None,
+    ) -> None:
+        """Record a page whose output has been written.
+
+        A page may be recorded again once its children have been listed; the
+        latest record of a page wins.
+
+        Args:
+            page_id: The page ID.
+            title: The page title.
+            depth: The depth the page was written at.
+            page_dir: The output directory returned by the page handler.
+            children: ``(id, title)`` pairs of the page's children, or None
+                while they have not all been listed yet.
+            links: ``(id, href)`` pairs of the page's embedded links.
+            expanded: Whether children and links were collected for the page.
+            found_links: For a page that was not expanded, its unresolved
+                ``(id, (space, title), href)`` links, so that a later
+                expansion does not need to fetch the page again.
+        """
+        record = {
+            "id": page_id,
+            "title": title,
+            "depth": depth,
+            "page_dir": page_dir,
+            "children": children,
+            "links": links,
+            "expanded": expanded,
+        }
+        if found_links is not None:
+            record["found_links"] = found_links
+        self.completed[page_id] = record
+        if self.output is None:
+            self._append(record)
+            return
+        self._held.append((self.output.submitted, record))
+        self._release()
+
+    def _release(self) -> None:
+        """Append the held records whose pages, and all pages handed to the output before them, are durable."""
+        while self._held and self._held[0][0] <= self.output.durable:
+            self._append(self._held.popleft()[1])
+
+    def close(self) -> None:
+        """Close the journal file, keeping it on disk for a later resume.
+
+        Records still held are appended if their pages have become durable
+        since, and dropped otherwise, so those pages are exported again.
+        """
+        if self.output is not None:
+            self._release()
+        self._file.close()
+
+    def discard(self) -> None:
+        """Close and delete the journal once the export has completed."""
+        self.close()
+        os.remove(self.path)
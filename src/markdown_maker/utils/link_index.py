@@ -0,0 +1,111 @@
+"""Rewriting of links between exported pages to relative local paths.
+
+This module provides the LinkIndex class, which maps the IDs of exported pages
+to their output directories while the traversal runs. Links in each page's
+Markdown that point at an already exported page are rewritten as the page is
+written. Links to pages exported later are remembered together with the files
+containing them, and patched in a final pass that only touches those files.
+When an interrupted export is resumed, the files written before the
+interruption are not known to link anywhere, so the final pass rewrites them
+all.
+"""
+
+import os
+import posixpath
+import re
+
+from markdown_maker.clients.title_resolver import TitleResolver
+from markdown_maker.utils.helpers import classify_url, write_if_changed
+
+# Matches the target of an inline Markdown link, up to an optional title.
+_LINK_TARGET_RE = re.compile(r"(\]\()([^)\s]+)")
+
+
+class LinkIndex:
+    """Maps exported page IDs to output directories and rewrites links between them."""
+
+    def __init__(self, title_resolver: TitleResolver | None = None) -> None:
+        """Initialize an empty index.
+
+        Args:
+            title_resolver: Optional resolver used to map ``/display/SPACE/Title``
+                links to page IDs. Only already resolved titles are used.
+        """
+        self.title_resolver = title_resolver
+        self.paths: dict[str, str] = {}
+        self._pending: dict[str, set[str]] = {}
+        # Files written by an earlier, interrupted run, rewritten again by finalize.
+        self._recheck: set[str] = set()
+
+    def register(self, page_id: str, page_dir: str) -> None:
+        """Record the output directory of an exported page."""
+        self.paths[page_id] = page_dir
+
+    def register_written(self, page_id: str, page_dir: str) -> None:
+        """Record a page written by an interrupted run that is being resumed.
+
+        The links the page was waiting for were lost with the interrupted run,
+        so ``finalize`` rewrites the page's file again.
+        """
+        self.register(page_id, page_dir)
+        self._recheck.add(os.path.join(page_dir, "index.md"))
+
+    def rewrite(self, markdown: str, page_dir: str) -> str:
+        """Rewrite links to exported pages relative to ``page_dir``.
+
+        Links to pages that are not exported yet are left as they are and
+        remembered, so that ``finalize`` can patch ``page_dir/index.md`` later.
+
+        Args:
+            markdown: The Markdown of the page.
+            page_dir: The output directory of the page.
+
+        Returns:
+            The Markdown with links to known pages rewritten.
+        """
+        index_path = os.path.join(page_dir, "index.md")
+
+        def replace(match: re.Match) -> str:
+            target_id = self._page_id(match.group(2))
+            if target_id is None:
+                return match.group(0)
+            target_dir = self.paths.get(target_id)
+            if target_dir is None:
+                self._pending.setdefault(target_id, set()).add(index_path)
+                return match.group(0)
+            relative = os.path.relpath(os.path.join(target_dir, "index.md"), page_dir)
+            return match.group(1) + relative.replace(os.sep, posixpath.sep)
+
+        return _LINK_TARGET_RE.sub(replace, markdown)
+
+    def _page_id(self, url: str) -> str | None:
+        link = classify_url(url)
+        if link is None:
+            return None
+        page_id, ref = link
+        if page_id is not None:
+            return page_id
+        return self.title_resolver.lookup(ref) if self.title_resolver else None
+
+    def finalize(self) -> int:
+        """Patch files holding links to pages that were exported after them.
+
+        Returns:
+            The number of files rewritten.
+        """
+        files = {path for page_id, paths in self._pending.items() if page_id in self.paths for path in paths}
+        files |= self._recheck
+        self._pending = {}
+        self._recheck = set()
+        patched = 0
+        for path in sorted(files):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    markdown = f.read()
+            except FileNotFoundError:
+                continue
+            if write_if_changed(path, self.rewrite(markdown, os.path.dirname(path))):
+                patched += 1
+        # Rewriting re-records links to pages that were never exported; nothing can patch those.
+        self._pending = {}
+        return patched
@@ -0,0 +1,145 @@
+"""SQLite output for recursive Markdown exports.
+
+This module provides the PageStore class, which writes converted pages into a
+single SQLite database instead of a directory tree: page metadata and Markdown
+in ``pages``, the page tree in ``children``, embedded page links in ``links``
+and, when SQLite is built with FTS5, a full-text index over titles and
+Markdown in ``pages_fts``. Pages are committed in batches, and the database
+uses WAL mode, so other processes can query and search the export while it is
+still running. The store counts the pages added and those committed, so that
+an export journal only records committed pages.
+"""
+
+import sqlite3
+import time
+
+import click
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    seq INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    url TEXT NOT NULL,
+    version INTEGER,
+    depth INTEGER NOT NULL,
+    parent_id TEXT,
+    path TEXT NOT NULL,
+    markdown TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS children (
+    parent_id TEXT NOT NULL,
+    child_id TEXT NOT NULL,
+    PRIMARY KEY (parent_id, child_id)
+);
+CREATE TABLE IF NOT EXISTS links (
+    source_id TEXT NOT NULL,
+    target_id TEXT NOT NULL,
+    PRIMARY KEY (source_id, target_id)
+);
+"""
+
+# External-content index kept in sync with ``pages`` by triggers, so the Markdown is stored once.
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS pages_fts USING fts5(title, markdown, content='pages', content_rowid='seq');
+CREATE TRIGGER IF NOT EXISTS pages_fts_insert AFTER INSERT ON pages BEGIN
+    INSERT INTO pages_fts (rowid, title, markdown) VALUES (new.seq, new.title, new.markdown);
+END;
+CREATE TRIGGER IF NOT EXISTS pages_fts_delete AFTER DELETE ON pages BEGIN
+    INSERT INTO pages_fts (pages_fts, rowid, title, markdown) VALUES ('delete', old.seq, old.title, old.markdown);
+END;
+"""
+
+
+class PageStore:
+    """Writes pages, their links and a full-text index into a SQLite database."""
+
+    def __init__(self, path: str, reset: bool = True, commit_pages: int = 200, commit_seconds: float = 1.0) -> None:
+        """Open or create the database.
+
+        Args:
+            path: The database file.
+            reset: If True, remove the pages of an earlier export; otherwise
+                pages are added to and replaced in the existing database.
+            commit_pages: Commit after this many pages at the latest.
+            commit_seconds: Commit when this many seconds passed since the last
+                commit, so readers see new pages promptly.
+        """
+        self.commit_pages = commit_pages
+        self.commit_seconds = commit_seconds
+        self._db = sqlite3.connect(path, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.execute("PRAGMA synchronous = NORMAL")
+        self._db.executescript(_SCHEMA)
+        try:
+            self._db.executescript(_FTS_SCHEMA)
+            self.searchable = True
+        except sqlite3.OperationalError:
+            click.echo("Warning: SQLite was built without FTS5; the export will not be searchable.", err=True)
+            self.searchable = False
+        self._db.execute("BEGIN")
+        if reset:
+            for table in ("pages", "children", "links"):
+                self._db.execute(f"DELETE FROM {table}")
+        self._uncommitted = 0
+        self._last_commit = time.monotonic()
+        # Pages added so far, and how many of them are committed.
+        self.submitted = 0
+        self.durable = 0
+
+    def add(self, path: str, markdown: str, info: dict) -> None:
+        """Store a page, replacing an earlier copy of it.
+
+        Args:
+            path: The page's location in the multi-file layout, using ``/`` separators.
+            markdown: The converted Markdown.
+            info: The page metadata from the traverser.
+        """
+        pid = info["id"]
+        self._db.execute("DELETE FROM pages WHERE id = ?", (pid,))
+        self._db.execute(
+            "INSERT INTO pages (id, title, url, version, depth, parent_id, path, markdown)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                pid,
+                info["title"],
+                info["url"],
+                info.get("version"),
+                info["depth"],
+                info.get("parent_id"),
+                path,
+                markdown,
+            ),
+        )
+        if info.get("link_type") == "child" and info.get("parent_id"):
+            self._db.execute("INSERT OR IGNORE INTO children VALUES (?, ?)", (info["parent_id"], pid))
+        self._db.execute("DELETE FROM links WHERE source_id = ?", (pid,))
+        self._db.executemany("INSERT OR IGNORE INTO links VALUES (?, ?)", [(pid, t) for t in info.get("links", [])])
+        self._uncommitted += 1
+        self.submitted += 1
+        if self._uncommitted >= self.commit_pages or time.monotonic() - self._last_commit >= self.commit_seconds:
+            self.commit()
+
+    def commit(self) -> None:
+        """Make the pages added so far visible to readers."""
+        self._db.execute("COMMIT")
+        self._db.execute("BEGIN")
+        self.durable = self.submitted
+        self._uncommitted = 0
+        self._last_commit = time.monotonic()
+
+    def search(self, query: str, limit: int = 20) -> list[tuple[str, str]]:
+        """Return ``(id, title)`` of the pages matching an FTS5 query, best matches first."""
+        return self._db.execute(
+            "SELECT pages.id, pages.title FROM pages_fts JOIN pages ON pages.seq = pages_fts.rowid"
+            " WHERE pages_fts MATCH ? ORDER BY rank LIMIT ?",
+            (query, limit),
+        ).fetchall()
+
+    def close(self) -> None:
+        """Commit the remaining pages, compact the index and close the database."""
+        self._db.execute("COMMIT")
+        self.durable = self.submitted
+        if self.searchable:
+            self._db.execute("INSERT INTO pages_fts (pages_fts) VALUES ('optimize')")
+        self._db.close()
@@ -0,0 +1,157 @@
+"""SQLite work queue for sharing one export between several processes.
+
+The queue holds the traversal frontier of an export: one row per discovered
+page, which doubles as the global visited set, with a pending, claimed or done
+state. Worker processes, on one machine or on several machines sharing a disk,
+claim pending pages in breadth-first order, export them and add the pages they
+discover. Claims expire after a lease, so pages held by a crashed worker are
+picked up by the others.
+
+Page directories are stored relative to the output directory, so workers may
+mount the shared disk at different paths. The database uses SQLite's rollback
+journal rather than WAL, because WAL does not work on network file systems.
+"""
+
+import os
+import sqlite3
+import time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS pages (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    page_url TEXT NOT NULL,
+    depth INTEGER NOT NULL,
+    link_type TEXT NOT NULL,
+    child_title TEXT,
+    parent_title TEXT,
+    parent_id TEXT,
+    parent_dir TEXT,
+    state TEXT NOT NULL DEFAULT 'pending',
+    claimed_by TEXT,
+    claimed_at REAL
+);
+CREATE INDEX IF NOT EXISTS pages_claim ON pages (state, depth, seq);
+"""
+
+# A visit is (page_id, page_url, depth, link_type, child_title, parent_title, parent_id, parent_dir).
+Visit = tuple[str, str, int, str, str | None, str | None, str | None, str | None]
+
+
+class WorkQueue:
+    """A frontier of pages to export, shared by several worker processes."""
+
+    def __init__(self, path: str, root_id: str, base_dir: str, lease: float = 600.0) -> None:
+        """Open or create the queue.
+
+        Args:
+            path: Location of the SQLite database.
+            root_id: The root page ID of the export.
+            base_dir: The output directory page directories are relative to.
+            lease: Seconds after which a claimed page that was not completed
+                may be claimed by another worker.
+
+        Raises:
+            ValueError: If the queue belongs to a different root page.
+        """
+        self.base_dir = base_dir
+        self.lease = lease
+        self._db = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self._db.executescript(_SCHEMA)
+        self._db.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('root', ?)", (root_id,))
+        (stored_root,) = self._db.execute("SELECT value FROM meta WHERE key = 'root'").fetchone()
+        if stored_root != root_id:
+            self._db.close()
+            raise ValueError(f"Work queue at {path} belongs to page {stored_root}, not {root_id}.")
+
+    def add(self, visits: list[Visit]) -> None:
+        """Queue pages that are not known yet, or known pages now reached at a shallower depth.
+
+        Args:
+            visits: The discovered visits.
+        """
+        rows = [(*visit[:7], self._relative(visit[7])) for visit in visits]
+        with self._transaction():
+            for row in rows:
+                self._db.execute(
+                    "INSERT INTO pages (id, page_url, depth, link_type, child_title, parent_title, parent_id,"
+                    " parent_dir) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT (id) DO UPDATE SET page_url = excluded.page_url, depth = excluded.depth,"
+                    " link_type = excluded.link_type, child_title = excluded.child_title,"
+                    " parent_title = excluded.parent_title, parent_id = excluded.parent_id,"
+                    " parent_dir = excluded.parent_dir"
+                    " WHERE pages.state = 'pending' AND excluded.depth < pages.depth",
+                    row,
+                )
+
+    def claim(self, worker_id: str) -> Visit | None:
+        """Claim the shallowest pending page, or one whose lease has expired.
+
+        Args:
+            worker_id: Identifies the claiming worker.
+
+        Returns:
+            The claimed visit, or None if no page is available right now.
+        """
+        now = time.time()
+        with self._transaction():
+            row = self._db.execute(
+                "SELECT id, page_url, depth, link_type, child_title, parent_title, parent_id, parent_dir FROM pages"
+                " WHERE state = 'pending' OR (state = 'claimed' AND claimed_at < ?)"
+                " ORDER BY depth, seq LIMIT 1",
+                (now - self.lease,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE pages SET state = 'claimed', claimed_by = ?, claimed_at = ? WHERE id = ?",
+                (worker_id, now, row[0]),
+            )
+        return (*row[:7], self._absolute(row[7]))
+
+    def complete(self, page_id: str) -> None:
+        """Mark a claimed page as done."""
+        self._db.execute("UPDATE pages SET state = 'done', claimed_by = NULL WHERE id = ?", (page_id,))
+
+    def release(self, page_id: str) -> None:
+        """Return a claimed page to the queue without completing it."""
+        self._db.execute(
+            "UPDATE pages SET state = 'pending', claimed_by = NULL, claimed_at = NULL WHERE id = ?", (page_id,)
+        )
+
+    def counts(self) -> dict[str, int]:
+        """Return the number of pages in each state."""
+        counts = {"pending": 0, "claimed": 0, "done": 0}
+        counts.update(self._db.execute("SELECT state, COUNT(*) FROM pages GROUP BY state").fetchall())
+        return counts
+
+    def is_finished(self) -> bool:
+        """Return True once every known page is done."""
+        return self._db.execute("SELECT 1 FROM pages WHERE state != 'done' LIMIT 1").fetchone() is None
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._db.close()
+
+    def _transaction(self) -> "_Transaction":
+        return _Transaction(self._db)
+
+    def _relative(self, page_dir: str | None) -> str | None:
+        return os.path.relpath(page_dir, self.base_dir) if page_dir else page_dir
+
+    def _absolute(self, page_dir: str | None) -> str | None:
+        return os.path.join(self.base_dir, page_dir) if page_dir else page_dir
+
+
+class _Transaction:
+    """Holds SQLite's write lock from the start, so claims never race."""
+
+    def __init__(self, db: sqlite3.Connection) -> None:
+        self._db = db
+
+    def __enter__(self) -> None:
+        self._db.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._db.execute("ROLLBACK" if exc_type else "COMMIT")
@@ -0,0 +1,98 @@
+"""Write-behind output stage for multi-file Markdown exports.
+
+This module provides the BackgroundWriter class, which hands finished pages to
+a small thread pool so that directory creation and file writes overlap with
+fetching and converting the next pages. The writer counts the writes that
+have been submitted and those that are durable, so that an export journal can
+hold back the records of pages whose files are not on disk yet.
+"""
+
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from markdown_maker.utils.helpers import write_if_changed
+
+
+class BackgroundWriter:
+    """Writes output files on a small thread pool behind the traversal."""
+
+    def __init__(self, max_workers: int = 4, max_pending: int | None = None) -> None:
+        """Start the writer pool.
+
+        Args:
+            max_workers: Number of writer threads.
+            max_pending: Maximum number of queued writes before submit blocks,
+                which bounds the Markdown held in memory. Defaults to four
+                writes per worker.
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="markdown-writer")
+        self._slots = threading.BoundedSemaphore(max_pending or max_workers * 4)
+        # Writes still in flight, so that later writes to the same path wait for them.
+        self._futures: dict[str, Future] = {}
+        self._created_dirs: set[str] = set()
+        self._lock = threading.Lock()
+        # Sequence numbers of finished writes beyond the first unfinished one.
+        self._finished: set[int] = set()
+        self._failure: BaseException | None = None
+        self._failure_raised = False
+        # Writes submitted so far, and how many of the first of them have succeeded.
+        self.submitted = 0
+        self.durable = 0
+
+    def submit(self, path: str, content: str) -> None:
+        """Queue ``content`` to be written to ``path``.
+
+        Writes to the same path are applied in submission order.
+
+        Args:
+            path: The file to write. Missing parent directories are created.
+            content: The text to write.
+
+        Raises:
+            OSError: If an earlier write failed.
+        """
+        self._raise_failure()
+        previous = self._futures.get(path)
+        if previous is not None and previous.exception() is not None:
+            # Its completion callback may not have run yet.
+            with self._lock:
+                self._failure = self._failure or previous.exception()
+            self._raise_failure()
+        self._slots.acquire()
+        sequence = self.submitted
+        self.submitted += 1
+        future = self._executor.submit(self._write, path, content)
+        future.add_done_callback(lambda done: self._done(sequence, done))
+        self._futures = {queued: f for queued, f in self._futures.items() if not f.done()}
+        self._futures[path] = future
+
+    def _done(self, sequence: int, future: Future) -> None:
+        self._slots.release()
+        with self._lock:
+            failure = future.exception()
+            if failure is not None:
+                self._failure = self._failure or failure
+                return
+            self._finished.add(sequence)
+            while self.durable in self._finished:
+                self._finished.remove(self.durable)
+                self.durable += 1
+
+    def _raise_failure(self) -> None:
+        if self._failure is not None and not self._failure_raised:
+            self._failure_raised = True
+            raise self._failure
+
+    def _write(self, path: str, content: str) -> None:
+        directory = os.path.dirname(path)
+        if directory not in self._created_dirs:
+            os.makedirs(directory, exist_ok=True)
+            self._created_dirs.add(directory)
+        write_if_changed(path, content)
+
+    def close(self) -> None:
+        """Wait for all queued writes and re-raise the first failure, unless submit raised it already."""
+        self._executor.shutdown(wait=True)
+        self._futures = {}
+        self._raise_failure()
@@ -0,0 +1,116 @@
+"""Unit tests for concurrent attachment downloads."""
+
+import json
+
+from markdown_maker.clients.attachment_downloader import ATTACHMENT_MANIFEST_FILENAME, AttachmentDownloader
+
+
+def _attachment(att_id, title, version=1):
+    return {"id": att_id, "title": title, "version": version, "download": f"/download/attachments/1/{title}"}
+
+
+def test_downloads_attachments_next_to_pages_and_deduplicates(tmp_path, mocker):
+    """Test that each attachment version is fetched once, even when several pages list it."""
+    client = mocker.Mock()
+    client.get_attachments.side_effect = lambda pid: [
+        _attachment("a1", "pic.png"),
+        _attachment(f"own-{pid}", "doc.pdf"),
+    ]
+    client.download_attachment.side_effect = lambda link, etag: (f"bytes of {link}".encode(), "etag-1")
+    downloader = AttachmentDownloader(client, str(tmp_path), max_workers=4)
+    downloader.submit_page("1", str(tmp_path / "one"))
+    downloader.submit_page("2", str(tmp_path / "two"))
+    downloader.close()
+
+    assert (tmp_path / "one" / "pic.png").read_bytes() == b"bytes of /download/attachments/1/pic.png"
+    assert (tmp_path / "two" / "pic.png").read_bytes() == b"bytes of /download/attachments/1/pic.png"
+    assert (tmp_path / "two" / "doc.pdf").exists()
+    links = [call.args[0] for call in client.download_attachment.call_args_list]
+    assert links.count("/download/attachments/1/pic.png") == 1
+    manifest = json.loads((tmp_path / ATTACHMENT_MANIFEST_FILENAME).read_text(encoding="utf-8"))
+    assert manifest["one/pic.png"] == {"id": "a1", "version": 1, "etag": "etag-1"}
+    assert manifest["two/pic.png"]["id"] == "a1"
+
+
+def test_later_runs_skip_unchanged_and_revalidate_new_versions(tmp_path, mocker):
+    """Test that files on disk are skipped by version and changed ones use a conditional request."""
+    client = mocker.Mock()
+    client.get_attachments.return_value = [_attachment("a1", "pic.png"), _attachment("a2", "doc.pdf")]
+    client.download_attachment.return_value = (b"data", "etag-1")
+    first = AttachmentDownloader(client, str(tmp_path))
+    first.submit_page("1", str(tmp_path / "page"))
+    first.close()
+
+    client.reset_mock()
+    client.get_attachments.return_value = [_attachment("a1", "pic.png"), _attachment("a2", "doc.pdf", version=2)]
+    client.download_attachment.return_value = (None, "etag-1")
+    second = AttachmentDownloader(client, str(tmp_path))
+    second.submit_page("1", str(tmp_path / "page"))
+    second.close()
+
+    client.download_attachment.assert_called_once_with("/download/attachments/1/doc.pdf", "etag-1")
+    assert second.downloaded == 0
+    assert second.skipped == 2
+    assert (tmp_path / "page" / "doc.pdf").read_bytes() == b"data"
+
+
+def test_workers_sharing_an_output_directory_keep_each_others_manifest_entries(tmp_path, mocker):
+    """Test that downloaders closing one after the other merge their entries into the manifest."""
+    client = mocker.Mock()
+    client.get_attachments.side_effect = lambda pid: [_attachment(f"a{pid}", "pic.png")]
+    client.download_attachment.return_value = (b"data", "etag-1")
+    first = AttachmentDownloader(client, str(tmp_path))
+    second = AttachmentDownloader(client, str(tmp_path))
+    first.submit_page("1", str(tmp_path / "one"))
+    second.submit_page("2", str(tmp_path / "two"))
+    first.close()
+    second.close()
+
+    manifest = json.loads((tmp_path / ATTACHMENT_MANIFEST_FILENAME).read_text(encoding="utf-8"))
+    assert sorted(manifest) == ["one/pic.png", "two/pic.png"]
+
+
+def test_failed_listing_and_downloads_are_reported_not_raised(tmp_path, mocker, capsys):
+    """Test that attachment errors are reported on stderr without aborting the export."""
+    client = mocker.Mock()
+    client.get_attachments.side_effect = lambda pid: (
+        [_attachment("a1", "pic.png")] if pid == "1" else (_ for _ in ()).throw(RuntimeError("forbidden"))
+    )
+    client.download_attachment.side_effect = RuntimeError("timeout")
+    downloader = AttachmentDownloader(client, str(tmp_path))
+    downloader.submit_page("1", str(tmp_path / "one"))
+    downloader.submit_page("2", str(tmp_path / "two"))
+    downloader.close()
+
+    err = capsys.readouterr().err
+    assert "Could not list attachments of page id 2: forbidden" in err
+    assert "Could not download attachment 'pic.png': timeout" in err
+    assert not (tmp_path / "one" / "pic.png").exists()
+
+
+def test_rewrite_links_only_rewrites_the_pages_own_attachments():
+    """Test that download URLs of the page's attachments become local file names."""
+    markdown = (
+        "[spec](https://x.atlassian.net/wiki/download/attachments/1/spec%20v2.pdf?version=3&api=v2) "
+        "![img](/download/attachments/1/pic.png) [other](/download/attachments/9/other.png)"
+    )
+    assert AttachmentDownloader.rewrite_links(markdown, "1") == (
+        "[spec](spec%20v2.pdf) ![img](pic.png) [other](/download/attachments/9/other.png)"
+    )
+
+
+def test_rewrite_links_point_at_the_saved_file_names(tmp_path, mocker):
+    """Test that rewritten links match the names the attachments are saved under."""
+    client = mocker.Mock()
+    client.get_attachments.return_value = [_attachment("a1", "index.md"), _attachment("a2", "a/b c.png")]
+    client.download_attachment.return_value = (b"data", None)
+    downloader = AttachmentDownloader(client, str(tmp_path))
+    downloader.submit_page("1", str(tmp_path))
+    downloader.close()
+
+    markdown = AttachmentDownloader.rewrite_links(
+        "[notes](/download/attachments/1/index.md) ![img](/download/attachments/1/a%2Fb%20c.png)", "1"
+    )
+    assert markdown == "[notes](_index.md) ![img](a_b%20c.png)"
+    assert (tmp_path / "_index.md").exists()
+    assert (tmp_path / "a_b c.png").exists()
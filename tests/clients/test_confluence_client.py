@@ -1,6 +1,8 @@
 """Unit tests for the ConfluenceClient using atlassian-python-api."""
 
 import pytest
+from atlassian.errors import ApiPermissionError
+from requests import HTTPError, Response
 
 from markdown_maker.clients.confluence_client import ConfluenceClient
 
@@ -15,7 +17,7 @@ def test_confluence_client_loads_config(monkeypatch):
         "confluence_api_token": "token123",
     }
 
-    def dummy_confluence_init(self, url, username, password, cloud):
+    def dummy_confluence_init(self, url, username, password, cloud, session=None):
         self.get_page_by_id = lambda page_id, expand=None: {}
 
     monkeypatch.setattr("markdown_maker.clients.confluence_client.load_config", lambda: dummy_config)
@@ -47,7 +49,7 @@ def test_get_page_content_success(monkeypatch):
             assert page_id == "123"
             return dummy_page
 
-    def dummy_confluence_init(self, url, username, password, cloud):
+    def dummy_confluence_init(self, url, username, password, cloud, session=None):
         self.get_page_by_id = DummyConfluence().get_page_by_id
 
     monkeypatch.setattr("markdown_maker.clients.confluence_client.load_config", lambda: dummy_config)
@@ -73,7 +75,7 @@ def test_get_page_content_not_found(monkeypatch):
         def get_page_by_id(self, page_id, expand=None):
             return None
 
-    def dummy_confluence_init(self, url, username, password, cloud):
+    def dummy_confluence_init(self, url, username, password, cloud, session=None):
         self.get_page_by_id = DummyConfluence().get_page_by_id
 
     monkeypatch.setattr("markdown_maker.clients.confluence_client.load_config", lambda: dummy_config)
@@ -88,24 +90,30 @@ def test_get_page_content_not_found(monkeypatch):
 
 
 def test_get_child_pages_success(monkeypatch):
-    """Test get_child_pages returns a list of child pages when found."""
+    """Test get_child_pages pages through the children, yielding only the needed fields."""
     dummy_config = {
         "confluence_base_url": "https://example.atlassian.net/wiki",
         "confluence_username": "user@example.com",
         "confluence_api_token": "token123",
     }
-    dummy_children = [
-        {"id": "101", "title": "Child 1"},
-        {"id": "102", "title": "Child 2"},
+    requests = []
+    batches = [
+        {
+            "results": [
+                {"id": "101", "title": "Child 1", "version": {"number": 4}, "status": "current"},
+                {"id": "102", "title": "Child 2", "version": {"number": 1}, "status": "current"},
+            ],
+            "_links": {"next": "/rest/api/content/123/child/page?start=2"},
+        },
+        {"results": [{"id": "103", "title": "Child 3", "version": {"number": 2}}], "_links": {}},
     ]
 
-    class DummyConfluence:
-        def get_child_pages(self, page_id):
-            assert page_id == "123"
-            return dummy_children
+    def dummy_get(path, params=None):
+        requests.append((path, dict(params)))
+        return batches[len(requests) - 1]
 
-    def dummy_confluence_init(self, url, username, password, cloud):
-        self.get_child_pages = DummyConfluence().get_child_pages
+    def dummy_confluence_init(self, url, username, password, cloud, session=None):
+        self.get = dummy_get
 
     monkeypatch.setattr("markdown_maker.clients.confluence_client.load_config", lambda: dummy_config)
     monkeypatch.setattr(
@@ -114,24 +122,33 @@ def test_get_child_pages_success(monkeypatch):
     )
 
     client = ConfluenceClient()
-    result = client.get_child_pages("123")
-    assert result == dummy_children
+    children = client.get_child_pages("123", page_size=2)
+    assert next(children) == {"id": "101", "title": "Child 1"}
+    # The next batch is only requested once the first one has been consumed.
+    assert len(requests) == 1
+    assert [child["id"] for child in children] == ["102", "103"]
+    assert requests == [
+        ("rest/api/content/123/child/page", {"start": 0, "limit": 2}),
+        ("rest/api/content/123/child/page", {"start": 2, "limit": 2}),
+    ]
 
 
 def test_get_child_pages_empty(monkeypatch):
-    """Test get_child_pages returns an empty list if no children found."""
+    """Test get_child_pages yields nothing if no children found."""
     dummy_config = {
         "confluence_base_url": "https://example.atlassian.net/wiki",
         "confluence_username": "user@example.com",
         "confluence_api_token": "token123",
+        "child_page_size": 50,
     }
+    limits = []
 
-    class DummyConfluence:
-        def get_child_pages(self, page_id):
-            return []
+    def dummy_get(path, params=None):
+        limits.append(params["limit"])
+        return {"results": [], "_links": {}}
 
-    def dummy_confluence_init(self, url, username, password, cloud):
-        self.get_child_pages = DummyConfluence().get_child_pages
+    def dummy_confluence_init(self, url, username, password, cloud, session=None):
+        self.get = dummy_get
 
     monkeypatch.setattr("markdown_maker.clients.confluence_client.load_config", lambda: dummy_config)
     monkeypatch.setattr(
@@ -140,8 +157,8 @@ def test_get_child_pages_empty(monkeypatch):
     )
 
     client = ConfluenceClient()
-    result = client.get_child_pages("123")
-    assert result == []
+    assert list(client.get_child_pages("123")) == []
+    assert limits == [50]
 
 
 def test_get_child_pages_api_error(monkeypatch):
@@ -152,12 +169,11 @@ def test_get_child_pages_api_error(monkeypatch):
         "confluence_api_token": "token123",
     }
 
-    class DummyConfluence:
-        def get_child_pages(self, page_id):
-            raise RuntimeError("API error")
+    def dummy_get(path, params=None):
+        raise RuntimeError("API error")
 
-    def dummy_confluence_init(self, url, username, password, cloud):
-        self.get_child_pages = DummyConfluence().get_child_pages
+    def dummy_confluence_init(self, url, username, password, cloud, session=None):
+        self.get = dummy_get
 
     monkeypatch.setattr("markdown_maker.clients.confluence_client.load_config", lambda: dummy_config)
     monkeypatch.setattr(
@@ -167,4 +183,236 @@ def test_get_child_pages_api_error(monkeypatch):
 
     client = ConfluenceClient()
     with pytest.raises(RuntimeError, match="API error"):
-        client.get_child_pages("123")
+        list(client.get_child_pages("123"))
+
+
+def test_find_page_ids_by_title_uses_one_cql_search(monkeypatch):
+    """Test find_page_ids_by_title resolves several titles with a single CQL query."""
+    dummy_config = {
+        "confluence_base_url": "https://example.atlassian.net/wiki",
+        "confluence_username": "user@example.com",
+        "confluence_api_token": "token123",
+    }
+    queries = []
+
+    class DummyConfluence:
+        def cql(self, cql, start=0, limit=None, expand=None):
+            queries.append(cql)
+            return {
+                "results": [
+                    {"content": {"id": "11", "title": "Page One", "space": {"key": "DOC"}}},
+                    {"content": {"id": "22", "title": 'Say "hi"', "space": {"key": "ENG"}}},
+                ]
+            }
+
+    def dummy_confluence_init(self, url, username, password, cloud, session=None):
+        self.cql = DummyConfluence().cql
+
+    monkeypatch.setattr("markdown_maker.clients.confluence_client.load_config", lambda: dummy_config)
+    monkeypatch.setattr(
+        "markdown_maker.clients.confluence_client.Confluence.__init__",
+        dummy_confluence_init,
+    )
+
+    client = ConfluenceClient()
+    result = client.find_page_ids_by_title([("DOC", "Page One"), ("", 'Say "hi"'), ("DOC", "Missing")])
+    assert result == {("DOC", "Page One"): "11", ("", 'Say "hi"'): "22"}
+    assert len(queries) == 1
+    assert '(space="DOC" AND title="Page One")' in queries[0]
+    assert 'title="Say \\"hi\\""' in queries[0]
+
+
+def test_find_page_ids_by_title_follows_pagination(monkeypatch):
+    """Test find_page_ids_by_title reads every page of results when titles match in many spaces."""
+    dummy_config = {
+        "confluence_base_url": "https://example.atlassian.net/wiki",
+        "confluence_username": "user@example.com",
+        "confluence_api_token": "token123",
+    }
+    starts = []
+
+    def dummy_cql(cql, start=0, limit=None, expand=None):
+        starts.append(start)
+        spaces = [f"S{i}" for i in range(start, min(start + limit, 30))]
+        results = [{"content": {"id": f"{space}-1", "title": "Home", "space": {"key": space}}} for space in spaces]
+        return {"results": results, "_links": {"next": "/rest/api/search"} if start + limit < 30 else {}}
+
+    def dummy_confluence_init(self, url, username, password, cloud, session=None):
+        self.cql = dummy_cql
+
+    monkeypatch.setattr("markdown_maker.clients.confluence_client.load_config", lambda: dummy_config)
+    monkeypatch.setattr(
+        "markdown_maker.clients.confluence_client.Confluence.__init__",
+        dummy_confluence_init,
+    )
+
+    result = ConfluenceClient().find_page_ids_by_title([("S29", "Home"), ("S0", "Home")])
+    assert result == {("S29", "Home"): "S29-1", ("S0", "Home"): "S0-1"}
+    assert starts == [0, 25]
+
+
+def test_get_attachments_paginates(monkeypatch):
+    """Test get_attachments follows `_links.next` when the server caps the page size."""
+    dummy_config = {
+        "confluence_base_url": "https://example.atlassian.net/wiki",
+        "confluence_username": "user@example.com",
+        "confluence_api_token": "token123",
+    }
+    starts = []
+
+    def get_attachments_from_content(page_id, start=0, limit=50, expand=None):
+        starts.append(start)
+        # The server caps the page size below the requested limit.
+        count = 2 if start == 0 else 1
+        return {
+            "results": [
+                {
+                    "id": f"att{start + i}",
+                    "title": f"file{start + i}.png",
+                    "version": {"number": 2},
+                    "_links": {"download": f"/download/attachments/{page_id}/file{start + i}.png"},
+                }
+                for i in range(count)
+            ],
+            "_links": {"next": f"/rest/api/content/{page_id}/child/attachment?start=2"} if start == 0 else {},
+        }
+
+    def dummy_confluence_init(self, url, username, password, cloud, session=None):
+        self.get_attachments_from_content = get_attachments_from_content
+
+    monkeypatch.setattr("markdown_maker.clients.confluence_client.load_config", lambda: dummy_config)
+    monkeypatch.setattr(
+        "markdown_maker.clients.confluence_client.Confluence.__init__",
+        dummy_confluence_init,
+    )
+
+    attachments = ConfluenceClient().get_attachments("7", page_size=50)
+    assert starts == [0, 2]
+    assert [a["id"] for a in attachments] == ["att0", "att1", "att2"]
+    assert attachments[0] == {
+        "id": "att0",
+        "title": "file0.png",
+        "version": 2,
+        "download": "/download/attachments/7/file0.png",
+    }
+
+
+def test_find_changed_pages_pages_through_cql_results(monkeypatch):
+    """Test find_changed_pages scopes the CQL to the tree and follows pagination."""
+    dummy_config = {
+        "confluence_base_url": "https://example.atlassian.net/wiki",
+        "confluence_username": "user@example.com",
+        "confluence_api_token": "token123",
+    }
+    calls = []
+
+    def dummy_cql(cql, start=0, limit=None, expand=None):
+        calls.append((cql, start))
+        if start == 0:
+            return {
+                "results": [{"content": {"id": "5", "title": "A", "version": {"number": 3}}}],
+                "_links": {"next": "/rest/api/search?start=1"},
+            }
+        return {"results": [{"content": {"id": "6", "title": "B", "version": {"number": 1}}}], "_links": {}}
+
+    def dummy_confluence_init(self, url, username, password, cloud, session=None):
+        self.cql = dummy_cql
+
+    monkeypatch.setattr("markdown_maker.clients.confluence_client.load_config", lambda: dummy_config)
+    monkeypatch.setattr(
+        "markdown_maker.clients.confluence_client.Confluence.__init__",
+        dummy_confluence_init,
+    )
+
+    changed = ConfluenceClient().find_changed_pages("42", 15, page_size=1)
+    assert changed == [{"id": "5", "title": "A", "version": 3}, {"id": "6", "title": "B", "version": 1}]
+    assert [start for _, start in calls] == [0, 1]
+    assert calls[0][0] == (
+        'type=page AND (id=42 OR ancestor=42) AND lastmodified > now("-15m") ORDER BY lastmodified ASC'
+    )
+
+
+def test_get_page_versions_batches_page_ids(monkeypatch):
+    """Test get_page_versions searches the page IDs in batches and omits pages not found."""
+    dummy_config = {
+        "confluence_base_url": "https://example.atlassian.net/wiki",
+        "confluence_username": "user@example.com",
+        "confluence_api_token": "token123",
+    }
+    queries = []
+
+    def dummy_cql(cql, start=0, limit=None, expand=None):
+        queries.append(cql)
+        found = [pid for pid in ("1", "2", "3") if pid in cql]
+        return {"results": [{"content": {"id": pid, "version": {"number": int(pid)}}} for pid in found], "_links": {}}
+
+    def dummy_confluence_init(self, url, username, password, cloud, session=None):
+        self.cql = dummy_cql
+
+    monkeypatch.setattr("markdown_maker.clients.confluence_client.load_config", lambda: dummy_config)
+    monkeypatch.setattr(
+        "markdown_maker.clients.confluence_client.Confluence.__init__",
+        dummy_confluence_init,
+    )
+
+    versions = ConfluenceClient().get_page_versions(["1", "2", "3", "4"], batch_size=2)
+    assert versions == {"1": 1, "2": 2, "3": 3}
+    assert queries == ["type=page AND id in (1,2)", "type=page AND id in (3,4)"]
+
+
+def test_get_page_content_maps_restricted_pages(monkeypatch):
+    """Test that a 403 response is raised as ApiPermissionError instead of a bare HTTPError."""
+    dummy_config = {
+        "confluence_base_url": "https://example.atlassian.net/wiki",
+        "confluence_username": "user@example.com",
+        "confluence_api_token": "token123",
+    }
+    response = Response()
+    response.status_code = 403
+
+    def get_page_by_id(page_id, expand=None):
+        raise HTTPError("403 Client Error: Forbidden", response=response)
+
+    def dummy_confluence_init(self, url, username, password, cloud, session=None):
+        self.get_page_by_id = get_page_by_id
+
+    monkeypatch.setattr("markdown_maker.clients.confluence_client.load_config", lambda: dummy_config)
+    monkeypatch.setattr(
+        "markdown_maker.clients.confluence_client.Confluence.__init__",
+        dummy_confluence_init,
+    )
+
+    client = ConfluenceClient()
+    with pytest.raises(ApiPermissionError, match="Page with id 123 is restricted."):
+        client.get_page_content("123")
+
+
+def test_fetch_profiles_select_expansions(monkeypatch):
+    """Test that each fetch profile requests only its expansions, and ancestors only for records."""
+    dummy_config = {
+        "confluence_base_url": "https://example.atlassian.net/wiki",
+        "confluence_username": "user@example.com",
+        "confluence_api_token": "token123",
+    }
+    expansions = []
+
+    def get_page_by_id(page_id, expand=None):
+        expansions.append(expand)
+        return {"id": page_id}
+
+    def dummy_confluence_init(self, url, username, password, cloud, session=None):
+        self.get_page_by_id = get_page_by_id
+
+    monkeypatch.setattr("markdown_maker.clients.confluence_client.load_config", lambda: dummy_config)
+    monkeypatch.setattr(
+        "markdown_maker.clients.confluence_client.Confluence.__init__",
+        dummy_confluence_init,
+    )
+
+    ConfluenceClient().get_page_content("1")
+    client = ConfluenceClient(content_profile="record")
+    client.get_page_content("1")
+    client.get_page_metadata("1")
+    assert expansions == ["body.storage,version,space", "body.storage,version,space,ancestors", "version"]
+    with pytest.raises(ValueError, match="Unknown fetch profile 'full'"):
+        ConfluenceClient(content_profile="full")
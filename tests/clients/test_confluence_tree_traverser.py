@@ -0,0 +1,346 @@
+"""Unit tests for the ConfluenceTreeTraverser."""
+
+import time
+import tracemalloc
+
+from atlassian.errors import ApiNotFoundError
+
+from markdown_maker.clients.confluence_tree_traverser import ConfluenceTreeTraverser
+from markdown_maker.clients.negative_cache import NegativeCache
+from markdown_maker.converters.storage_format import convert_storage_to_markdown
+from markdown_maker.utils.journal import ExportJournal
+
+PAGE_SIZE = 1_000_000
+
+
+class ChainClient:
+    """Fake client serving a linear chain of large pages, one child per level."""
+
+    def __init__(self, depth: int) -> None:
+        self.depth = depth
+
+    def get_page_content(self, page_id: str) -> dict:
+        # Build the body on every call so it is attributed to the traversal.
+        return {"title": f"Page {page_id}", "body": {"storage": {"value": "<p>" + "x" * PAGE_SIZE + "</p>"}}}
+
+    def get_child_pages(self, page_id: str) -> list:
+        next_id = int(page_id) + 1
+        return [{"id": str(next_id), "title": f"Page {next_id}"}] if next_id <= self.depth else []
+
+
+def _peak_traversal_memory(mocker, depth: int) -> int:
+    # Use ``new`` rather than ``side_effect`` so the mock does not record every body.
+    mocker.patch(
+        "markdown_maker.clients.confluence_tree_traverser.convert_html_to_markdown",
+        new=lambda html: html.upper(),
+    )
+    traverser = ConfluenceTreeTraverser(
+        client=ChainClient(depth),
+        max_depth=depth,
+        handle_page=lambda title, url, markdown, depth, parent_dir, info: "",
+    )
+    tracemalloc.start()
+    try:
+        traverser.traverse("1", "https://company.atlassian.net/wiki/pages/viewpage.action?pageId=1")
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert len(traverser.visited) == depth
+    return peak
+
+
+def test_traverse_peak_memory_is_flat_with_depth(mocker):
+    """Test that page bodies are released before descending into children."""
+    shallow = _peak_traversal_memory(mocker, 2)
+    deep = _peak_traversal_memory(mocker, 10)
+    # Holding every ancestor's HTML and Markdown would cost ~2 * PAGE_SIZE per level.
+    assert deep < shallow + PAGE_SIZE
+
+
+def test_traverse_does_not_fetch_children_at_max_depth(mocker):
+    """Test that no child or link lookups happen for pages at the depth limit."""
+    client = mocker.Mock()
+    client.get_page_content.return_value = {
+        "title": "Leaf",
+        "body": {"storage": {"value": '<a href="https://x/wiki/pages/viewpage.action?pageId=2">link</a>'}},
+    }
+    handle_page = mocker.Mock(return_value="")
+    traverser = ConfluenceTreeTraverser(client=client, max_depth=1, handle_page=handle_page)
+    traverser.traverse("1", "https://x/wiki/pages/viewpage.action?pageId=1")
+    handle_page.assert_called_once()
+    client.get_child_pages.assert_not_called()
+    assert traverser.visited == {"1": 1}
+
+
+def test_title_links_are_resolved_in_one_batch(mocker):
+    """Test that ac:link and /display/ links are resolved together and followed in document order."""
+    html = (
+        '<p><ac:link><ri:page ri:content-title="Same Space"/></ac:link></p>'
+        '<a href="https://x/wiki/display/ENG/Other+Page">other</a>'
+        '<a href="https://x/wiki/pages/viewpage.action?pageId=9">by id</a>'
+        '<ac:link><ri:page ri:content-title="Unknown" ri:space-key="DOC"/></ac:link>'
+    )
+    client = mocker.Mock()
+    client.get_page_content.side_effect = lambda pid: (
+        {"title": "Root", "space": {"key": "DOC"}, "body": {"storage": {"value": html}}}
+        if pid == "1"
+        else {"title": f"Page {pid}", "body": {"storage": {"value": ""}}}
+    )
+    client.get_child_pages.return_value = []
+    resolver = mocker.Mock()
+    resolver.resolve.return_value = {("DOC", "Same Space"): "7", ("ENG", "Other Page"): "8"}
+    traverser = ConfluenceTreeTraverser(
+        client=client,
+        max_depth=2,
+        handle_page=lambda title, url, markdown, depth, parent_dir, info: "",
+        title_resolver=resolver,
+    )
+    traverser.traverse("1", "https://x/wiki/pages/viewpage.action?pageId=1")
+    resolver.resolve.assert_called_once_with([("DOC", "Same Space"), ("ENG", "Other Page"), ("DOC", "Unknown")])
+    assert [call.args[0] for call in client.get_page_content.call_args_list] == ["1", "7", "8", "9"]
+
+
+def test_shallower_rediscovery_expands_cut_off_levels_without_refetching(mocker):
+    """Test that a page first reached deep is expanded further when reached shallower later."""
+    children = {"1": ["2", "3"], "2": ["3"], "3": ["6"], "6": ["7"]}
+    bodies = {"6": '<a href="https://x/wiki/pages/viewpage.action?pageId=9">nine</a>'}
+    client = mocker.Mock()
+    client.get_page_content.side_effect = lambda pid: {
+        "title": f"Page {pid}",
+        "body": {"storage": {"value": bodies.get(pid, "")}},
+    }
+    client.get_child_pages.side_effect = lambda pid: [{"id": c, "title": f"Page {c}"} for c in children.get(pid, [])]
+    handle_page = mocker.Mock(side_effect=lambda title, url, markdown, depth, parent_dir, info: title)
+    traverser = ConfluenceTreeTraverser(client=client, max_depth=4, handle_page=handle_page)
+    traverser.traverse("1", "https://x/wiki/pages/viewpage.action?pageId=1")
+
+    # Page 3 is first written at depth 3 below page 2, then reached at depth 2 from the root.
+    assert traverser.visited == {"1": 1, "2": 2, "3": 2, "6": 3, "7": 4, "9": 4}
+    written = [call.args[0] for call in handle_page.call_args_list]
+    assert written == ["Page 1", "Page 2", "Page 3", "Page 6", "Page 7", "Page 9"]
+    fetched = [call.args[0] for call in client.get_page_content.call_args_list]
+    # Page 3's frontier is reused, and page 6, written at the depth limit, kept the links it was converted with.
+    assert fetched.count("3") == 1
+    assert fetched.count("6") == 1
+    assert [call.args[0] for call in client.get_child_pages.call_args_list].count("3") == 1
+    # Pages 7 and 9 land below page 6's original directory.
+    assert handle_page.call_args_list[-2].args[4] == "Page 6"
+    assert handle_page.call_args_list[-1].args[4] == "Page 6"
+
+
+def test_failed_page_reached_again_shallower_is_skipped(mocker, capsys):
+    """Test that a page whose fetch failed deep in the tree is not expanded when linked from higher up."""
+    link = '<a href="https://x/wiki/pages/viewpage.action?pageId={}">link</a>'
+    bodies = {"1": link.format("2") + link.format("3"), "2": link.format("3")}
+    client = mocker.Mock()
+
+    def get_page_content(pid):
+        if pid == "3":
+            raise ApiNotFoundError(f"Page with id {pid} not found.")
+        return {"title": f"Page {pid}", "body": {"storage": {"value": bodies.get(pid, "")}}}
+
+    client.get_page_content.side_effect = get_page_content
+    client.get_child_pages.return_value = []
+    handle_page = mocker.Mock(side_effect=lambda title, url, markdown, depth, parent_dir, info: title)
+    traverser = ConfluenceTreeTraverser(client=client, max_depth=3, handle_page=handle_page)
+    traverser.traverse("1", "https://x/wiki/pages/viewpage.action?pageId=1")
+
+    assert [call.args[0] for call in handle_page.call_args_list] == ["Page 1", "Page 2"]
+    assert [call.args[0] for call in client.get_page_content.call_args_list] == ["1", "2", "3"]
+    assert "Page with id 3 not found." in capsys.readouterr().err
+
+
+def test_resumed_depth_limit_page_is_expanded_from_journaled_links(tmp_path, mocker):
+    """Test that a page journaled at the depth limit is expanded on resume without fetching it again."""
+    path = str(tmp_path / "journal.jsonl")
+    journal = ExportJournal(path, "1")
+    journal.record_page("1", "Page 1", 1, "Page 1", [], [], False, [(None, ("DOC", "Nine"), "")])
+    journal.close()
+    client = _tree_client(mocker, {"1": ["2"]})
+    resolver = mocker.Mock()
+    resolver.resolve.return_value = {("DOC", "Nine"): "9"}
+    handle_page = mocker.Mock(side_effect=lambda title, url, markdown, depth, parent_dir, info: title)
+    traverser = ConfluenceTreeTraverser(
+        client=client,
+        max_depth=2,
+        handle_page=handle_page,
+        journal=ExportJournal(path, "1", resume=True),
+        title_resolver=resolver,
+    )
+    traverser.traverse("1", "https://x/wiki/pages/viewpage.action?pageId=1")
+    assert [call.args[0] for call in client.get_page_content.call_args_list] == ["2", "9"]
+    assert [call.args[0] for call in handle_page.call_args_list] == ["Page 2", "Page 9"]
+    resolver.resolve.assert_called_once_with([("DOC", "Nine")])
+
+
+def _tree_client(mocker, children: dict[str, list[str]]):
+    client = mocker.Mock()
+    client.get_page_content.side_effect = lambda pid: {"title": f"Page {pid}", "body": {"storage": {"value": ""}}}
+    client.get_child_pages.side_effect = lambda pid: [{"id": c, "title": f"Page {c}"} for c in children.get(pid, [])]
+    return client
+
+
+def test_breadth_first_order_and_page_budget(mocker):
+    """Test that breadth-first order writes each level before the next and stops at max_pages."""
+    client = _tree_client(mocker, {"1": ["2", "3"], "2": ["4"], "3": ["5"]})
+    handle_page = mocker.Mock(side_effect=lambda title, url, markdown, depth, parent_dir, info: title)
+    depth_first = ConfluenceTreeTraverser(client=client, max_depth=3, handle_page=handle_page)
+    depth_first.traverse("1", "https://x/wiki/pages/viewpage.action?pageId=1")
+    assert [call.args[0] for call in handle_page.call_args_list] == ["Page 1", "Page 2", "Page 4", "Page 3", "Page 5"]
+
+    handle_page.reset_mock()
+    breadth_first = ConfluenceTreeTraverser(
+        client=client, max_depth=3, handle_page=handle_page, order="breadth-first", max_pages=4
+    )
+    breadth_first.traverse("1", "https://x/wiki/pages/viewpage.action?pageId=1")
+    assert [call.args[0] for call in handle_page.call_args_list] == ["Page 1", "Page 2", "Page 3", "Page 4"]
+    assert breadth_first.stop_reason == "page budget of 4 reached"
+    assert "5" not in breadth_first.visited
+
+
+def test_deadline_stops_before_fetching(mocker):
+    """Test that no page is fetched once the deadline has passed."""
+    client = _tree_client(mocker, {})
+    handle_page = mocker.Mock(return_value="")
+    traverser = ConfluenceTreeTraverser(
+        client=client, max_depth=3, handle_page=handle_page, deadline=time.monotonic() - 1
+    )
+    traverser.traverse("1", "https://x/wiki/pages/viewpage.action?pageId=1")
+    assert traverser.stop_reason == "deadline reached"
+    client.get_page_content.assert_not_called()
+    handle_page.assert_not_called()
+
+
+def test_inaccessible_pages_are_not_fetched_again(mocker, capsys):
+    """Test that a page that failed with not found is skipped by a later traversal sharing the cache."""
+    client = _tree_client(mocker, {"1": ["2"]})
+    fetch = client.get_page_content.side_effect
+
+    def get_page_content(pid):
+        if pid == "2":
+            raise ApiNotFoundError(f"Page with id {pid} not found.")
+        return fetch(pid)
+
+    client.get_page_content.side_effect = get_page_content
+    handle_page = mocker.Mock(return_value="")
+    negative_cache = NegativeCache()
+    for _ in range(2):
+        traverser = ConfluenceTreeTraverser(
+            client=client, max_depth=2, handle_page=handle_page, negative_cache=negative_cache
+        )
+        traverser.traverse("1", "https://x/wiki/pages/viewpage.action?pageId=1")
+    assert [call.args[0] for call in client.get_page_content.call_args_list] == ["1", "2", "1"]
+    assert "Page with id 2 not found. (cached, not fetched again)" in capsys.readouterr().err
+
+
+def test_will_fetch_rejects_visited_and_inaccessible_pages(mocker):
+    """Test that pages a visit would not fetch are reported to the prefetcher as such."""
+    negative_cache = NegativeCache()
+    negative_cache.add("3", "restricted")
+    traverser = ConfluenceTreeTraverser(
+        client=_tree_client(mocker, {"1": ["2"]}),
+        max_depth=1,
+        handle_page=mocker.Mock(return_value=""),
+        negative_cache=negative_cache,
+    )
+    traverser.traverse("1", "https://x/wiki/pages/viewpage.action?pageId=1")
+    assert [traverser.will_fetch(pid) for pid in ("1", "2", "3")] == [False, True, False]
+
+
+def test_children_are_visited_while_listing_is_paged(mocker):
+    """Test that the first child is exported before the rest of the child listing is requested."""
+    events = []
+
+    def get_child_pages(pid):
+        if pid != "1":
+            return
+        for batch in (["2", "3"], ["4"]):
+            events.append(f"list batch {batch}")
+            for child_id in batch:
+                yield {"id": child_id, "title": f"Page {child_id}"}
+
+    client = mocker.Mock()
+    client.get_page_content.side_effect = lambda pid: {"title": f"Page {pid}", "body": {"storage": {"value": ""}}}
+    client.get_child_pages.side_effect = get_child_pages
+    traverser = ConfluenceTreeTraverser(
+        client=client,
+        max_depth=2,
+        handle_page=lambda title, url, markdown, depth, parent_dir, info: events.append(f"write {title}") or title,
+    )
+    traverser.traverse("1", "https://x/wiki/pages/viewpage.action?pageId=1")
+    assert events == [
+        "write Page 1",
+        "list batch ['2', '3']",
+        "write Page 2",
+        "write Page 3",
+        "list batch ['4']",
+        "write Page 4",
+    ]
+
+
+def test_failed_child_listing_is_listed_again_on_resume(tmp_path, mocker, capsys):
+    """Test that a listing failing on a later batch is not journaled as complete, so resume lists it again."""
+    failing = True
+
+    def get_child_pages(pid):
+        if pid != "1":
+            return
+        yield {"id": "2", "title": "Page 2"}
+        if failing:
+            raise RuntimeError("Failed to fetch child pages: connection reset")
+        yield {"id": "3", "title": "Page 3"}
+
+    client = _tree_client(mocker, {})
+    client.get_child_pages.side_effect = get_child_pages
+    handle_page = mocker.Mock(side_effect=lambda title, url, markdown, depth, parent_dir, info: title)
+    path = str(tmp_path / "journal.jsonl")
+    journal = ExportJournal(path, "1")
+    traverser = ConfluenceTreeTraverser(client=client, max_depth=2, handle_page=handle_page, journal=journal)
+    traverser.traverse("1", "https://x/wiki/pages/viewpage.action?pageId=1")
+    journal.close()
+    assert [call.args[0] for call in handle_page.call_args_list] == ["Page 1", "Page 2"]
+    assert "Could not list the children of 'Page 1' (id 1): Failed to fetch child pages" in capsys.readouterr().err
+    assert traverser._frontiers["1"]["children"] is None
+
+    failing = False
+    handle_page.reset_mock()
+    resumed = ConfluenceTreeTraverser(
+        client=client, max_depth=2, handle_page=handle_page, journal=ExportJournal(path, "1", resume=True)
+    )
+    resumed.traverse("1", "https://x/wiki/pages/viewpage.action?pageId=1")
+    assert [call.args[0] for call in handle_page.call_args_list] == ["Page 3"]
+
+
+def test_large_pages_are_streamed_to_the_handler(mocker):
+    """Test that pages above the stream threshold reach the handler as chunks and their links are followed."""
+    big = (
+        "<h1>Big</h1>" + "<p>row</p>" * 50 + '<a href="https://x/wiki/pages/viewpage.action?pageId=2">two</a>'
+        '<ac:link><ri:page ri:content-title="Three"/></ac:link>'
+    )
+    client = mocker.Mock()
+    client.get_page_content.side_effect = lambda pid: (
+        {"title": "Root", "space": {"key": "DOC"}, "body": {"storage": {"value": big}}}
+        if pid == "1"
+        else {"title": f"Page {pid}", "body": {"storage": {"value": "<p>small</p>"}}}
+    )
+    client.get_child_pages.return_value = []
+    resolver = mocker.Mock()
+    resolver.resolve.return_value = {("DOC", "Three"): "3"}
+    received = {}
+
+    def handle_page(title, url, markdown, depth, parent_dir, info):
+        received[title] = markdown if isinstance(markdown, str) else list(markdown)
+        return title
+
+    traverser = ConfluenceTreeTraverser(
+        client=client, max_depth=2, handle_page=handle_page, title_resolver=resolver, stream_threshold=len(big)
+    )
+    traverser.traverse("1", "https://x/wiki/pages/viewpage.action?pageId=1")
+    assert isinstance(received["Root"], list)
+    assert "".join(received["Root"]) == convert_storage_to_markdown(big, "DOC")
+    assert isinstance(received["Page 2"], str)
+    assert traverser.visited == {"1": 1, "2": 2, "3": 2}
+    assert traverser._frontiers["1"]["links"] == [
+        ("2", "https://x/wiki/pages/viewpage.action?pageId=2"),
+        ("3", "https://company.atlassian.net/wiki/pages/viewpage.action?pageId=3"),
+    ]
@@ -0,0 +1,59 @@
+"""Unit tests for dry-run export planning."""
+
+from markdown_maker.clients.export_planner import ExportPlanner, count_page_links
+
+
+def _planner_client(mocker, children: dict[str, list[str]], body: str = "<p>body</p>"):
+    client = mocker.Mock()
+    client.requests_per_second = 2.0
+    client.get_page_metadata.side_effect = lambda pid: {"title": f"Page {pid}", "version": {"number": 1}}
+    client.get_page_content.side_effect = lambda pid: {"title": f"Page {pid}", "body": {"storage": {"value": body}}}
+    client.get_child_pages.side_effect = lambda pid: [{"id": c, "title": f"Page {c}"} for c in children.get(pid, [])]
+    return client
+
+
+def test_plan_discovers_tree_with_metadata_and_samples_bodies(mocker):
+    """Test that discovery uses metadata calls and only the sample fetches bodies."""
+    body = '<p><a href="https://x/wiki/pages/viewpage.action?pageId=9">a</a> <a href="https://example.com">b</a></p>'
+    client = _planner_client(mocker, {"1": ["2", "3"], "2": ["4", "5"], "4": ["6"]}, body)
+    plan = ExportPlanner(client, max_depth=3, sample_size=2).plan("1")
+
+    assert plan["root_title"] == "Page 1"
+    assert plan["pages"] == 5
+    assert plan["depth_histogram"] == {1: 1, 2: 2, 3: 2}
+    assert plan["sampled"] == 2
+    assert client.get_page_content.call_count == 2
+    assert plan["avg_body_bytes"] == len(body)
+    assert plan["estimated_total_bytes"] == 5 * len(body)
+    assert plan["avg_links_per_page"] == 1
+    # Five body fetches plus child listings of the three pages above the depth limit.
+    assert plan["estimated_requests"] == 8
+    assert plan["estimated_seconds"] == 4
+    assert "4" not in [call.args[0] for call in client.get_child_pages.call_args_list]
+
+
+def test_plan_keeps_going_when_a_child_listing_fails_part_way(mocker):
+    """Test that a child listing failing while it is paged does not abort the plan."""
+    client = _planner_client(mocker, {"1": ["2", "3"], "3": ["4"]})
+
+    def get_child_pages(pid):
+        yield from [{"id": c, "title": f"Page {c}"} for c in {"1": ["2", "3"], "3": ["4"]}.get(pid, [])]
+        if pid == "1":
+            raise RuntimeError("Failed to fetch child pages: 500")
+
+    client.get_child_pages.side_effect = get_child_pages
+    plan = ExportPlanner(client, max_depth=3, sample_size=0).plan("1")
+    assert plan["pages"] == 4
+    assert plan["depth_histogram"] == {1: 1, 2: 2, 3: 1}
+
+
+def test_count_page_links_counts_id_and_title_links():
+    """Test that links by id, display URL and ac:link count, other links do not."""
+    html = (
+        '<a href="/wiki/spaces/DOC/pages/1/A">id</a>'
+        '<a href="/wiki/display/DOC/Some+Page">title</a>'
+        '<ac:link><ri:page ri:content-title="Other"/></ac:link>'
+        '<ac:link><ri:attachment ri:filename="x.pdf"/></ac:link>'
+        '<a href="https://example.com">external</a>'
+    )
+    assert count_page_links(html) == 3
@@ -0,0 +1,153 @@
+"""Unit tests for watch mode."""
+
+import json
+
+import pytest
+import requests
+from atlassian.errors import ApiNotFoundError
+
+from markdown_maker.clients.export_watcher import WATCH_STATE_FILENAME, ExportWatcher
+
+
+@pytest.fixture
+def site():
+    """A small page tree whose bodies and versions the tests change."""
+    return {
+        "1": {"title": "Root", "version": {"number": 1}, "body": {"storage": {"value": "<p>root v1</p>"}}},
+        "2": {
+            "title": "Child",
+            "version": {"number": 1},
+            "ancestors": [{"id": "1"}],
+            "body": {"storage": {"value": "<p>child v1</p>"}},
+        },
+    }
+
+
+@pytest.fixture
+def client(mocker, site):
+    client = mocker.Mock()
+    client.get_page_content.side_effect = lambda pid: site[pid]
+    client.get_child_pages.side_effect = lambda pid: [{"id": "2", "title": "Child"}] if pid == "1" else []
+    client.find_changed_pages.return_value = []
+    client.get_page_versions.side_effect = lambda ids: {
+        pid: site[pid]["version"]["number"] for pid in ids if pid in site and not site[pid].get("deleted")
+    }
+
+    def get_page_metadata(pid):
+        if pid not in site:
+            raise ApiNotFoundError(f"Page with id {pid} not found.")
+        return site[pid]
+
+    client.get_page_metadata.side_effect = get_page_metadata
+    return client
+
+
+def test_initial_export_then_poll_reconverts_only_changed_pages(tmp_path, client, site):
+    """Test that a poll rewrites changed pages in place and skips unchanged versions."""
+    watcher = ExportWatcher(client, "1", str(tmp_path), max_depth=3, converter=lambda html, space_key="": html)
+    watcher.run(interval=0, once=True)
+    child_md = tmp_path / "root" / "child" / "index.md"
+    assert child_md.read_text(encoding="utf-8") == "<p>child v1</p>"
+    state = json.loads((tmp_path / WATCH_STATE_FILENAME).read_text(encoding="utf-8"))
+    assert state["pages"]["2"] == {"page_dir": "root/child", "depth": 2, "version": 1}
+
+    client.get_page_content.reset_mock()
+    site["2"].update(title="Renamed Child", version={"number": 2}, body={"storage": {"value": "<p>child v2</p>"}})
+    client.find_changed_pages.return_value = [
+        {"id": "1", "title": "Root", "version": 1},
+        {"id": "2", "title": "Renamed Child", "version": 2},
+    ]
+    assert watcher.poll() == 1
+    client.get_page_content.assert_called_once_with("2")
+    assert child_md.read_text(encoding="utf-8") == "<p>child v2</p>"
+    # The look-back window covers the time since the last poll plus the two-minute overlap.
+    assert client.find_changed_pages.call_args.args[0] == "1"
+    assert client.find_changed_pages.call_args.args[1] in (2, 3)
+
+
+def test_new_pages_are_placed_below_their_exported_ancestor(tmp_path, client, site):
+    """Test that a page created after the export lands below its nearest exported ancestor."""
+    watcher = ExportWatcher(client, "1", str(tmp_path), max_depth=3, converter=lambda html, space_key="": html)
+    watcher.initial_export()
+    site["3"] = {
+        "title": "New Page",
+        "version": {"number": 1},
+        "ancestors": [{"id": "1"}, {"id": "2"}],
+        "body": {"storage": {"value": "<p>new</p>"}},
+    }
+    site["4"] = {**site["3"], "title": "Too Deep", "ancestors": [{"id": "1"}, {"id": "2"}, {"id": "3"}]}
+    client.find_changed_pages.return_value = [{"id": "3", "version": 1}, {"id": "4", "version": 1}]
+    assert watcher.poll() == 1
+    assert (tmp_path / "root" / "child" / "new_page" / "index.md").read_text(encoding="utf-8") == "<p>new</p>"
+    assert watcher.pages["3"]["depth"] == 3
+    assert "4" not in watcher.pages
+
+
+def test_restarted_watcher_continues_from_state(tmp_path, client):
+    """Test that state is reloaded and a state file of another root is rejected."""
+    ExportWatcher(client, "1", str(tmp_path), max_depth=3).initial_export()
+    client.get_page_content.reset_mock()
+    restarted = ExportWatcher(client, "1", str(tmp_path), max_depth=3)
+    restarted.run(interval=0, once=True)
+    client.get_page_content.assert_not_called()
+    client.find_changed_pages.assert_called_once()
+    with pytest.raises(ValueError, match="belongs to page 1"):
+        ExportWatcher(client, "99", str(tmp_path), max_depth=3)
+
+
+def test_watcher_keeps_running_when_a_poll_fails(tmp_path, client, site, mocker):
+    """Test that a connection error ends only that poll, and the next poll retries the same window."""
+    watcher = ExportWatcher(client, "1", str(tmp_path), max_depth=3, converter=lambda html, space_key="": html)
+    watcher.initial_export()
+    checkpoint = watcher.checkpoint
+    site["2"].update(version={"number": 2}, body={"storage": {"value": "<p>child v2</p>"}})
+    client.find_changed_pages.side_effect = [
+        requests.ConnectionError("connection reset"),
+        [{"id": "2", "title": "Child", "version": 2}],
+    ]
+    sleep = mocker.patch("markdown_maker.clients.export_watcher.time.sleep", side_effect=[None, KeyboardInterrupt])
+    with pytest.raises(KeyboardInterrupt):
+        watcher.run(interval=60)
+    assert sleep.call_count == 2
+    assert (tmp_path / "root" / "child" / "index.md").read_text(encoding="utf-8") == "<p>child v2</p>"
+    assert watcher.checkpoint > checkpoint
+
+
+def test_page_failing_with_timeout_keeps_checkpoint(tmp_path, client, site):
+    """Test that a page failing with a network error is retried by the next poll."""
+    watcher = ExportWatcher(client, "1", str(tmp_path), max_depth=3, converter=lambda html, space_key="": html)
+    watcher.initial_export()
+    checkpoint = watcher.checkpoint
+    client.get_page_content.side_effect = requests.Timeout("read timed out")
+    client.find_changed_pages.return_value = [{"id": "2", "title": "Child", "version": 2}]
+    assert watcher.poll() == 0
+    assert watcher.checkpoint == checkpoint
+
+
+def test_poll_updates_exported_pages_outside_the_change_feed(tmp_path, client, site):
+    """Test that a page exported through an embedded link is reconverted when its version changes."""
+    site["1"]["body"]["storage"]["value"] = '<p><a href="/wiki/pages/viewpage.action?pageId=9">Linked</a></p>'
+    site["9"] = {"title": "Linked", "version": {"number": 1}, "body": {"storage": {"value": "<p>linked v1</p>"}}}
+    watcher = ExportWatcher(client, "1", str(tmp_path), max_depth=3, converter=lambda html, space_key="": html)
+    watcher.initial_export()
+    assert "9" in watcher.pages
+    linked_md = tmp_path / watcher.pages["9"]["page_dir"] / "index.md"
+
+    site["9"].update(version={"number": 2}, body={"storage": {"value": "<p>linked v2</p>"}})
+    assert watcher.poll() == 1
+    assert linked_md.read_text(encoding="utf-8") == "<p>linked v2</p>"
+    assert sorted(client.get_page_versions.call_args.args[0]) == ["1", "2", "9"]
+
+
+def test_poll_removes_deleted_pages(tmp_path, client, site):
+    """Test that a deleted page is removed, while a page missing only from the search is kept."""
+    watcher = ExportWatcher(client, "1", str(tmp_path), max_depth=3, converter=lambda html, space_key="": html)
+    watcher.initial_export()
+    site["1"]["deleted"] = True
+    del site["2"]
+    assert watcher.poll() == 0
+    assert not (tmp_path / "root" / "child").exists()
+    assert (tmp_path / "root" / "index.md").exists()
+    assert list(watcher.pages) == ["1"]
+    state = json.loads((tmp_path / WATCH_STATE_FILENAME).read_text(encoding="utf-8"))
+    assert list(state["pages"]) == ["1"]
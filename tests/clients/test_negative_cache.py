@@ -0,0 +1,74 @@
+"""Unit tests for the negative cache of inaccessible pages."""
+
+import json
+
+import pytest
+from atlassian.errors import ApiError, ApiNotFoundError, ApiPermissionError, ApiValueError
+from requests import HTTPError, Response
+
+from markdown_maker.clients.negative_cache import NegativeCache, is_inaccessible
+
+
+def _http_error(status: int) -> HTTPError:
+    response = Response()
+    response.status_code = status
+    return HTTPError(f"{status} Client Error", response=response)
+
+
+@pytest.mark.parametrize(
+    "exc, expected",
+    [
+        (ApiNotFoundError("gone"), True),
+        (ApiPermissionError("restricted"), True),
+        (ApiError("Page not found", reason=_http_error(404)), True),
+        (ApiError("Server error", reason=_http_error(503)), False),
+        (ApiValueError("bad request"), False),
+        (ApiError("no reason"), False),
+    ],
+)
+def test_is_inaccessible(exc, expected):
+    """Test that only permission and not found failures count as inaccessible."""
+    assert is_inaccessible(exc) is expected
+
+
+def test_entries_expire_after_ttl(mocker):
+    """Test that a page is reported until its TTL has passed."""
+    now = mocker.patch("markdown_maker.clients.negative_cache.time.time", return_value=1000.0)
+    cache = NegativeCache(ttl=60)
+    cache.add("7", "Page with id 7 not found.")
+    assert cache.get("7") == "Page with id 7 not found."
+    assert cache.get("8") is None
+    now.return_value = 1060.0
+    assert cache.get("7") is None
+
+
+def test_cache_persists_unexpired_entries(tmp_path, mocker):
+    """Test that unexpired entries are saved and known to a later cache."""
+    now = mocker.patch("markdown_maker.clients.negative_cache.time.time", return_value=1000.0)
+    cache_path = tmp_path / "cache" / "inaccessible.json"
+    cache = NegativeCache(str(cache_path), ttl=60)
+    cache.add("old", "restricted")
+    now.return_value = 1050.0
+    cache.add("7", "restricted")
+    now.return_value = 1070.0
+    cache.save()
+    assert json.loads(cache_path.read_text(encoding="utf-8")) == [["7", 1050.0, "restricted"]]
+    assert NegativeCache(str(cache_path), ttl=60).get("7") == "restricted"
+
+
+def test_caches_sharing_a_file_merge_their_entries(tmp_path, mocker):
+    """Test that a cache saving after another keeps the other's entries and the latest failure of each page."""
+    now = mocker.patch("markdown_maker.clients.negative_cache.time.time", return_value=1000.0)
+    cache_path = str(tmp_path / "inaccessible.json")
+    first = NegativeCache(cache_path, ttl=60)
+    second = NegativeCache(cache_path, ttl=60)
+    first.add("7", "restricted")
+    now.return_value = 1010.0
+    second.add("8", "not found")
+    second.add("7", "still restricted")
+    second.save()
+    first.save()
+    assert json.loads((tmp_path / "inaccessible.json").read_text(encoding="utf-8")) == [
+        ["7", 1010.0, "still restricted"],
+        ["8", 1010.0, "not found"],
+    ]
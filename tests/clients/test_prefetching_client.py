@@ -0,0 +1,97 @@
+"""Unit tests for the read-ahead prefetching client."""
+
+import threading
+
+import pytest
+
+from markdown_maker.clients.prefetching_client import PrefetchingClient
+
+
+def test_children_are_fetched_ahead_on_worker_threads(mocker):
+    """Test that child content is fetched on the pool and served once from the prefetched copy."""
+    threads = {}
+
+    def get_page_content(pid):
+        threads[pid] = threading.current_thread().name
+        return {"id": pid}
+
+    inner = mocker.Mock()
+    inner.get_page_content.side_effect = get_page_content
+    inner.get_child_pages.return_value = [{"id": "2"}, {"id": "3"}, {"id": "4"}]
+    inner.find_page_ids_by_title.return_value = {}
+    client = PrefetchingClient(inner, workers=2)
+
+    children = client.get_child_pages("1")
+    assert next(children) == {"id": "2"}
+    # Reading the first child also queued the next two.
+    assert client.get_page_content("2") == {"id": "2"}
+    assert next(children) == {"id": "3"}
+    assert client.get_page_content("3") == {"id": "3"}
+    assert next(children) == {"id": "4"}
+    assert client.get_page_content("4") == {"id": "4"}
+    assert list(children) == []
+    assert all(name.startswith("page-prefetch") for name in threads.values())
+    assert inner.get_page_content.call_count == 3
+    # Claimed pages are fetched again on the next request, other calls pass through.
+    assert client.get_page_content("2") == {"id": "2"}
+    assert threads["2"] == threading.current_thread().name
+    assert client.find_page_ids_by_title([]) == {}
+    client.close()
+
+
+def test_only_children_that_will_be_fetched_are_prefetched(mocker):
+    """Test that rejected children are not prefetched and skipped children's prefetches are dropped."""
+    inner = mocker.Mock()
+    inner.get_page_content.side_effect = lambda pid: {"id": pid}
+    inner.get_child_pages.return_value = [{"id": str(i)} for i in range(6)]
+    client = PrefetchingClient(inner, workers=2, should_prefetch=lambda pid: pid != "3")
+    for child in client.get_child_pages("root"):
+        # The traversal skips child 1, as if it had been visited already.
+        if child["id"] != "1":
+            client.get_page_content(child["id"])
+    assert client._prefetched == {}
+    fetched = [call.args[0] for call in inner.get_page_content.call_args_list]
+    # Child 3 was fetched when it was visited; the others, unless cancelled, by the prefetch.
+    assert len(fetched) == len(set(fetched))
+    assert {"0", "2", "3", "4", "5"} <= set(fetched)
+    client.close()
+
+
+def test_depth_first_descent_keeps_the_read_ahead_of_outer_listings(mocker):
+    """Test that descending into nested listings does not drop the prefetches of their siblings."""
+    inner = mocker.Mock()
+    inner.get_page_content.side_effect = lambda pid: {"id": pid}
+    inner.get_child_pages.side_effect = lambda pid: [{"id": f"{pid}.{i}"} for i in range(3)] if len(pid) < 9 else []
+    client = PrefetchingClient(inner, workers=2)
+
+    def visit(pid):
+        client.get_page_content(pid)
+        for child in client.get_child_pages(pid):
+            visit(child["id"])
+
+    visit("r")
+    # Each page was fetched once: all but the root from its prefetched copy.
+    fetched = [call.args[0] for call in inner.get_page_content.call_args_list]
+    assert len(fetched) == len(set(fetched)) == 1 + 3 + 9 + 27 + 81
+    assert client._prefetched == {}
+    client.close()
+
+
+def test_children_read_ahead_are_yielded_before_a_listing_error(mocker):
+    """Test that children already listed are not lost when the listing fails part way."""
+
+    def get_child_pages(pid):
+        yield {"id": "2"}
+        yield {"id": "3"}
+        raise RuntimeError("Failed to fetch child pages: 500")
+
+    inner = mocker.Mock()
+    inner.get_page_content.side_effect = lambda pid: {"id": pid}
+    inner.get_child_pages.side_effect = get_child_pages
+    client = PrefetchingClient(inner, workers=4)
+    seen = []
+    with pytest.raises(RuntimeError):
+        for child in client.get_child_pages("1"):
+            seen.append(child["id"])
+    assert seen == ["2", "3"]
+    client.close()
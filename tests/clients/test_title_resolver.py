@@ -0,0 +1,56 @@
+"""Unit tests for batched page title resolution."""
+
+import json
+
+from markdown_maker.clients.title_resolver import TitleResolver
+
+
+def test_resolve_batches_and_caches_lookups(mocker):
+    """Test that titles are looked up in batches and never searched twice."""
+    client = mocker.Mock()
+    client.find_page_ids_by_title.side_effect = lambda refs: {ref: f"id-{ref[1]}" for ref in refs if ref[1] != "Gone"}
+    resolver = TitleResolver(client, batch_size=2)
+    refs = [("DOC", "A"), ("DOC", "B"), ("DOC", "C"), ("DOC", "Gone"), ("DOC", "A")]
+
+    assert resolver.resolve(refs) == {("DOC", "A"): "id-A", ("DOC", "B"): "id-B", ("DOC", "C"): "id-C"}
+    assert [len(call.args[0]) for call in client.find_page_ids_by_title.call_args_list] == [2, 2]
+
+    client.find_page_ids_by_title.reset_mock()
+    assert resolver.resolve([("DOC", "B"), ("DOC", "Gone")]) == {("DOC", "B"): "id-B"}
+    client.find_page_ids_by_title.assert_not_called()
+
+
+def test_resolver_persists_resolved_titles(tmp_path, mocker):
+    """Test that resolved titles are saved and reused by a later resolver without API calls."""
+    cache_path = tmp_path / "cache" / "titles.json"
+    client = mocker.Mock()
+    client.find_page_ids_by_title.return_value = {("DOC", "A"): "1"}
+    resolver = TitleResolver(client, str(cache_path))
+    resolver.resolve([("DOC", "A"), ("DOC", "Missing")])
+    resolver.save()
+    assert json.loads(cache_path.read_text(encoding="utf-8")) == [["DOC", "A", "1"]]
+
+    fresh_client = mocker.Mock()
+    assert TitleResolver(fresh_client, str(cache_path)).resolve([("DOC", "A")]) == {("DOC", "A"): "1"}
+    fresh_client.find_page_ids_by_title.assert_not_called()
+
+
+def test_resolvers_sharing_a_cache_file_merge_their_titles(tmp_path, mocker):
+    """Test that a resolver saving after another keeps the titles the other one saved."""
+    cache_path = str(tmp_path / "titles.json")
+    client = mocker.Mock()
+    client.find_page_ids_by_title.side_effect = lambda refs: {ref: ref[1].lower() for ref in refs}
+    first = TitleResolver(client, cache_path)
+    second = TitleResolver(client, cache_path)
+    first.resolve([("DOC", "A")])
+    second.resolve([("DOC", "B")])
+    first.save()
+    second.save()
+    assert json.loads((tmp_path / "titles.json").read_text(encoding="utf-8")) == [["DOC", "A", "a"], ["DOC", "B", "b"]]
+
+
+def test_resolver_skips_failed_batches(mocker):
+    """Test that a failed search leaves those titles unresolved instead of raising."""
+    client = mocker.Mock()
+    client.find_page_ids_by_title.side_effect = RuntimeError("Failed to resolve page titles")
+    assert TitleResolver(client).resolve([("DOC", "A")]) == {}
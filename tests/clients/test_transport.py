@@ -0,0 +1,117 @@
+"""Unit tests for the configurable HTTP transport, against a local stub server."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+
+from markdown_maker.clients.transport import PooledHTTPAdapter, build_session
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with StubHandler.lock:
+            StubHandler.connections += 1
+
+    def do_GET(self):
+        if self.path == "/slow":
+            time.sleep(0.5)
+        body = self.headers.get("Accept-Encoding", "").encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except BrokenPipeError:
+            # The client of a slow request has timed out.
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_url():
+    StubHandler.connections = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+def test_pool_is_sized_to_workers_and_connections_are_reused(stub_url):
+    """Test that concurrent workers reuse one kept-alive connection each instead of discarding them."""
+    session = build_session({}, workers=16)
+
+    def fetch(_: int) -> int:
+        status = session.get(stub_url).status_code
+        # Work between requests leaves more than urllib3's default of 10 connections idle.
+        time.sleep(0.005)
+        return status
+
+    with ThreadPoolExecutor(16) as pool:
+        statuses = list(pool.map(fetch, range(320)))
+    assert statuses == [200] * 320
+    assert StubHandler.connections <= 16
+
+
+def test_timeouts_and_compression_come_from_config(stub_url, mocker):
+    """Test that configured timeouts replace the per-request timeout and compression can be turned off."""
+    session = build_session({"http_connect_timeout": 3, "http_read_timeout": 30, "http_compression": False})
+    adapter = session.get_adapter(stub_url)
+    assert isinstance(adapter, PooledHTTPAdapter)
+    send = mocker.spy(HTTPAdapter, "send")
+    assert session.get(stub_url, timeout=75).text == "identity"
+    assert send.call_args.kwargs["timeout"] == (3.0, 30.0)
+    assert "gzip" in build_session({}).get(stub_url).text
+
+
+def test_unknown_transport_is_rejected():
+    """Test that a misspelled transport name is reported."""
+    with pytest.raises(ValueError, match="Unknown http_transport 'urllib'"):
+        build_session({"http_transport": "urllib"})
+
+
+def test_httpx_transport_sends_requests(stub_url):
+    """Test that the httpx transport returns requests responses, where httpx is installed."""
+    pytest.importorskip("httpx")
+    pytest.importorskip("h2")
+    session = build_session({"http_transport": "httpx", "http_compression": False})
+    response = session.get(stub_url)
+    assert response.status_code == 200
+    assert response.text == "identity"
+
+
+def test_httpx_transport_honours_request_settings(stub_url):
+    """Test that the httpx transport streams bodies and applies the TLS and proxy settings of each request."""
+    pytest.importorskip("httpx")
+    pytest.importorskip("h2")
+    session = build_session({"http_transport": "httpx", "http_compression": False})
+    response = session.get(stub_url, stream=True)
+    assert b"".join(response.iter_content(3)) == b"identity"
+    assert session.get(stub_url, verify=False).text == "identity"
+    # The stub server answers as the proxy for a host that does not resolve.
+    assert session.get("http://confluence.invalid/", proxies={"http": stub_url}).text == "identity"
+    assert len(session.get_adapter(stub_url)._clients) == 3
+
+
+def test_httpx_transport_raises_requests_exceptions(stub_url):
+    """Test that httpx connection errors and timeouts surface as requests exceptions."""
+    pytest.importorskip("httpx")
+    pytest.importorskip("h2")
+    session = build_session({"http_transport": "httpx", "http_read_timeout": 0.1})
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        session.get(stub_url + "slow")
+    with pytest.raises(requests.exceptions.ConnectionError):
+        session.get("http://127.0.0.1:9/")
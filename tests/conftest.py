@@ -0,0 +1,36 @@
+"""Shared fixtures for the CLI tests."""
+
+from collections.abc import Callable
+
+import pytest
+
+
+@pytest.fixture
+def mock_tree(mocker) -> Callable:
+    """Serve a page tree through the ConfluenceClient methods a recursive export calls.
+
+    Returns:
+        A function taking the pages by ID, as ``get_page_content`` returns
+        them, and the child IDs of each page. It returns the
+        ``get_page_content`` mock.
+    """
+
+    def serve(pages: dict[str, dict], children: dict[str, list[str]] | None = None):
+        children = children or {}
+        get_page_content = mocker.patch(
+            "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_content",
+            side_effect=lambda page_id: pages[page_id],
+        )
+        mocker.patch(
+            "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_metadata",
+            side_effect=lambda page_id: pages[page_id],
+        )
+        mocker.patch(
+            "markdown_maker.clients.confluence_client.ConfluenceClient.get_child_pages",
+            side_effect=lambda page_id: [
+                {"id": child_id, "title": pages[child_id]["title"]} for child_id in children.get(page_id, [])
+            ],
+        )
+        return get_page_content
+
+    return serve
@@ -0,0 +1,36 @@
+"""Unit tests for the content-addressed conversion cache."""
+
+from markdown_maker.converters import html_to_markdown
+from markdown_maker.converters.cache import ConversionCache
+
+
+def test_cache_converts_once_per_distinct_html(tmp_path, mocker):
+    """Test that repeated HTML is served from disk without reconverting."""
+    spy = mocker.spy(html_to_markdown, "convert_html_to_markdown")
+    cache = ConversionCache(str(tmp_path))
+    first = cache.convert("<h1>Title</h1>")
+    # A fresh instance proves the hit comes from disk rather than memory.
+    second = ConversionCache(str(tmp_path)).convert("<h1>Title</h1>")
+    assert first == second
+    assert "# Title" in first
+    assert spy.call_count == 1
+    cache.convert("<h1>Other</h1>")
+    assert spy.call_count == 2
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_cache_key_includes_converter_options(tmp_path, mocker):
+    """Test that changing the converter options invalidates cached conversions."""
+    ConversionCache(str(tmp_path)).convert("<h1>Title</h1>")
+    mocker.patch.dict(html_to_markdown.MARKDOWNIFY_OPTIONS, {"heading_style": "UNDERLINED"})
+    cache = ConversionCache(str(tmp_path))
+    markdown = cache.convert("<h1>Title</h1>")
+    assert cache.misses == 1
+    assert "=====" in markdown
+
+
+def test_cache_preserves_exact_markdown(tmp_path, mocker):
+    """Test that cached Markdown round-trips byte for byte, including carriage returns."""
+    mocker.patch.object(html_to_markdown, "convert_html_to_markdown", return_value="line\r\nnext\n")
+    ConversionCache(str(tmp_path)).convert("<p>x</p>")
+    assert ConversionCache(str(tmp_path)).convert("<p>x</p>") == "line\r\nnext\n"
@@ -0,0 +1,144 @@
+"""Unit tests for the native Confluence storage-format converter."""
+
+import pytest
+
+from markdown_maker.converters.engines import get_converter
+from markdown_maker.converters.html_to_markdown import convert_html_to_markdown
+from markdown_maker.converters.storage_format import convert_storage_to_markdown
+
+
+@pytest.mark.parametrize(
+    "html,expected_md",
+    [
+        ("<h1>Title</h1>", "# Title\n"),
+        ("<h3>Sub <em>title</em></h3>", "### Sub *title*\n"),
+        ("<p>Mix <strong>bold</strong> and <em>italic</em></p>", "Mix **bold** and *italic*\n"),
+        ("<p>a * b</p>", "a \\* b\n"),
+        ("<ul><li>Item 1</li><li>Item 2<ul><li>Sub</li></ul></li></ul>", "- Item 1\n- Item 2\n  - Sub\n"),
+        ("<ol><li>First</li><li>Second</li></ol>", "1. First\n2. Second\n"),
+        ("<pre>x = 1\ny = 2</pre>", "```\nx = 1\ny = 2\n```\n"),
+        ("<p>Use <code>a`b</code></p>", "Use ``a`b``\n"),
+        ('<p><a href="https://example.com">site</a></p>', "[site](https://example.com)\n"),
+        ("<blockquote><p>one</p><p>two</p></blockquote>", "> one\n>\n> two\n"),
+        (
+            "<table><tbody><tr><th>A</th><th>B</th></tr><tr><td>1|2</td><td><p>3</p></td></tr></tbody></table>",
+            "| A | B |\n| --- | --- |\n| 1\\|2 | 3 |\n",
+        ),
+        ("<pre>x\n\n\ny</pre>", "```\nx\n\n\ny\n```\n"),
+        ("<ul><li>a<div><pre>x\n\ny</pre></div></li></ul>", "- a\n  ```\n  x\n\n  y\n  ```\n"),
+        ("<ul><li><p>a</p>\n<p>b</p></li><li></li></ul>", "- a\n\n  b\n-\n"),
+        ("<p>a</p><blockquote> </blockquote><p>b</p>", "a\n\nb\n"),
+    ],
+)
+def test_convert_storage_html_elements(html, expected_md):
+    """Test conversion of plain XHTML elements."""
+    assert convert_storage_to_markdown(html) == expected_md
+
+
+@pytest.mark.parametrize(
+    "html,expected_md",
+    [
+        (
+            '<ac:structured-macro ac:name="code"><ac:parameter ac:name="language">python</ac:parameter>'
+            '<ac:plain-text-body><![CDATA[if a < b:\n    print("<b>")]]></ac:plain-text-body></ac:structured-macro>',
+            '```python\nif a < b:\n    print("<b>")\n```\n',
+        ),
+        (
+            '<p>See <ac:link><ri:page ri:content-title="Other Page" ri:space-key="DOC"/>'
+            "<ac:plain-text-link-body><![CDATA[the docs]]></ac:plain-text-link-body></ac:link></p>",
+            "See [the docs](/wiki/display/DOC/Other+Page)\n",
+        ),
+        ('<p><ac:link><ri:page ri:content-title="Same Space"/></ac:link></p>', "Same Space\n"),
+        (
+            '<ac:image><ri:url ri:value="https://example.com/a.png"/></ac:image>',
+            "![](https://example.com/a.png)\n",
+        ),
+        (
+            "<ac:task-list><ac:task><ac:task-id>1</ac:task-id><ac:task-status>complete</ac:task-status>"
+            "<ac:task-body>Ship it</ac:task-body></ac:task><ac:task><ac:task-id>2</ac:task-id>"
+            "<ac:task-status>incomplete</ac:task-status><ac:task-body>Review</ac:task-body></ac:task></ac:task-list>",
+            "- [x] Ship it\n- [ ] Review\n",
+        ),
+        (
+            '<ac:structured-macro ac:name="warning"><ac:parameter ac:name="title">Careful</ac:parameter>'
+            "<ac:rich-text-body><p>Hot</p></ac:rich-text-body></ac:structured-macro>",
+            "> **Warning: Careful** Hot\n",
+        ),
+        (
+            '<ac:structured-macro ac:name="toc"><ac:parameter ac:name="maxLevel">2</ac:parameter>'
+            "</ac:structured-macro>",
+            "",
+        ),
+        (
+            '<ac:structured-macro ac:name="unknown-macro"><ac:rich-text-body><p>Body</p></ac:rich-text-body>'
+            "</ac:structured-macro>",
+            "Body\n",
+        ),
+    ],
+)
+def test_convert_storage_confluence_elements(html, expected_md):
+    """Test conversion of the ac:/ri: storage-format vocabulary."""
+    assert convert_storage_to_markdown(html) == expected_md
+
+
+def test_storage_engine_keeps_content_markdownify_drops():
+    """Test that links and task state survive the storage engine but not markdownify."""
+    html = (
+        '<p><ac:link><ri:page ri:content-title="Target" ri:space-key="DOC"/></ac:link></p>'
+        '<ac:image><ri:attachment ri:filename="pic.png"/></ac:image>'
+        "<ac:task-list><ac:task><ac:task-status>complete</ac:task-status><ac:task-body>Done</ac:task-body>"
+        "</ac:task></ac:task-list>"
+    )
+    generic = convert_html_to_markdown(html)
+    native = convert_storage_to_markdown(html)
+    for fragment in ["](/wiki/display/DOC/Target)", "- [x] Done"]:
+        assert fragment not in generic
+        assert fragment in native
+    # markdownify renders attachment images only when the attachments are downloaded.
+    assert "pic.png" not in generic
+    assert "![pic.png](pic.png)" in convert_html_to_markdown(html, local_attachments=True)
+    assert "pic.png" not in native
+    assert "![pic.png](pic.png)" in convert_storage_to_markdown(html, local_attachments=True)
+
+
+@pytest.mark.parametrize(
+    "html,expected_md,expected_local_md",
+    [
+        (
+            '<ac:image ac:alt="diagram"><ri:attachment ri:filename="arch diagram.png"/></ac:image>',
+            "",
+            "![diagram](arch%20diagram.png)\n",
+        ),
+        (
+            '<p><ac:image><ri:attachment ri:filename="a/b.png"/></ac:image></p>',
+            "",
+            "![a/b.png](a_b.png)\n",
+        ),
+        (
+            '<p><ac:link><ri:attachment ri:filename="index.md"/><ac:plain-text-link-body><![CDATA[notes]]>'
+            "</ac:plain-text-link-body></ac:link></p>",
+            "notes\n",
+            "[notes](_index.md)\n",
+        ),
+    ],
+)
+def test_storage_engine_links_attachments_only_when_downloaded(html, expected_md, expected_local_md):
+    """Test that attachments are linked under their downloaded names, and only when they are downloaded."""
+    assert convert_storage_to_markdown(html) == expected_md
+    assert convert_storage_to_markdown(html, local_attachments=True) == expected_local_md
+    assert get_converter("storage", local_attachments=True)(html, space_key="DOC") == expected_local_md
+
+
+def test_storage_engine_links_pages_in_the_page_space():
+    """Test that page links without a space key point into the space of the page being converted."""
+    html = '<p><ac:link><ri:page ri:content-title="Same Space"/></ac:link></p>'
+    assert convert_storage_to_markdown(html, space_key="DOC") == "[Same Space](/wiki/display/DOC/Same+Space)\n"
+    assert get_converter("storage")(html, space_key="DOC") == "[Same Space](/wiki/display/DOC/Same+Space)\n"
+    assert get_converter("markdownify")(html, space_key="DOC") == convert_html_to_markdown(html)
+
+
+def test_get_converter_rejects_unknown_engine():
+    """Test that an unknown engine name raises ValueError."""
+    assert get_converter("storage") is convert_storage_to_markdown
+    with pytest.raises(ValueError, match="Unknown converter engine"):
+        get_converter("pandoc")
@@ -0,0 +1,85 @@
+"""Unit tests for the table fast path of the markdownify converter."""
+
+import itertools
+
+import pytest
+from bs4 import BeautifulSoup
+from markdownify import MarkdownConverter, markdownify
+
+from markdown_maker.converters.html_to_markdown import MARKDOWNIFY_OPTIONS, convert_html_to_markdown
+from markdown_maker.converters.tables import render_simple_table
+
+
+@pytest.mark.parametrize(
+    "html",
+    [
+        "<table><tr><th>A</th><th>B</th></tr><tr><td>1 * 2</td><td>x_y</td></tr></table>",
+        "<p>intro</p><table><tbody><tr><td>no header</td><td> a \n b </td></tr>"
+        "<tr><td></td><td><strong>bold</strong> <a href='http://x'>link</a></td></tr></tbody></table><p>after</p>",
+        "<table><thead><tr><th>H1</th><th>H2</th></tr></thead>"
+        "<tbody><tr><td>a</td><td><p>para</p><p>two</p></td></tr></tbody></table>",
+        "<div><table>\n<tbody>\n<tr>\n<th>A</th>\n<th>B</th>\n</tr>\n<tr>\n<td><code>c*d</code></td>\n"
+        "<td>e<br/>f</td>\n</tr>\n</tbody>\n</table></div>",
+        "<table><thead><tr><td>a</td></tr><tr><td>b</td></tr></thead><tbody><tr><td>c</td></tr></tbody></table>",
+        "<table><tbody><tr><td>a</td></tr></tbody><tbody><tr><td>b</td></tr></tbody></table>",
+        "<table><tr><td>&lt;tag&gt; &amp; | pipe</td><td>\xa0nbsp\xa0</td></tr></table>",
+        "text before<table><tr><td>x</td></tr></table>text after",
+        "<table><!-- note --><tr><td>a<!-- note --></td></tr></table>",
+        # Not simple: left to markdownify.
+        "<table><tr><td colspan='2'>merged</td></tr><tr><td>a</td><td>b</td></tr></table>",
+        "<ul><li>x<table><tr><td>in list</td></tr></table></li></ul>",
+        "<table><caption>Caption</caption><tr><td>a</td></tr></table>",
+        "<table><tr><td><table><tr><td>nested</td></tr></table></td></tr></table>",
+    ],
+)
+def test_output_matches_markdownify(html):
+    """Test that the fast path renders tables exactly like markdownify."""
+    assert convert_html_to_markdown(html) == markdownify(html, **MARKDOWNIFY_OPTIONS)
+
+
+def test_large_table_matches_markdownify():
+    """Test a table with thousands of rows, plain and with markup, against markdownify."""
+    rows = "".join(f"<tr><td>KEY-{r}</td><td><em>Open</em> {r}</td><td>note {r}</td></tr>" for r in range(2000))
+    html = f"<h1>Issues</h1><table><tbody><tr><th>Key</th><th>Status</th><th>Notes</th></tr>{rows}</tbody></table>"
+    assert convert_html_to_markdown(html) == markdownify(html, **MARKDOWNIFY_OPTIONS)
+
+
+_CELLS = [
+    "",
+    "plain",
+    " padded \n text ",
+    "a*b_c`d",
+    "<strong>bold</strong>",
+    "<code>x|y</code>",
+    "<a href='http://x'>link</a>",
+    "line<br/>break",
+    "<p>para</p><p>two</p>",
+    "<ul><li>item</li></ul>",
+    "<img src='a.png' alt='img'/>",
+]
+
+
+@pytest.mark.parametrize("header", ["th", "td"])
+@pytest.mark.parametrize("group", ["", "tbody", "thead"])
+def test_generated_tables_match_markdownify(header, group):
+    """Test every pair of cell contents against markdownify, with and without header rows and row groups."""
+    rows = [f"<tr><{header}>H1</{header}><{header}>H2</{header}></tr>"]
+    rows += [f"<tr><td>{a}</td><td>{b}</td></tr>" for a, b in itertools.product(_CELLS, repeat=2)]
+    body = "".join(rows)
+    html = f"<table><{group}>{body}</{group}></table>" if group else f"<table>{body}</table>"
+    assert convert_html_to_markdown(html) == markdownify(html, **MARKDOWNIFY_OPTIONS)
+
+
+@pytest.mark.parametrize(
+    "html",
+    [
+        "<table><tr><td rowspan='2'>a</td><td>b</td></tr><tr><td>c</td></tr></table>",
+        "<table><tr><td colspan='2'>a</td></tr></table>",
+        "<table><caption>c</caption><tr><td>a</td></tr></table>",
+        "<table><tr><td><table><tr><td>a</td></tr></table></td></tr></table>",
+    ],
+)
+def test_complex_tables_take_the_general_path(html):
+    """Test that merged cells, captions and nested tables are not rendered by the fast path."""
+    table = BeautifulSoup(html, "html.parser").find("table")
+    assert render_simple_table(table, MarkdownConverter(**MARKDOWNIFY_OPTIONS)) is None
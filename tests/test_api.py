@@ -0,0 +1,59 @@
+"""Unit tests for the iter_pages library API."""
+
+import markdown_maker
+from markdown_maker import iter_pages
+
+
+def _client(mocker, fetched):
+    children = {"1": ["2", "3"], "2": ["4"]}
+
+    def get_page_content(pid):
+        fetched.append(pid)
+        return {"title": f"Page {pid}", "version": {"number": 1}, "body": {"storage": {"value": f"<h1>P{pid}</h1>"}}}
+
+    client = mocker.Mock()
+    client.get_page_content.side_effect = get_page_content
+    client.get_child_pages.side_effect = lambda pid: [{"id": c, "title": f"Page {c}"} for c in children.get(pid, [])]
+    return client
+
+
+def test_iter_pages_yields_records_lazily(tmp_path, mocker, monkeypatch):
+    """Test that records are yielded as pages are converted, without writing files."""
+    monkeypatch.chdir(tmp_path)
+    fetched = []
+    pages = iter_pages("https://x/wiki/pages/viewpage.action?pageId=1", max_depth=3, client=_client(mocker, fetched))
+
+    first = next(pages)
+    assert first == {
+        "id": "1",
+        "title": "Page 1",
+        "url": "https://company.atlassian.net/wiki/pages/viewpage.action?pageId=1",
+        "version": 1,
+        "depth": 1,
+        "parent_id": None,
+        "link_type": "root",
+        "ancestors": [],
+        "links": [],
+        "markdown": "# P1",
+    }
+    assert fetched == ["1"]
+    rest = list(pages)
+    assert [(r["id"], r["depth"], r["parent_id"]) for r in rest] == [("2", 2, "1"), ("4", 3, "2"), ("3", 2, "1")]
+    assert list(tmp_path.iterdir()) == []
+    assert markdown_maker.__all__ == ["iter_pages"]
+
+
+def test_iter_pages_with_workers_prefetches_children(mocker):
+    """Test that several workers produce the same records, fetching each page once."""
+    fetched = []
+    records = list(iter_pages("1", max_depth=3, workers=3, engine="storage", client=_client(mocker, fetched)))
+    assert [r["id"] for r in records] == ["1", "2", "4", "3"]
+    assert sorted(fetched) == ["1", "2", "3", "4"]
+
+
+def test_iter_pages_fetches_ancestors_by_default(mocker):
+    """Test that the default client fetches pages with their ancestors, which the records carry."""
+    fetched = []
+    client_class = mocker.patch("markdown_maker.api.ConfluenceClient", return_value=_client(mocker, fetched))
+    assert len(list(iter_pages("1", max_depth=1))) == 1
+    client_class.assert_called_once_with(1, content_profile="record")
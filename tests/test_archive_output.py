@@ -0,0 +1,69 @@
+"""Unit tests for the --archive CLI option: recursive output streamed into zip/tar archives."""
+
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from markdown_maker.main import cli
+from markdown_maker.utils.archive import PageArchive
+
+PAGES = {
+    "42": {"title": "Parent Page", "body": {"storage": {"value": "<h1>Parent</h1>"}}},
+    "1234": {"title": "Child One", "body": {"storage": {"value": "<h2>Child 1</h2>"}}},
+}
+CHILDREN = {"42": ["1234"]}
+
+
+def _read_members(archive_path: Path) -> dict[str, str]:
+    if archive_path.suffix == ".zip":
+        with zipfile.ZipFile(archive_path) as zf:
+            return {name: zf.read(name).decode("utf-8") for name in zf.namelist()}
+    with tarfile.open(archive_path) as tf:
+        return {m.name: tf.extractfile(m).read().decode("utf-8") for m in tf.getmembers()}
+
+
+@pytest.mark.parametrize("archive_name", ["export.zip", "export.tar", "export.tar.gz"])
+def test_archive_contains_multi_file_layout(tmp_path: Path, mock_tree, archive_name):
+    """Test that --archive writes the same relative paths as the multi-file layout."""
+    mock_tree(PAGES, CHILDREN)
+    valid_url = "https://company.atlassian.net/wiki/pages/viewpage.action?pageId=42"
+    archive_path = tmp_path / archive_name
+    runner = CliRunner()
+    result = runner.invoke(
+        cli,
+        ["convert", "--url", valid_url, "--output-dir", str(tmp_path), "--recursive", "--archive", str(archive_path)],
+    )
+    assert result.exit_code == 0
+    assert f"Saved: {archive_path}" in result.output
+    members = _read_members(archive_path)
+    assert set(members) == {"parent_page/index.md", "parent_page/child_one/index.md"}
+    assert "# Parent" in members["parent_page/index.md"]
+    assert "## Child 1" in members["parent_page/child_one/index.md"]
+    assert not (tmp_path / "parent_page").exists()
+
+
+def test_archive_rejects_single_file(tmp_path: Path):
+    """Test that --archive and --single-file are mutually exclusive."""
+    runner = CliRunner()
+    result = runner.invoke(
+        cli,
+        [
+            "convert",
+            "--url",
+            "https://company.atlassian.net/wiki/pages/viewpage.action?pageId=42",
+            "--single-file",
+            "--archive",
+            str(tmp_path / "export.zip"),
+        ],
+    )
+    assert result.exit_code != 0
+    assert "--archive cannot be combined with --single-file" in result.output
+
+
+def test_page_archive_rejects_unknown_extension(tmp_path: Path):
+    """Test that PageArchive only accepts zip and tar extensions."""
+    with pytest.raises(ValueError, match="Unsupported archive format"):
+        PageArchive(str(tmp_path / "export.rar"))
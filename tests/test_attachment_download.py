@@ -0,0 +1,67 @@
+"""Unit tests for the --download-attachments CLI option."""
+
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from markdown_maker.main import cli
+
+
+def test_recursive_export_downloads_attachments_next_to_pages(tmp_path: Path, mocker, mock_tree):
+    """Test that attachments land in each page directory and images point at them."""
+    image = '<ac:image><ri:attachment ri:filename="arch.png"/></ac:image>'
+    pages = {
+        "42": {
+            "title": "Parent Page",
+            "body": {"storage": {"value": f"<p>Diagram</p>{image}"}},
+        },
+        "1234": {"title": "Child One", "body": {"storage": {"value": "<h2>Child 1</h2>"}}},
+    }
+    mock_tree(pages, {"42": ["1234"]})
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_attachments",
+        side_effect=lambda page_id: (
+            [{"id": "a1", "title": "arch.png", "version": 1, "download": "/download/attachments/42/arch.png"}]
+            if page_id == "42"
+            else []
+        ),
+    )
+    download = mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.download_attachment",
+        return_value=(b"\x89PNG", '"etag"'),
+    )
+    valid_url = "https://company.atlassian.net/wiki/pages/viewpage.action?pageId=42"
+    result = CliRunner().invoke(
+        cli, ["convert", "--url", valid_url, "--output-dir", str(tmp_path), "--recursive", "--download-attachments"]
+    )
+    assert result.exit_code == 0, result.output
+    assert (tmp_path / "parent_page" / "arch.png").read_bytes() == b"\x89PNG"
+    assert "![arch.png](arch.png)" in (tmp_path / "parent_page" / "index.md").read_text(encoding="utf-8")
+    download.assert_called_once_with("/download/attachments/42/arch.png", None)
+
+
+def test_attachment_images_are_dropped_without_downloading(tmp_path: Path, mocker):
+    """Test that attachment images do not become broken local links when nothing is downloaded."""
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_content",
+        return_value={
+            "title": "Parent Page",
+            "body": {
+                "storage": {"value": '<p>Diagram</p><ac:image><ri:attachment ri:filename="arch.png"/></ac:image>'}
+            },
+        },
+    )
+    valid_url = "https://company.atlassian.net/wiki/pages/viewpage.action?pageId=42"
+    result = CliRunner().invoke(cli, ["convert", "--url", valid_url, "--output-dir", str(tmp_path)])
+    assert result.exit_code == 0, result.output
+    assert "arch.png" not in (tmp_path / "parent_page.md").read_text(encoding="utf-8")
+
+
+def test_download_attachments_rejects_single_file(tmp_path: Path):
+    """Test that --download-attachments requires directory output."""
+    valid_url = "https://company.atlassian.net/wiki/pages/viewpage.action?pageId=42"
+    result = CliRunner().invoke(
+        cli, ["convert", "--url", valid_url, "--output-dir", str(tmp_path), "--single-file", "--download-attachments"]
+    )
+    assert result.exit_code != 0
+    assert "--download-attachments requires directory output" in result.output
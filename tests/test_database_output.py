@@ -0,0 +1,54 @@
+"""Unit tests for the --database CLI option: recursive output written into SQLite."""
+
+import sqlite3
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from markdown_maker.main import cli
+
+VALID_URL = "https://company.atlassian.net/wiki/pages/viewpage.action?pageId=42"
+
+
+LINK = '<a href="https://company.atlassian.net/wiki/pages/viewpage.action?pageId=7">guide</a>'
+PAGES = {
+    "42": {"title": "Parent Page", "body": {"storage": {"value": f"<h1>Parent</h1>{LINK}"}}},
+    "1234": {"title": "Child One", "body": {"storage": {"value": "<h2>Child 1</h2>"}}},
+    "7": {"title": "Guide", "body": {"storage": {"value": "<p>Rotate the credentials.</p>"}}},
+}
+CHILDREN = {"42": ["1234"]}
+
+
+def test_database_holds_pages_edges_and_index(tmp_path: Path, mock_tree):
+    """Test that --database writes the export into one searchable database instead of files."""
+    mock_tree(PAGES, CHILDREN)
+    database = tmp_path / "export.db"
+    result = CliRunner().invoke(
+        cli, ["convert", "--url", VALID_URL, "--output-dir", str(tmp_path), "--database", str(database)]
+    )
+    assert result.exit_code == 0, result.output
+    assert f"Saved: {database}" in result.output
+    assert not (tmp_path / "parent_page").exists()
+
+    db = sqlite3.connect(database)
+    assert db.execute("SELECT id, path FROM pages ORDER BY seq").fetchall() == [
+        ("42", "parent_page"),
+        ("1234", "parent_page/child_one"),
+        ("7", "parent_page/guide"),
+    ]
+    assert db.execute("SELECT * FROM children").fetchall() == [("42", "1234")]
+    assert db.execute("SELECT * FROM links").fetchall() == [("42", "7")]
+    hits = db.execute(
+        "SELECT pages.id FROM pages_fts JOIN pages ON pages.seq = pages_fts.rowid WHERE pages_fts MATCH 'credentials'"
+    ).fetchall()
+    assert hits == [("7",)]
+
+
+def test_database_rejects_archive(tmp_path: Path):
+    """Test that --database and --archive are mutually exclusive."""
+    result = CliRunner().invoke(
+        cli,
+        ["convert", "--url", VALID_URL, "--database", "x.db", "--archive", str(tmp_path / "x.zip")],
+    )
+    assert result.exit_code != 0
+    assert "--database cannot be combined" in result.output
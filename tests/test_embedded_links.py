@@ -58,6 +58,10 @@ def test_embedded_links_are_recursively_converted(
         "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_content",
         side_effect=get_page_content_side_effect,
     )
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_metadata",
+        side_effect=get_page_content_side_effect,
+    )
     mocker.patch(
         "markdown_maker.converters.html_to_markdown.convert_html_to_markdown",
         side_effect=lambda html: html.replace("<h1>", "# ")
@@ -114,6 +118,10 @@ def test_embedded_links_respect_max_depth(tmp_path: Path, mocker, dummy_page_wit
         "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_content",
         side_effect=get_page_content_side_effect,
     )
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_metadata",
+        side_effect=get_page_content_side_effect,
+    )
     mocker.patch(
         "markdown_maker.converters.html_to_markdown.convert_html_to_markdown",
         side_effect=lambda html: html.replace("<h1>", "# ")
@@ -171,6 +179,10 @@ def test_embedded_links_skip_strikethrough(tmp_path: Path, mocker, embedded_page
         "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_content",
         side_effect=get_page_content_side_effect,
     )
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_metadata",
+        side_effect=get_page_content_side_effect,
+    )
     mocker.patch(
         "markdown_maker.converters.html_to_markdown.convert_html_to_markdown",
         side_effect=lambda html: (
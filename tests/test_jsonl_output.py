@@ -0,0 +1,83 @@
+"""Unit tests for the --format jsonl CLI option."""
+
+import json
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from markdown_maker.main import cli
+
+VALID_URL = "https://company.atlassian.net/wiki/pages/viewpage.action?pageId=42"
+
+
+PAGES = {
+    "42": {
+        "title": "Parent Page",
+        "body": {"storage": {"value": "<h1>Parent</h1>"}},
+        "version": {"number": 7},
+        "ancestors": [{"id": "1", "title": "Space Home", "_links": {}}],
+    },
+    "1234": {
+        "title": "Child One",
+        "body": {"storage": {"value": "<h2>Child 1</h2>"}},
+        "version": {"number": 2},
+        "ancestors": [{"id": "1", "title": "Space Home"}, {"id": "42", "title": "Parent Page"}],
+    },
+}
+CHILDREN = {"42": ["1234"]}
+
+
+def test_jsonl_writes_one_record_per_page(tmp_path: Path, mock_tree):
+    """Test that --format jsonl writes page metadata and Markdown to <title>.jsonl."""
+    mock_tree(PAGES, CHILDREN)
+    runner = CliRunner()
+    result = runner.invoke(cli, ["convert", "--url", VALID_URL, "--output-dir", str(tmp_path), "--format", "jsonl"])
+    assert result.exit_code == 0
+    jsonl_path = tmp_path / "parent_page.jsonl"
+    assert f"Saved: {jsonl_path}" in result.output
+    records = [json.loads(line) for line in jsonl_path.read_text(encoding="utf-8").splitlines()]
+    assert [r["id"] for r in records] == ["42", "1234"]
+    parent, child = records
+    assert parent["title"] == "Parent Page"
+    assert parent["url"] == VALID_URL
+    assert parent["version"] == 7
+    assert parent["depth"] == 1
+    assert parent["parent_id"] is None
+    assert parent["ancestors"] == [{"id": "1", "title": "Space Home"}]
+    assert "# Parent" in parent["markdown"]
+    assert child["depth"] == 2
+    assert child["parent_id"] == "42"
+    assert [a["id"] for a in child["ancestors"]] == ["1", "42"]
+    assert "## Child 1" in child["markdown"]
+    assert not (tmp_path / "parent_page").exists()
+
+
+def test_jsonl_to_stdout_keeps_summary_off_stdout(tmp_path: Path, mock_tree):
+    """Test that records stream to stdout and the run summary goes to stderr."""
+    mock_tree(PAGES, CHILDREN)
+    runner = CliRunner()
+    result = runner.invoke(
+        cli,
+        ["convert", "--url", VALID_URL, "--output-dir", str(tmp_path), "--format", "jsonl", "--jsonl-file", "-"],
+    )
+    assert result.exit_code == 0
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [r["title"] for r in records] == ["Parent Page", "Child One"]
+    assert f"URL: {VALID_URL}" in result.stderr
+
+
+@pytest.mark.parametrize("output_format, profile", [("jsonl", "record"), ("markdown", "conversion")])
+def test_only_jsonl_fetches_page_ancestors(tmp_path: Path, mocker, output_format, profile):
+    """Test that pages are fetched with ancestors only for JSONL records."""
+    get_page = mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_page",
+        return_value={"title": "Parent Page", "body": {"storage": {"value": "<p>x</p>"}}},
+    )
+    mocker.patch("markdown_maker.clients.confluence_client.ConfluenceClient.get_child_pages", return_value=[])
+    result = CliRunner().invoke(
+        cli, ["convert", "--url", VALID_URL, "--output-dir", str(tmp_path), "--recursive", "--format", output_format]
+    )
+    assert result.exit_code == 0, result.output
+    # The first fetch reads only the root's title, without its body, before the export starts.
+    assert [call.args[1] for call in get_page.call_args_list] == ["sync-check", profile]
@@ -0,0 +1,40 @@
+"""Unit tests for the --local-links CLI option."""
+
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from markdown_maker.main import cli
+
+
+def test_recursive_export_links_pages_locally(tmp_path: Path, mock_tree):
+    """Test that links between exported pages point at their local index.md files."""
+    child_url = "https://company.atlassian.net/wiki/pages/viewpage.action?pageId=1234"
+    parent_url = "https://company.atlassian.net/wiki/spaces/DOC/pages/42/Parent"
+    pages = {
+        "42": {"title": "Parent Page", "body": {"storage": {"value": f'<p>See <a href="{child_url}">child</a></p>'}}},
+        "1234": {
+            "title": "Child One",
+            "body": {"storage": {"value": f'<p>Back to <a href="{parent_url}">parent</a></p>'}},
+        },
+    }
+    mock_tree(pages, {"42": ["1234"]})
+    valid_url = "https://company.atlassian.net/wiki/pages/viewpage.action?pageId=42"
+    result = CliRunner().invoke(
+        cli, ["convert", "--url", valid_url, "--output-dir", str(tmp_path), "--recursive", "--local-links"]
+    )
+    assert result.exit_code == 0, result.output
+    parent_md = (tmp_path / "parent_page" / "index.md").read_text(encoding="utf-8")
+    child_md = (tmp_path / "parent_page" / "child_one" / "index.md").read_text(encoding="utf-8")
+    assert "[child](child_one/index.md)" in parent_md
+    assert "[parent](../index.md)" in child_md
+
+
+def test_local_links_rejects_single_file(tmp_path: Path):
+    """Test that --local-links requires directory output."""
+    valid_url = "https://company.atlassian.net/wiki/pages/viewpage.action?pageId=42"
+    result = CliRunner().invoke(
+        cli, ["convert", "--url", valid_url, "--output-dir", str(tmp_path), "--single-file", "--local-links"]
+    )
+    assert result.exit_code != 0
+    assert "--local-links cannot be combined" in result.output
@@ -19,6 +19,10 @@ def test_convert_command_prints_options(tmp_path: Path, mocker) -> None:
             "title": "Test Page",
         },
     )
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_metadata",
+        return_value={"title": "Test Page"},
+    )
     mocker.patch(
         "markdown_maker.main.traverse_and_write",
         autospec=True,
@@ -52,6 +56,10 @@ def test_convert_command_default_max_depth(tmp_path: Path, mocker) -> None:
             "title": "Test Page",
         },
     )
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_metadata",
+        return_value={"title": "Test Page"},
+    )
     traverse_patch = mocker.patch(
         "markdown_maker.main.traverse_and_write",
         autospec=True,
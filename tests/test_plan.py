@@ -0,0 +1,36 @@
+"""Unit tests for the convert --plan dry run."""
+
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from markdown_maker.main import cli
+
+
+def test_plan_reports_estimates_without_writing(tmp_path: Path, mocker):
+    """Test that --plan prints the estimate and writes no output."""
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_metadata",
+        return_value={"title": "Parent Page", "version": {"number": 3}},
+    )
+    get_page_content = mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_content",
+        return_value={"title": "Any", "body": {"storage": {"value": "x" * 2048}}},
+    )
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_child_pages",
+        side_effect=lambda page_id: [{"id": "1234", "title": "Child One"}] if page_id == "42" else [],
+    )
+    output_dir = tmp_path / "out"
+    valid_url = "https://company.atlassian.net/wiki/pages/viewpage.action?pageId=42"
+    result = CliRunner().invoke(cli, ["convert", "--url", valid_url, "--output-dir", str(output_dir), "--plan"])
+
+    assert result.exit_code == 0, result.output
+    assert "Plan for 'Parent Page' (max depth 3):" in result.output
+    assert "Pages: 2" in result.output
+    assert "Pages per depth: 1: 1, 2: 1" in result.output
+    assert "Average body size: 2.0 KiB" in result.output
+    assert "Estimated requests: 4" in result.output
+    assert "Estimated run time: 0:00:01 at 5 requests/s" in result.output
+    assert get_page_content.call_count == 2
+    assert not output_dir.exists()
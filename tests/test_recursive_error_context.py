@@ -1,9 +1,14 @@
 """Unit tests for error context in recursive conversion error handling."""
 
-from atlassian.errors import ApiError
+import json
+
+from atlassian.errors import ApiError, ApiPermissionError
 from click.testing import CliRunner
+from requests import HTTPError, Response
 
+from markdown_maker.clients.negative_cache import NEGATIVE_CACHE_FILENAME
 from markdown_maker.main import cli
+from markdown_maker.utils.journal import JOURNAL_FILENAME
 
 
 def test_error_context_for_child_page(mocker, tmp_path):
@@ -29,6 +34,10 @@ def test_error_context_for_child_page(mocker, tmp_path):
         "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_content",
         side_effect=get_page_content_side_effect,
     )
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_metadata",
+        side_effect=get_page_content_side_effect,
+    )
     mocker.patch(
         "markdown_maker.clients.confluence_client.ConfluenceClient.get_child_pages",
         return_value=[{"id": child_id, "title": child_title}],
@@ -87,6 +96,10 @@ def test_error_context_for_embedded_link(mocker, tmp_path):
         "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_content",
         side_effect=get_page_content_side_effect,
     )
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_metadata",
+        side_effect=get_page_content_side_effect,
+    )
     mocker.patch(
         "markdown_maker.clients.confluence_client.ConfluenceClient.get_child_pages",
         return_value=[],
@@ -144,6 +157,10 @@ def test_child_page_error_logs_and_continues(mocker, tmp_path):
         "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_content",
         side_effect=get_page_content_side_effect,
     )
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_metadata",
+        side_effect=get_page_content_side_effect,
+    )
     mocker.patch(
         "markdown_maker.clients.confluence_client.ConfluenceClient.get_child_pages",
         return_value=[{"id": child_id, "title": child_title}],
@@ -199,6 +216,10 @@ def test_embedded_link_error_logs_and_continues(mocker, tmp_path):
         "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_content",
         side_effect=get_page_content_side_effect,
     )
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_metadata",
+        side_effect=get_page_content_side_effect,
+    )
     mocker.patch(
         "markdown_maker.clients.confluence_client.ConfluenceClient.get_child_pages",
         return_value=[],
@@ -231,3 +252,68 @@ def test_embedded_link_error_logs_and_continues(mocker, tmp_path):
         in result.stderr
     )
     assert parent_index.read_text().strip() != ""
+
+
+def test_inaccessible_pages_are_cached_between_runs(mocker, tmp_path):
+    """Test that a restricted child page is not requested again by a later run with the same cache."""
+    parent_id = "42"
+    valid_url = f"https://company.atlassian.net/wiki/pages/viewpage.action?pageId={parent_id}"
+
+    def get_page_content_side_effect(page_id):
+        if page_id == parent_id:
+            return {"title": "Parent Page", "body": {"storage": {"value": "<h1>Parent</h1>"}}}
+        raise ApiPermissionError(f"Page with id {page_id} is restricted.")
+
+    get_page_content = mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_content",
+        side_effect=get_page_content_side_effect,
+    )
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_metadata",
+        side_effect=get_page_content_side_effect,
+    )
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_child_pages",
+        return_value=[{"id": "1234", "title": "Secret"}],
+    )
+    args = ["convert", "--url", valid_url, "--output-dir", str(tmp_path / "out"), "--recursive"]
+    args += ["--cache-dir", str(tmp_path / "cache")]
+    runner = CliRunner()
+    for _ in range(2):
+        result = runner.invoke(cli, args)
+        assert result.exit_code == 0, result.output
+        assert "Could not access child page 'Secret' (id 1234)" in result.stderr
+    assert [call.args[0] for call in get_page_content.call_args_list].count("1234") == 1
+    assert (tmp_path / "cache" / "inaccessible.json").exists()
+
+    result = runner.invoke(cli, [*args, "--negative-cache-ttl", "0"])
+    assert result.exit_code == 0, result.output
+    assert [call.args[0] for call in get_page_content.call_args_list].count("1234") == 2
+
+
+def test_expired_credentials_abort_the_run(mocker, tmp_path):
+    """Test that a 401 stops the export with its journal kept and nothing cached as inaccessible."""
+    valid_url = "https://company.atlassian.net/wiki/pages/viewpage.action?pageId=42"
+    unauthorized = Response()
+    unauthorized.status_code = 401
+
+    def get_page_by_id(page_id, expand=None):
+        if page_id == "42":
+            return {"title": "Parent Page", "body": {"storage": {"value": "<h1>Parent</h1>"}}}
+        raise HTTPError("401 Client Error: Unauthorized", response=unauthorized)
+
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.Confluence.get_page_by_id", side_effect=get_page_by_id, create=True
+    )
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_child_pages",
+        side_effect=lambda page_id: (
+            [{"id": "2", "title": "Two"}, {"id": "3", "title": "Three"}] if page_id == "42" else []
+        ),
+    )
+    args = ["convert", "--url", valid_url, "--output-dir", str(tmp_path / "out"), "--recursive"]
+    result = CliRunner().invoke(cli, [*args, "--cache-dir", str(tmp_path / "cache")])
+    assert isinstance(result.exception, HTTPError)
+    assert (tmp_path / "out" / JOURNAL_FILENAME).exists()
+    negative_cache = tmp_path / "cache" / NEGATIVE_CACHE_FILENAME
+    assert not negative_cache.exists() or json.loads(negative_cache.read_text(encoding="utf-8")) == []
@@ -18,6 +18,10 @@ def test_convert_command_recursive_flag_triggers_recursive_logic(tmp_path: Path,
             "body": {"storage": {"value": "<h1>Header</h1>"}},
         },
     )
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_metadata",
+        return_value={"title": "Recursive Test Page"},
+    )
     # Patch convert_html_to_markdown to avoid real conversion
     mocker.patch(
         "markdown_maker.converters.html_to_markdown.convert_html_to_markdown",
@@ -81,6 +85,10 @@ def test_recursive_respects_max_depth(tmp_path: Path, mocker):
             "body": {"storage": {"value": "<h1>Header</h1>"}},
         },
     )
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_metadata",
+        return_value={"title": "Recursive Test Page"},
+    )
     mocker.patch(
         "markdown_maker.converters.html_to_markdown.convert_html_to_markdown",
         return_value="# Header\n",
@@ -47,6 +47,10 @@ def test_recursive_creates_nested_directories(tmp_path: Path, mocker, dummy_page
         "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_content",
         side_effect=get_page_content_side_effect,
     )
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_metadata",
+        side_effect=get_page_content_side_effect,
+    )
     mocker.patch(
         "markdown_maker.converters.html_to_markdown.convert_html_to_markdown",
         side_effect=lambda html: html.replace("<h1>", "# ")
@@ -0,0 +1,173 @@
+"""Unit tests for resuming an interrupted recursive conversion with --resume."""
+
+import re
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from markdown_maker.main import cli
+from markdown_maker.utils.journal import JOURNAL_FILENAME
+
+
+@pytest.fixture
+def page_tree():
+    return {
+        "42": ({"title": "Parent Page", "body": {"storage": {"value": "<h1>Parent</h1>"}}}, ["1", "2"]),
+        "1": ({"title": "Child One", "body": {"storage": {"value": "<h2>Child 1</h2>"}}}, []),
+        "2": ({"title": "Child Two", "body": {"storage": {"value": "<h2>Child 2</h2>"}}}, []),
+    }
+
+
+def test_resume_skips_completed_pages(tmp_path: Path, mocker, page_tree):
+    """Test that --resume continues after the last completed page without refetching."""
+    valid_url = "https://company.atlassian.net/wiki/pages/viewpage.action?pageId=42"
+    fetched = []
+    failing = {"2"}
+
+    def get_page_content_side_effect(page_id):
+        fetched.append(page_id)
+        if page_id in failing:
+            raise ConnectionError("network blip")
+        return page_tree[page_id][0]
+
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_content",
+        side_effect=get_page_content_side_effect,
+    )
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_metadata",
+        side_effect=lambda page_id: {"title": page_tree[page_id][0]["title"]},
+    )
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_child_pages",
+        side_effect=lambda page_id: [
+            {"id": child_id, "title": page_tree[child_id][0]["title"]} for child_id in page_tree[page_id][1]
+        ],
+    )
+    args = ["convert", "--url", valid_url, "--output-dir", str(tmp_path), "--recursive", "--max-depth", "2"]
+    runner = CliRunner()
+
+    result = runner.invoke(cli, args)
+    assert isinstance(result.exception, ConnectionError)
+    assert (tmp_path / JOURNAL_FILENAME).exists()
+    assert (tmp_path / "parent_page" / "child_one" / "index.md").exists()
+
+    failing.clear()
+    fetched.clear()
+    result = runner.invoke(cli, args + ["--resume"])
+    assert result.exit_code == 0
+    assert "Resuming from journal" in result.output
+    # Only the unfinished page's content is fetched; the root's title comes from its metadata.
+    assert fetched == ["2"]
+    assert "## Child 2" in (tmp_path / "parent_page" / "child_two" / "index.md").read_text()
+    assert not (tmp_path / JOURNAL_FILENAME).exists()
+
+
+def test_resume_without_journal_runs_full_export(tmp_path: Path, mocker, page_tree):
+    """Test that --resume without an existing journal performs a normal export."""
+    valid_url = "https://company.atlassian.net/wiki/pages/viewpage.action?pageId=42"
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_content",
+        side_effect=lambda page_id: page_tree[page_id][0],
+    )
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_metadata",
+        side_effect=lambda page_id: page_tree[page_id][0],
+    )
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_child_pages",
+        return_value=[],
+    )
+    runner = CliRunner()
+    result = runner.invoke(
+        cli, ["convert", "--url", valid_url, "--output-dir", str(tmp_path), "--recursive", "--resume"]
+    )
+    assert result.exit_code == 0
+    assert "Resuming from journal" not in result.output
+    assert (tmp_path / "parent_page" / "index.md").exists()
+
+
+def test_page_budget_stops_cleanly_and_resumes(tmp_path: Path, mocker, page_tree):
+    """Test that --max-pages keeps the journal so that --resume exports the remaining pages."""
+    valid_url = "https://company.atlassian.net/wiki/pages/viewpage.action?pageId=42"
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_content",
+        side_effect=lambda page_id: page_tree[page_id][0],
+    )
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_metadata",
+        side_effect=lambda page_id: page_tree[page_id][0],
+    )
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_child_pages",
+        side_effect=lambda page_id: [
+            {"id": child_id, "title": page_tree[child_id][0]["title"]} for child_id in page_tree[page_id][1]
+        ],
+    )
+    args = ["convert", "--url", valid_url, "--output-dir", str(tmp_path), "--recursive", "--order", "breadth-first"]
+    runner = CliRunner()
+
+    result = runner.invoke(cli, args + ["--max-pages", "2"])
+    assert result.exit_code == 0
+    assert "Stopped early: page budget of 2 reached. Run again with --resume to continue." in result.output
+    assert (tmp_path / "parent_page" / "child_one" / "index.md").exists()
+    assert not (tmp_path / "parent_page" / "child_two").exists()
+    assert (tmp_path / JOURNAL_FILENAME).exists()
+
+    result = runner.invoke(cli, args + ["--max-pages", "2", "--resume"])
+    assert result.exit_code == 0
+    assert "Stopped early" not in result.output
+    assert (tmp_path / "parent_page" / "child_two" / "index.md").exists()
+    assert not (tmp_path / JOURNAL_FILENAME).exists()
+
+
+def test_invalid_deadline_is_rejected(tmp_path: Path):
+    """Test that a malformed --deadline is reported as a usage error."""
+    valid_url = "https://company.atlassian.net/wiki/pages/viewpage.action?pageId=42"
+    result = CliRunner().invoke(
+        cli, ["convert", "--url", valid_url, "--output-dir", str(tmp_path), "--recursive", "--deadline", "soon"]
+    )
+    assert result.exit_code == 2
+    assert "Invalid duration" in result.output
+
+
+def test_resume_patches_local_links_of_pages_written_before(tmp_path: Path, mocker, page_tree):
+    """Test that --resume with --local-links rewrites links from pages written before the interruption."""
+    valid_url = "https://company.atlassian.net/wiki/pages/viewpage.action?pageId=42"
+    link = '<p><a href="https://company.atlassian.net/wiki/spaces/DOC/pages/2/Child">two</a></p>'
+    page_tree["1"][0]["body"]["storage"]["value"] = link
+    failing = {"2"}
+
+    def get_page_content_side_effect(page_id):
+        if page_id in failing:
+            raise ConnectionError("network blip")
+        return page_tree[page_id][0]
+
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_content",
+        side_effect=get_page_content_side_effect,
+    )
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_metadata",
+        side_effect=lambda page_id: {"title": page_tree[page_id][0]["title"]},
+    )
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_child_pages",
+        side_effect=lambda page_id: [
+            {"id": child_id, "title": page_tree[child_id][0]["title"]} for child_id in page_tree[page_id][1]
+        ],
+    )
+    args = ["convert", "--url", valid_url, "--output-dir", str(tmp_path), "--recursive", "--local-links"]
+    runner = CliRunner()
+
+    result = runner.invoke(cli, args)
+    assert isinstance(result.exception, ConnectionError)
+    child_one = tmp_path / "parent_page" / "child_one" / "index.md"
+    assert "(https://company.atlassian.net/wiki/spaces/DOC/pages/2/Child)" in child_one.read_text()
+
+    failing.clear()
+    result = runner.invoke(cli, args + ["--resume"])
+    assert result.exit_code == 0, result.output
+    target = re.search(r"\[two\]\(([^)]+)\)", child_one.read_text()).group(1)
+    assert "## Child 2" in (child_one.parent / target).read_text()
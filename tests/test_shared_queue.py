@@ -0,0 +1,125 @@
+"""Tests for exports shared between several workers through --queue."""
+
+import threading
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from markdown_maker.clients.confluence_tree_traverser import ConfluenceTreeTraverser
+from markdown_maker.main import cli
+from markdown_maker.utils.handlers import make_handle_page_multi
+from markdown_maker.utils.work_queue import WorkQueue
+
+ROOT_URL = "https://company.atlassian.net/wiki/pages/viewpage.action?pageId=1"
+
+
+class TreeClient:
+    """Fake client serving a tree of pages 1..n where page i has children 2i and 2i + 1."""
+
+    def __init__(self, pages: int, shared_link: str) -> None:
+        self.pages = pages
+        self.shared_link = shared_link
+        self.fetched: list[str] = []
+        self._lock = threading.Lock()
+
+    def get_page_content(self, page_id: str) -> dict:
+        with self._lock:
+            self.fetched.append(page_id)
+        # Every page links to the same page, which must still be exported once.
+        link = f'<a href="https://x/wiki/pages/viewpage.action?pageId={self.shared_link}">shared</a>'
+        return {"title": f"Page {page_id}", "body": {"storage": {"value": f"<p>{page_id}</p>{link}"}}}
+
+    def get_child_pages(self, page_id: str) -> list:
+        children = [2 * int(page_id), 2 * int(page_id) + 1]
+        return [{"id": str(child), "title": f"Page {child}"} for child in children if child <= self.pages]
+
+
+def test_workers_split_the_tree_without_duplicates(tmp_path: Path):
+    """Test that concurrent workers export every page exactly once."""
+    client = TreeClient(31, shared_link="7")
+    queue_path = str(tmp_path / "queue.db")
+    output_dir = str(tmp_path / "out")
+
+    def work(worker_id):
+        queue = WorkQueue(queue_path, "1", output_dir)
+        traverser = ConfluenceTreeTraverser(
+            client=client,
+            max_depth=5,
+            handle_page=make_handle_page_multi(output_dir),
+            converter=lambda html, space_key="": html,
+        )
+        try:
+            traverser.traverse_queue(queue, worker_id, "1", ROOT_URL, poll_interval=0.01)
+        finally:
+            queue.close()
+
+    workers = [threading.Thread(target=work, args=(f"w{i}",)) for i in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert sorted(client.fetched, key=int) == [str(pid) for pid in range(1, 32)]
+    assert len(list(Path(output_dir).rglob("index.md"))) == 31
+    assert (Path(output_dir) / "page_1" / "page_2" / "page_4" / "page_8" / "page_16" / "index.md").exists()
+    assert WorkQueue(queue_path, "1", output_dir).is_finished()
+
+
+def test_page_budget_returns_unfinished_work_to_the_queue(tmp_path: Path):
+    """Test that a worker stopping early leaves the rest for the next worker."""
+    queue_path = str(tmp_path / "queue.db")
+    output_dir = str(tmp_path / "out")
+    first = ConfluenceTreeTraverser(
+        client=TreeClient(7, shared_link="1"),
+        max_depth=3,
+        handle_page=make_handle_page_multi(output_dir),
+        converter=lambda html, space_key="": html,
+        max_pages=2,
+    )
+    first.traverse_queue(WorkQueue(queue_path, "1", output_dir), "a", "1", ROOT_URL)
+    assert first.stop_reason == "page budget of 2 reached"
+    assert WorkQueue(queue_path, "1", output_dir).counts() == {"pending": 3, "claimed": 0, "done": 2}
+
+    client = TreeClient(7, shared_link="1")
+    second = ConfluenceTreeTraverser(
+        client=client,
+        max_depth=3,
+        handle_page=make_handle_page_multi(output_dir),
+        converter=lambda html, space_key="": html,
+    )
+    second.traverse_queue(WorkQueue(queue_path, "1", output_dir), "b", "1", ROOT_URL)
+    assert sorted(client.fetched) == ["3", "4", "5", "6", "7"]
+
+
+def test_convert_with_queue(tmp_path: Path, mocker):
+    """Test that convert --queue exports the tree and reports the queue state."""
+    client = TreeClient(3, shared_link="1")
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_content",
+        side_effect=client.get_page_content,
+    )
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_metadata",
+        side_effect=client.get_page_content,
+    )
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_child_pages",
+        side_effect=client.get_child_pages,
+    )
+    queue_path = tmp_path / "queue.db"
+    result = CliRunner().invoke(
+        cli, ["convert", "--url", ROOT_URL, "--output-dir", str(tmp_path), "--queue", str(queue_path)]
+    )
+    assert result.exit_code == 0, result.output
+    assert "Queue: 3 pages done, 0 pending, 0 claimed by other workers." in result.output
+    assert (tmp_path / "page_1" / "page_3" / "index.md").exists()
+
+
+def test_convert_queue_rejects_single_file(tmp_path: Path):
+    """Test that --queue requires directory output."""
+    result = CliRunner().invoke(
+        cli,
+        ["convert", "--url", ROOT_URL, "--output-dir", str(tmp_path), "--queue", "q.db", "--single-file"],
+    )
+    assert result.exit_code != 0
+    assert "--queue requires directory output" in result.output
@@ -43,6 +43,10 @@ def test_single_file_output_single_page(tmp_path: Path, mocker, dummy_single_pag
         "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_content",
         return_value=dummy_single_page,
     )
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_metadata",
+        return_value=dummy_single_page,
+    )
     mocker.patch(
         "markdown_maker.converters.html_to_markdown.convert_html_to_markdown",
         return_value="# Single\n",
@@ -84,6 +88,10 @@ def test_single_file_output_recursive(tmp_path: Path, mocker, dummy_recursive_pa
         "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_content",
         side_effect=get_page_content_side_effect,
     )
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_metadata",
+        side_effect=get_page_content_side_effect,
+    )
     mocker.patch(
         "markdown_maker.converters.html_to_markdown.convert_html_to_markdown",
         side_effect=lambda html: html.replace("<h1>", "# ")
@@ -153,6 +161,10 @@ def test_single_file_embedded_link_error_context(tmp_path: Path, mocker, dummy_s
         "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_content",
         side_effect=get_page_content_side_effect,
     )
+    mocker.patch(
+        "markdown_maker.clients.confluence_client.ConfluenceClient.get_page_metadata",
+        side_effect=get_page_content_side_effect,
+    )
     mocker.patch(
         "markdown_maker.converters.html_to_markdown.convert_html_to_markdown",
         return_value="# Page With Link\n",
@@ -0,0 +1,86 @@
+"""Unit tests for the --stream-threshold CLI option: large pages converted by the streaming converter."""
+
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from markdown_maker.converters.storage_format import convert_storage_to_markdown
+from markdown_maker.main import cli
+
+VALID_URL = "https://company.atlassian.net/wiki/pages/viewpage.action?pageId=42"
+LINK = '<a href="https://company.atlassian.net/wiki/pages/viewpage.action?pageId=7">guide</a>'
+BIG_HTML = "<h1>Parent</h1>" + "<ul><li>row <strong>bold</strong></li></ul>" * 40 + f"<p>See {LINK}</p>"
+
+
+PAGES = {
+    "42": {"title": "Parent Page", "body": {"storage": {"value": BIG_HTML}}},
+    "7": {"title": "Guide", "body": {"storage": {"value": "<p>Small page.</p>"}}},
+}
+
+
+def test_recursive_export_streams_large_pages(tmp_path: Path, mock_tree):
+    """Test that a large page is streamed into its index.md and its links are still followed."""
+    mock_tree(PAGES)
+    result = CliRunner().invoke(
+        cli,
+        [
+            "convert",
+            "--url",
+            VALID_URL,
+            "--output-dir",
+            str(tmp_path),
+            "--recursive",
+            "--stream-threshold",
+            "1K",
+            "--engine",
+            "storage",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    assert (tmp_path / "parent_page" / "index.md").read_text(encoding="utf-8") == convert_storage_to_markdown(BIG_HTML)
+    assert (tmp_path / "parent_page" / "guide" / "index.md").exists()
+
+
+def test_single_file_streams_large_pages(tmp_path: Path, mock_tree):
+    """Test that a streamed page is appended to the single output file like a converted one."""
+    mock_tree(PAGES)
+    result = CliRunner().invoke(
+        cli,
+        [
+            "convert",
+            "--url",
+            VALID_URL,
+            "--output-dir",
+            str(tmp_path),
+            "--single-file",
+            "--stream-threshold",
+            "1K",
+            "--engine",
+            "storage",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    content = (tmp_path / "parent_page.md").read_text(encoding="utf-8")
+    assert f"Source: [{VALID_URL}]({VALID_URL})\n\n{convert_storage_to_markdown(BIG_HTML)}\n\n---\n\n# Guide" in content
+
+
+def test_stream_threshold_rejects_invalid_size_and_database(tmp_path: Path):
+    """Test that malformed sizes and outputs that need the whole Markdown are rejected."""
+    runner = CliRunner()
+    result = runner.invoke(cli, ["convert", "--url", VALID_URL, "--stream-threshold", "huge"])
+    assert result.exit_code != 0
+    assert "Invalid size" in result.output
+    result = runner.invoke(
+        cli, ["convert", "--url", VALID_URL, "--stream-threshold", "10M", "--database", str(tmp_path / "x.db")]
+    )
+    assert result.exit_code != 0
+    assert "--stream-threshold requires directory or --single-file output" in result.output
+
+
+def test_stream_threshold_requires_storage_engine(tmp_path: Path, mock_tree):
+    """Test that streamed pages cannot be mixed with markdownify output."""
+    result = CliRunner().invoke(
+        cli, ["convert", "--url", VALID_URL, "--output-dir", str(tmp_path), "--recursive", "--stream-threshold", "1K"]
+    )
+    assert result.exit_code != 0
+    assert "--stream-threshold requires --engine storage" in result.output
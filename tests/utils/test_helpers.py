@@ -3,9 +3,25 @@
 Tests cover typical, edge, and invalid Confluence URL cases.
 """
 
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import pytest
+from bs4 import BeautifulSoup
 
-from markdown_maker.utils.helpers import extract_page_id_from_url
+from markdown_maker.utils.helpers import (
+    classify_url,
+    decode_tiny_link,
+    extract_page_id_from_url,
+    extract_title_ref_from_url,
+    parse_duration,
+    parse_size,
+    release_soup,
+    update_json_file,
+    write_chunks_if_changed,
+    write_if_changed,
+)
 
 
 @pytest.mark.parametrize(
@@ -44,3 +60,139 @@ def test_extract_page_id_from_url_invalid() -> None:
         extract_page_id_from_url("not a url")
     with pytest.raises(ValueError):
         extract_page_id_from_url("")
+
+
+def test_extract_title_ref_from_display_url() -> None:
+    """Test extraction of space key and title from /display/ URLs."""
+    url = "https://company.atlassian.net/wiki/display/ENG/Release+Notes+%282024%29?focusedCommentId=1"
+    assert extract_title_ref_from_url(url) == ("ENG", "Release Notes (2024)")
+    with pytest.raises(ValueError):
+        extract_title_ref_from_url("https://company.atlassian.net/wiki/spaces/ENG/overview")
+
+
+@pytest.mark.parametrize(
+    "url,expected",
+    [
+        ("https://x.atlassian.net/wiki/spaces/S/pages/123/Title", ("123", None)),
+        ("https://x.atlassian.net/wiki/spaces/S/pages/edit-v2/77", ("77", None)),
+        ("https://x.atlassian.net/wiki/pages/viewpage.action?pageId=9", ("9", None)),
+        (
+            "https://x.atlassian.net/wiki/pages/diffpagesbyversion.action?contentId=5&selectedPageVersions=1",
+            ("5", None),
+        ),
+        ("https://x.atlassian.net/wiki/spaces/S/blog/2024/01/02/555/Release+notes", ("555", None)),
+        ("https://x.atlassian.net/wiki/x/AgAB", ("65538", None)),
+        ("/x/Fc1bBw?src=contextnavpagetreemode", ("123456789", None)),
+        ("https://x.atlassian.net/wiki/display/ENG/Other+Page", (None, ("ENG", "Other Page"))),
+        ("https://x.atlassian.net/wiki/display/ENG/2024/01/02/Blog+Post", None),
+        ("https://example.com/x/AgAB", None),
+        ("https://github.com/org/repo/pages/12", ("12", None)),
+        ("mailto:team@example.com", None),
+        ("#section", None),
+    ],
+)
+def test_classify_url(url: str, expected) -> None:
+    """Test that each Confluence link form is classified, and other links are not."""
+    assert classify_url(url) == expected
+
+
+@pytest.mark.parametrize(
+    "code,expected",
+    [("AgAB", "65538"), ("Fc1bBw", "123456789"), ("AQAAAAE", "4294967297"), ("AQAAAAEAAAA", "4294967297")],
+)
+def test_decode_tiny_link(code: str, expected: str) -> None:
+    """Test that tiny link codes decode to page IDs, with or without trailing A characters."""
+    assert decode_tiny_link(code) == expected
+
+
+@pytest.mark.parametrize("code", ["", "A", "AAAAAAAAAAAA", "Ag*B"])
+def test_decode_tiny_link_invalid(code: str) -> None:
+    """Test that empty, zero, overlong and malformed codes are rejected."""
+    assert decode_tiny_link(code) is None
+
+
+def test_release_soup_clears_nested_nodes() -> None:
+    """Test release_soup breaks the tree apart, including top-level children."""
+    soup = BeautifulSoup("<div><p>text</p></div>tail", "html.parser")
+    paragraph = soup.p
+    release_soup(soup)
+    assert paragraph.decomposed
+    assert soup.contents == []
+
+
+def test_write_if_changed_skips_identical_content(tmp_path) -> None:
+    """Test that identical content is not rewritten and the mtime is preserved."""
+    path = tmp_path / "index.md"
+    assert write_if_changed(str(path), "# Title\n")
+    os.utime(path, (1_000_000, 1_000_000))
+    assert not write_if_changed(str(path), "# Title\n")
+    assert path.stat().st_mtime == 1_000_000
+
+
+def test_write_if_changed_rewrites_different_content(tmp_path) -> None:
+    """Test that changed content of the same or a different size is written."""
+    path = tmp_path / "index.md"
+    path.write_text("# Title\n", encoding="utf-8")
+    assert write_if_changed(str(path), "# Tilte\n")
+    assert path.read_text(encoding="utf-8") == "# Tilte\n"
+    assert write_if_changed(str(path), "# Longer title\n")
+    assert path.read_text(encoding="utf-8") == "# Longer title\n"
+
+
+def _add_key(path: str, key: str) -> None:
+    update_json_file(path, lambda data: {**(data or {}), key: True})
+
+
+def test_update_json_file_keeps_entries_of_concurrent_processes(tmp_path) -> None:
+    """Test that processes merging into the same file at the same time all keep their entries."""
+    path = str(tmp_path / "manifest.json")
+    with ProcessPoolExecutor(4) as pool:
+        list(pool.map(_add_key, [path] * 40, [str(i) for i in range(40)]))
+    assert sorted(json.loads((tmp_path / "manifest.json").read_text(encoding="utf-8")), key=int) == [
+        str(i) for i in range(40)
+    ]
+
+
+def test_write_chunks_if_changed(tmp_path) -> None:
+    """Test that chunked content is joined, and identical content leaves the file untouched."""
+    path = tmp_path / "index.md"
+    assert write_chunks_if_changed(str(path), iter(["# Title\n", "Body\n"]))
+    assert path.read_text(encoding="utf-8") == "# Title\nBody\n"
+    os.utime(path, (1_000_000, 1_000_000))
+    assert not write_chunks_if_changed(str(path), iter(["# Title\nBo", "dy\n"]))
+    assert path.stat().st_mtime == 1_000_000
+    assert write_chunks_if_changed(str(path), iter(["# Title\n"]))
+    assert path.read_text(encoding="utf-8") == "# Title\n"
+    assert os.listdir(tmp_path) == ["index.md"]
+
+
+@pytest.mark.parametrize(
+    "text,expected",
+    [("4096", 4096), ("512K", 524288), ("20M", 20971520), ("1GiB", 1073741824), ("1.5mb", 1572864)],
+)
+def test_parse_size(text: str, expected: int) -> None:
+    """Test that bare bytes and binary K/M/G suffixes are parsed into bytes."""
+    assert parse_size(text) == expected
+
+
+@pytest.mark.parametrize("text", ["", "big", "10T", "M10"])
+def test_parse_size_invalid(text: str) -> None:
+    """Test that malformed sizes raise ValueError."""
+    with pytest.raises(ValueError, match="Invalid size"):
+        parse_size(text)
+
+
+@pytest.mark.parametrize(
+    "text,expected",
+    [("90", 90.0), ("45s", 45.0), ("30m", 1800.0), ("2h", 7200.0), ("1h30m", 5400.0), ("1.5h", 5400.0)],
+)
+def test_parse_duration(text: str, expected: float) -> None:
+    """Test that bare seconds and h/m/s suffixes are parsed into seconds."""
+    assert parse_duration(text) == expected
+
+
+@pytest.mark.parametrize("text", ["", "soon", "30x", "m30", "1h 30m"])
+def test_parse_duration_invalid(text: str) -> None:
+    """Test that malformed durations raise ValueError."""
+    with pytest.raises(ValueError, match="Invalid duration"):
+        parse_duration(text)
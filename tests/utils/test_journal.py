@@ -0,0 +1,102 @@
+"""Unit tests for the export journal used to checkpoint recursive conversions."""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from markdown_maker.utils.journal import ExportJournal
+
+
+def test_journal_records_and_reloads_completed_pages(tmp_path):
+    """Test that recorded pages are available when the journal is resumed."""
+    path = tmp_path / "journal.jsonl"
+    journal = ExportJournal(str(path), "1")
+    journal.record_page("1", "Root", 1, "/out/root", [("2", "Child")], [("3", "https://x/pages/3")], True)
+    journal.close()
+
+    resumed = ExportJournal(str(path), "1", resume=True)
+    assert resumed.resumed
+    entry = resumed.get("1")
+    assert entry["page_dir"] == "/out/root"
+    assert entry["children"] == [["2", "Child"]]
+    assert entry["links"] == [["3", "https://x/pages/3"]]
+    assert resumed.get("2") is None
+    resumed.close()
+
+
+def test_journal_without_resume_starts_over(tmp_path):
+    """Test that an existing journal is truncated when not resuming."""
+    path = tmp_path / "journal.jsonl"
+    journal = ExportJournal(str(path), "1")
+    journal.record_page("1", "Root", 1, "", [], [], False)
+    journal.close()
+
+    fresh = ExportJournal(str(path), "1")
+    assert not fresh.resumed
+    assert fresh.get("1") is None
+    fresh.close()
+    assert path.read_text().splitlines() == [json.dumps({"root": "1"})]
+
+
+def test_journal_ignores_truncated_last_line(tmp_path):
+    """Test that a partially written record is skipped and later records stay readable."""
+    path = tmp_path / "journal.jsonl"
+    path.write_text(json.dumps({"root": "1"}) + '\n{"id": "1", "tit')
+    journal = ExportJournal(str(path), "1", resume=True)
+    assert journal.completed == {}
+    journal.record_page("1", "Root", 1, "", [], [], False)
+    journal.close()
+    assert ExportJournal(str(path), "1", resume=True).get("1")["title"] == "Root"
+
+
+def test_journal_rejects_different_root(tmp_path):
+    """Test that resuming a journal written for another root page fails."""
+    path = tmp_path / "journal.jsonl"
+    ExportJournal(str(path), "1").close()
+    with pytest.raises(ValueError, match="belongs to page 1"):
+        ExportJournal(str(path), "2", resume=True)
+
+
+def test_journal_discard_removes_file(tmp_path):
+    """Test that discard deletes the journal."""
+    path = tmp_path / "journal.jsonl"
+    ExportJournal(str(path), "1").discard()
+    assert not path.exists()
+
+
+def test_later_record_completes_child_listing(tmp_path):
+    """Test that a page recorded before its children were listed is completed by a later record."""
+    path = tmp_path / "journal.jsonl"
+    journal = ExportJournal(str(path), "1")
+    journal.record_page("1", "Root", 1, "/out/root", None, [], True)
+    journal.close()
+
+    journal = ExportJournal(str(path), "1", resume=True)
+    assert journal.get("1")["children"] is None
+    journal.record_page("1", "Root", 1, "/out/root", [("2", "Child")], [], True)
+    journal.close()
+
+    resumed = ExportJournal(str(path), "1", resume=True)
+    assert resumed.get("1")["children"] == [["2", "Child"]]
+    resumed.close()
+
+
+def test_journal_holds_records_until_their_output_is_durable(tmp_path):
+    """Test that a page is journaled only once the writes handed to the output before it are durable."""
+    path = tmp_path / "journal.jsonl"
+    journal = ExportJournal(str(path), "1")
+    journal.output = SimpleNamespace(submitted=1, durable=0)
+    journal.record_page("1", "Root", 1, "/out/root", [], [], True)
+    journal.output.submitted = 2
+    journal.record_page("2", "Child", 2, "/out/root/child", [], [], True)
+    assert journal.get("2") is not None
+    assert len(path.read_text().splitlines()) == 1
+
+    journal.output.durable = 1
+    journal.close()
+    resumed = ExportJournal(str(path), "1", resume=True)
+    assert resumed.get("1") is not None
+    # The child's write never finished, so it is exported again.
+    assert resumed.get("2") is None
+    resumed.close()
@@ -0,0 +1,57 @@
+"""Unit tests for rewriting links between exported pages."""
+
+from markdown_maker.utils.link_index import LinkIndex
+
+
+def test_rewrite_known_pages_to_relative_paths(tmp_path, mocker):
+    """Test that links to registered pages become relative paths and others are kept."""
+    resolver = mocker.Mock()
+    resolver.lookup.side_effect = lambda ref: "3" if ref == ("DOC", "Third Page") else None
+    links = LinkIndex(resolver)
+    links.register("1", str(tmp_path / "root"))
+    links.register("2", str(tmp_path / "root" / "child"))
+    links.register("3", str(tmp_path / "other"))
+    markdown = (
+        "[up](https://company.atlassian.net/wiki/pages/viewpage.action?pageId=1) "
+        '[child](https://company.atlassian.net/wiki/spaces/DOC/pages/2/Child "Child") '
+        "[third](/wiki/display/DOC/Third+Page) [web](https://example.com/docs) [unknown](/wiki/display/DOC/Nope)"
+    )
+    assert links.rewrite(markdown, str(tmp_path / "root" / "child")) == (
+        '[up](../index.md) [child](index.md "Child") '
+        "[third](../../other/index.md) [web](https://example.com/docs) [unknown](/wiki/display/DOC/Nope)"
+    )
+
+
+def test_finalize_patches_only_files_linking_to_later_pages(tmp_path):
+    """Test that links to pages exported later are patched in the files that contain them."""
+    links = LinkIndex()
+    parent_dir = tmp_path / "parent"
+    parent_dir.mkdir()
+    links.register("1", str(parent_dir))
+    parent_md = links.rewrite("[child](/wiki/spaces/DOC/pages/2) [gone](/wiki/spaces/DOC/pages/9)", str(parent_dir))
+    (parent_dir / "index.md").write_text(parent_md, encoding="utf-8")
+    untouched = tmp_path / "untouched" / "index.md"
+    untouched.parent.mkdir()
+    untouched.write_text("[parent](/wiki/spaces/DOC/pages/1)", encoding="utf-8")
+    links.register("2", str(parent_dir / "child"))
+
+    assert links.finalize() == 1
+    assert (parent_dir / "index.md").read_text(encoding="utf-8") == (
+        "[child](child/index.md) [gone](/wiki/spaces/DOC/pages/9)"
+    )
+    assert untouched.read_text(encoding="utf-8") == "[parent](/wiki/spaces/DOC/pages/1)"
+    assert links.finalize() == 0
+
+
+def test_finalize_patches_pages_written_by_an_interrupted_run(tmp_path):
+    """Test that pages from a resumed run get links to pages exported after the interruption."""
+    parent_dir = tmp_path / "parent"
+    parent_dir.mkdir()
+    (parent_dir / "index.md").write_text("[child](/wiki/spaces/DOC/pages/2)", encoding="utf-8")
+    links = LinkIndex()
+    links.register_written("1", str(parent_dir))
+    links.register("2", str(parent_dir / "child"))
+
+    assert links.finalize() == 1
+    assert (parent_dir / "index.md").read_text(encoding="utf-8") == "[child](child/index.md)"
+    assert links.finalize() == 0
@@ -0,0 +1,100 @@
+"""Unit tests for the SQLite page store."""
+
+import json
+import sqlite3
+from pathlib import Path
+
+from markdown_maker.utils.journal import ExportJournal
+from markdown_maker.utils.page_store import PageStore
+
+
+def _info(pid, title, parent_id=None, link_type="child", links=()):
+    return {
+        "id": pid,
+        "title": title,
+        "url": f"https://x/{pid}",
+        "version": 1,
+        "depth": 2 if parent_id else 1,
+        "parent_id": parent_id,
+        "link_type": link_type,
+        "links": list(links),
+    }
+
+
+def test_pages_edges_and_search(tmp_path: Path):
+    """Test that pages, tree and link edges are stored and searchable."""
+    store = PageStore(str(tmp_path / "export.db"))
+    store.add("root", "# Root\n\nSee the deployment guide.", _info("1", "Root", link_type="root", links=["3"]))
+    store.add("root/child", "# Child\n\nRollback steps.", _info("2", "Child", parent_id="1"))
+    store.add("root/other", "# Deployment Guide", _info("3", "Deployment Guide", parent_id="1", link_type="embedded"))
+    assert sorted(store.search("deployment")) == [("1", "Root"), ("3", "Deployment Guide")]
+    assert store.search("rollback") == [("2", "Child")]
+    store.close()
+
+    db = sqlite3.connect(tmp_path / "export.db")
+    assert db.execute("SELECT id, path, depth FROM pages ORDER BY id").fetchall() == [
+        ("1", "root", 1),
+        ("2", "root/child", 2),
+        ("3", "root/other", 2),
+    ]
+    assert db.execute("SELECT * FROM children").fetchall() == [("1", "2")]
+    assert db.execute("SELECT * FROM links").fetchall() == [("1", "3")]
+
+
+def test_replaced_page_is_reindexed(tmp_path: Path):
+    """Test that storing a page again replaces its body in the index."""
+    store = PageStore(str(tmp_path / "export.db"))
+    store.add("page", "old words", _info("1", "Page"))
+    store.add("page", "new words", _info("1", "Page"))
+    assert store.search("old") == []
+    assert store.search("new") == [("1", "Page")]
+    store.close()
+
+
+def test_readers_see_committed_pages_during_the_export(tmp_path: Path):
+    """Test that pages become visible to other connections while the store is open."""
+    path = tmp_path / "export.db"
+    store = PageStore(str(path), commit_pages=2, commit_seconds=3600)
+    reader = sqlite3.connect(path)
+    store.add("a", "a", _info("1", "A"))
+    assert reader.execute("SELECT COUNT(*) FROM pages").fetchone() == (0,)
+    store.add("b", "b", _info("2", "B"))
+    assert reader.execute("SELECT COUNT(*) FROM pages").fetchone() == (2,)
+    store.close()
+
+
+def test_reset_clears_an_earlier_export(tmp_path: Path):
+    """Test that a new export replaces the pages of an earlier one unless continuing it."""
+    path = str(tmp_path / "export.db")
+    store = PageStore(path)
+    store.add("a", "a", _info("1", "A"))
+    store.close()
+    store = PageStore(path, reset=False)
+    store.add("b", "b", _info("2", "B"))
+    store.close()
+    assert sqlite3.connect(path).execute("SELECT COUNT(*) FROM pages").fetchone() == (2,)
+    PageStore(path).close()
+    assert sqlite3.connect(path).execute("SELECT COUNT(*) FROM pages").fetchone() == (0,)
+
+
+def test_journal_records_only_committed_pages(tmp_path: Path):
+    """Test that an export journal holds page records until the store has committed the pages."""
+    store = PageStore(str(tmp_path / "export.db"), commit_pages=2, commit_seconds=3600)
+    journal = ExportJournal(str(tmp_path / "journal.jsonl"), "1")
+    journal.output = store
+    store.add("a", "a", _info("1", "A"))
+    journal.record_page("1", "A", 1, "a", [], [], True)
+    assert len((tmp_path / "journal.jsonl").read_text().splitlines()) == 1
+    store.add("b", "b", _info("2", "B", parent_id="1"))
+    journal.record_page("2", "B", 2, "a/b", [], [], True)
+    store.add("c", "c", _info("3", "C", parent_id="1"))
+    journal.record_page("3", "C", 2, "a/c", [], [], True)
+    # A crash now loses page 3, so only the committed pages are journaled.
+    assert [json.loads(line).get("id") for line in (tmp_path / "journal.jsonl").read_text().splitlines()] == [
+        None,
+        "1",
+        "2",
+    ]
+    store.close()
+    journal.close()
+    assert len((tmp_path / "journal.jsonl").read_text().splitlines()) == 4
@@ -0,0 +1,70 @@
+"""Unit tests for the shared SQLite work queue."""
+
+from pathlib import Path
+
+import pytest
+
+from markdown_maker.utils.work_queue import WorkQueue
+
+
+def _visit(pid, depth, parent_dir=None):
+    return (pid, f"https://x/{pid}", depth, "child", f"Page {pid}", None, None, parent_dir)
+
+
+def test_claims_shallowest_pages_first_and_skips_known_ones(tmp_path: Path):
+    """Test that claims follow depth order and that re-added pages are not queued twice."""
+    queue = WorkQueue(str(tmp_path / "queue.db"), "1", str(tmp_path))
+    queue.add([_visit("3", 3), _visit("2", 2)])
+    queue.add([_visit("2", 2), _visit("3", 3)])
+    assert queue.claim("a")[0] == "2"
+    assert queue.claim("b")[0] == "3"
+    assert queue.claim("a") is None
+    assert queue.counts() == {"pending": 0, "claimed": 2, "done": 0}
+    queue.complete("2")
+    queue.complete("3")
+    queue.add([_visit("2", 2)])
+    assert queue.is_finished()
+
+
+def test_pending_page_found_shallower_moves_up(tmp_path: Path):
+    """Test that a pending page rediscovered at a shallower depth takes that depth and parent."""
+    queue = WorkQueue(str(tmp_path / "queue.db"), "1", str(tmp_path))
+    queue.add([_visit("5", 4, str(tmp_path / "deep")), _visit("6", 3)])
+    queue.add([_visit("5", 2, str(tmp_path / "shallow"))])
+    claimed = queue.claim("a")
+    assert claimed[0] == "5"
+    assert claimed[2] == 2
+    assert claimed[7] == str(tmp_path / "shallow")
+
+
+def test_page_dirs_are_stored_relative_to_the_output_dir(tmp_path: Path):
+    """Test that workers mounting the shared disk elsewhere get their own absolute paths."""
+    path = str(tmp_path / "queue.db")
+    WorkQueue(path, "1", "/mnt/a/out").add([_visit("2", 2, "/mnt/a/out/root")])
+    assert WorkQueue(path, "1", "/srv/out").claim("b")[7] == "/srv/out/root"
+
+
+def test_expired_claims_are_taken_over(tmp_path: Path):
+    """Test that a page claimed by a crashed worker is claimed again after the lease."""
+    path = str(tmp_path / "queue.db")
+    WorkQueue(path, "1", str(tmp_path)).add([_visit("2", 2)])
+    assert WorkQueue(path, "1", str(tmp_path)).claim("crashed")[0] == "2"
+    assert WorkQueue(path, "1", str(tmp_path), lease=60).claim("b") is None
+    assert WorkQueue(path, "1", str(tmp_path), lease=0).claim("b")[0] == "2"
+
+
+def test_release_returns_page_to_queue(tmp_path: Path):
+    """Test that a released page can be claimed again right away."""
+    queue = WorkQueue(str(tmp_path / "queue.db"), "1", str(tmp_path))
+    queue.add([_visit("2", 2)])
+    queue.claim("a")
+    queue.release("2")
+    assert queue.claim("b")[0] == "2"
+
+
+def test_queue_of_another_root_is_rejected(tmp_path: Path):
+    """Test that a queue cannot be shared between exports of different roots."""
+    path = str(tmp_path / "queue.db")
+    WorkQueue(path, "1", str(tmp_path)).close()
+    with pytest.raises(ValueError, match="belongs to page 1"):
+        WorkQueue(path, "2", str(tmp_path))
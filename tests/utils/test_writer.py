@@ -0,0 +1,62 @@
+"""Unit tests for the background writer used by multi-file output."""
+
+import os
+
+import pytest
+
+from markdown_maker.utils.writer import BackgroundWriter
+
+
+def test_background_writer_creates_directories_and_files(tmp_path):
+    """Test that queued writes land on disk, in nested directories, after close."""
+    writer = BackgroundWriter(max_workers=2)
+    paths = [tmp_path / "parent" / f"child_{i}" / "index.md" for i in range(20)]
+    for i, path in enumerate(paths):
+        writer.submit(str(path), f"# Child {i}\n")
+    writer.close()
+    for i, path in enumerate(paths):
+        assert path.read_text(encoding="utf-8") == f"# Child {i}\n"
+    # No temporary files are left behind by the atomic rename.
+    assert not [name for _, _, files in os.walk(tmp_path) for name in files if name.endswith(".tmp")]
+
+
+def test_background_writer_orders_writes_to_the_same_path(tmp_path):
+    """Test that the last submitted content for a path wins."""
+    writer = BackgroundWriter(max_workers=4)
+    path = tmp_path / "page" / "index.md"
+    for i in range(10):
+        writer.submit(str(path), f"version {i}\n")
+    writer.close()
+    assert path.read_text(encoding="utf-8") == "version 9\n"
+
+
+def test_background_writer_close_reraises_failures(tmp_path):
+    """Test that a failed write surfaces when the writer is closed."""
+    blocker = tmp_path / "blocker"
+    blocker.write_text("not a directory")
+    writer = BackgroundWriter(max_workers=1)
+    writer.submit(str(blocker / "page" / "index.md"), "# Page\n")
+    with pytest.raises(OSError):
+        writer.close()
+
+
+def test_background_writer_submit_reraises_earlier_failures(tmp_path):
+    """Test that a failed write surfaces on the next submit and is not raised again on close."""
+    blocker = tmp_path / "blocker"
+    blocker.write_text("not a directory")
+    writer = BackgroundWriter(max_workers=1)
+    writer.submit(str(blocker / "page" / "index.md"), "# Page\n")
+    with pytest.raises(OSError):
+        for i in range(100):
+            writer.submit(str(tmp_path / f"page_{i}" / "index.md"), "# Page\n")
+    writer.close()
+    assert writer.durable == 0
+
+
+def test_background_writer_counts_durable_writes_in_order(tmp_path):
+    """Test that only writes whose predecessors all succeeded count as durable."""
+    writer = BackgroundWriter(max_workers=2)
+    for i in range(5):
+        writer.submit(str(tmp_path / f"page_{i}" / "index.md"), f"# Page {i}\n")
+    writer.close()
+    assert writer.submitted == writer.durable == 5